@@ -0,0 +1,69 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+###############################
+# * This script compares simple path evaluator
+# * with `jsonpath_ng` on deeply nested documents
+###############################
+
+# Usage: python benchmarks/bench_paths.py [--depth N] [--number N]
+
+import argparse
+import timeit
+
+import jsonpath_ng.ext as jsonpath
+
+from robust_json.__path_utils import CompiledJsonPath
+from robust_json.object import JsonObjectParser
+
+
+def make_document(depth: int) -> tuple:
+    """
+    Build nested document and a simple path to its deepest value.
+    """
+    document = {}
+    node = document
+    for _ in range(depth):
+        node["level"] = {"items": [0, 1, {}]}
+        node = node["level"]["items"][2]
+    node["leaf"] = 42
+    return document, "$" + ".level.items[2]" * depth + ".leaf"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare simple path evaluator with jsonpath_ng.")
+    parser.add_argument("--depth", type=int, default=30)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    document, path = make_document(args.depth)
+    expression = jsonpath.parse(path)
+    compiled = CompiledJsonPath(path)
+    json_parser = JsonObjectParser(document)
+    assert compiled.is_simple
+    assert compiled.find(document) == [m.value for m in expression.find(document)] == [42]
+
+    cases = [
+        ("jsonpath_ng find", lambda: [m.value for m in expression.find(document)]),
+        ("CompiledJsonPath.find", lambda: compiled.find(document)),
+        ("get_key_value", lambda: json_parser.get_key_value(path)),
+    ]
+    baseline = None
+    print(f"depth={args.depth}, number={args.number}")
+    for name, func in cases:
+        elapsed = timeit.timeit(func, number=args.number) / args.number
+        baseline = baseline or elapsed
+        print(f"{name:<24}{elapsed * 1e6:>10.1f} us  x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,3 +12,13 @@
 
 from robust_json.file import JsonFileParser
 from robust_json.object import JsonObjectParser
+
+
+def __getattr__(name):
+    # `aio` module imports asyncio, which is slow to load,
+    # so it is only imported when async parser is used
+    if name == "AsyncJsonFileParser":
+        from robust_json.aio import AsyncJsonFileParser
+
+        return AsyncJsonFileParser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
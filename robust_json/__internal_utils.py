@@ -15,16 +15,58 @@
 # * used by main package
 ###############################
 
-import jsonpath_ng.ext as jsonpath
+import io
+import os
 import os.path
+import mmap
+import stat
+import tempfile
+import shutil
+import hashlib
+import threading
+import weakref
+import contextlib
 from pathlib2 import Path
 import json as JSON
+from typing import Any
 
 from robust_json.errors import (
     JSONFileError,
     JSONPathError,
+    JSONStrictModeError,
     IncorrectFunctionParameterTypeError,
 )
+from robust_json.cache import path_cache
+from robust_json.codec import JsonCodec, get_codec
+from jsonpath_ng import Fields, Index, This, Root
+
+# File locking is only available on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Arrays lose at most this many items one by one in `delete_items` (each deletion
+# shifts the tail of array); larger sets of indexes are removed in a single pass
+_DELETE_ONE_BY_ONE = 128
+
+# One lock per written file, so concurrent saves to the same path
+# (from different parsers or threads) don't interleave
+_path_locks = weakref.WeakValueDictionary()
+_path_locks_guard = threading.Lock()
+
+
+def path_lock(path: str) -> threading.Lock:
+    """
+    Get lock that serializes writes to the file under `path` (within this process).
+    """
+    path = os.path.realpath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(path)
+        if lock is None:
+            lock = _path_locks[path] = threading.Lock()
+        return lock
 
 
 class service:
@@ -35,7 +77,7 @@ class service:
     def __init__(self):
         pass
 
-    def check_file(self, path: str, file_formats: list[str]) -> bool:
+    def check_file(self, path: str, file_formats: list[str], use_mmap: bool = False) -> bool:
         """
         Check if source file is ready for processing.
 
@@ -44,12 +86,30 @@ class service:
 
         Parameters: `path : str` specifies path to the file, that need to be checked.
         `file_formats : list of str` contains all supported file extensions. If source
-        file extension is not supported, this method will raise an exception.
+        file extension is not supported, this method will raise an exception. `use_mmap : bool`
+        enables reading file through a memory mapping (see `parse_file`).
 
         This function returnsn a boolean: `True` - file is supported and is ready for processing,
         `False` - Something is wrong with the file. If file is empty, this method will add an empty object ({}) there.
         In this case, function will return `True`.
 
+        This function will raise a `JSONFileError` if file extension is not supported.
+        This function will raise a `FileNotFoundError` if specified file doesn't exist or cannot be accessed.
+        """
+        try:
+            self.load_file(path, file_formats, use_mmap=use_mmap)
+            return True
+        except ValueError:
+            return False
+
+    def verify_file(self, path: str, file_formats: list[str]) -> None:
+        """
+        Check that source file exists and has a supported extension,
+        without reading it.
+
+        Parameters: `path : str` specifies path to the file, that needs to be checked.
+        `file_formats : list of str` contains all supported file extensions.
+
         This function will raise a `JSONFileError` if file extension is not supported.
         This function will raise a `FileNotFoundError` if specified file doesn't exist or cannot be accessed.
         """
@@ -81,27 +141,143 @@ class service:
         if not os.path.exists(path):
             raise FileNotFoundError(f"File `{path}` is not found.")
 
-        file = open(path, "r")
-        cont = file.read()
-        file.close()
+    def load_file(
+        self, path: str, file_formats: list[str], codec: JsonCodec = None, use_mmap: bool = False
+    ) -> Any:
+        """
+        Check source file and load JSON from it.
+
+        This function performs the same checks as `check_file`, but reads
+        the file only once and returns its parsed content, so the caller doesn't
+        need to read and parse it again.
+
+        Parameters: `path : str` specifies path to the file, that needs to be loaded.
+        `file_formats : list of str` contains all supported file extensions. If source
+        file extension is not supported, this method will raise an exception.
+        `codec : JsonCodec` specifies codec used for parsing (if not provided, default
+        codec is used). `use_mmap : bool` enables reading file through a memory mapping
+        (see `parse_file`).
+
+        This function returns deserialized JSON. If file is empty, this method will add
+        an empty object ({}) there and return an empty dictionary. JSON Lines files
+        (see `is_json_lines`) are returned as a list of records.
 
-        if cont == None or cont == "":
+        This function will raise a `JSONFileError` if file extension is not supported.
+        This function will raise a `FileNotFoundError` if specified file doesn't exist or cannot be accessed.
+        This function will raise a `ValueError` (`json.JSONDecodeError`) if file content cannot be parsed.
+        """
+        self.verify_file(path, file_formats)
+
+        if os.path.getsize(path) == 0:
+            if self.is_json_lines(path):
+                # Empty JSON Lines file is a valid empty array of records
+                return []
             # If file is empty, write empty dictionary there and close it
             file = open(path, "w")
             file.write(JSON.dumps({}))
             file.close()
+            return {}
+
+        return self.parse_file(path, codec, use_mmap)
 
-        # Read this file again
-        file = open(path, "r")
-        cont = file.read()
-        file.close()
+    def parse_file(self, path: str, codec: JsonCodec = None, use_mmap: bool = False) -> Any:
+        """
+        Read file and deserialize JSON from it.
+
+        Parameters: `path : str` specifies path to the file. `codec : JsonCodec` specifies
+        codec used for parsing (if not provided, default codec is used). `use_mmap : bool`
+        enables reading file through a memory mapping: codecs that accept buffers
+        (see `JsonCodec.accepts_buffers`) parse JSON straight from the mapped pages,
+        without copying file content into a `bytes` object first.
+
+        This function returns deserialized JSON. JSON Lines files (see `is_json_lines`) are
+        returned as a list of records; blank lines are ignored.
 
+        This function will raise a `ValueError` (`json.JSONDecodeError`) if file content cannot be parsed.
+        """
+        codec = get_codec(codec)
+        file = open(path, "rb")
         try:
-            # Try to deserialize JSON fron file
-            JSON.loads(cont)
-            return True
-        except:
-            return False
+            if self.is_json_lines(path):
+                if use_mmap and os.fstat(file.fileno()).st_size > 0:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                        return self.__parse_lines(iter(mapping.readline, b""), codec)
+                return self.__parse_lines(file, codec)
+            if use_mmap and os.fstat(file.fileno()).st_size > 0:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                    if codec.accepts_buffers:
+                        with memoryview(mapping) as view:
+                            return codec.loads(view)
+                    return codec.loads(mapping[:])
+            # Reading raw bytes once; codec detects their encoding by itself
+            return codec.loads(file.read())
+        finally:
+            file.close()
+
+    def __parse_lines(self, lines, codec: JsonCodec) -> list:
+        records = []
+        for line in lines:
+            if line.strip():
+                records.append(codec.loads(line))
+        return records
+
+    def is_json_lines(self, path: str) -> bool:
+        """
+        Check if file stores JSON Lines (one JSON value per line), judging by its extension
+        (see `JSON_LINES_FORMATS`).
+        """
+        return Path(path).suffix in JSON_LINES_FORMATS
+
+    def file_state(self, path: str) -> tuple:
+        """
+        Get metadata that changes whenever file is written (device, inode,
+        modification time in nanoseconds and size).
+
+        This function raises an `OSError` if file cannot be accessed.
+        """
+        info = os.stat(path)
+        return (info.st_dev, info.st_ino, info.st_mtime_ns, info.st_size)
+
+    def hash_file(self, path: str) -> bytes:
+        """
+        Calculate hash (BLAKE2b) of file content. File is read in chunks.
+
+        This function raises an `OSError` if file cannot be read.
+        """
+        digest = hashlib.blake2b()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.digest()
+
+    def copy_json(self, json: Any) -> Any:
+        """
+        Copy JSON object.
+
+        This function is a faster replacement for `copy.deepcopy` that only
+        handles types produced by JSON deserialization: dictionaries and lists
+        are copied recursively, all other values are immutable and are shared.
+
+        Parameters: `json : Any` specifies object that needs to be copied.
+
+        This function returns a copy of given object.
+        """
+        json_type = type(json)
+        if json_type == dict:
+            res = json.copy()
+            for key, value in res.items():
+                value_type = type(value)
+                if value_type == dict or value_type == list:
+                    res[key] = self.copy_json(value)
+            return res
+        if json_type == list:
+            res = json.copy()
+            for index, value in enumerate(res):
+                value_type = type(value)
+                if value_type == dict or value_type == list:
+                    res[index] = self.copy_json(value)
+            return res
+        return json
 
     def check_json_path(self, path: str, json: dict) -> bool:
         """
@@ -116,6 +292,28 @@ class service:
         This function returns `True` if path is found and `False` if path cannot be
         accessed (does not exist).
 
+        This function raises a `IncorrectFunctionParameterTypeError` exception if one or more of its parameters have incorrect types.
+        This function raises a `JSONPathError` exception is JSON path is equal to an empty string.
+        """
+        if self.resolve_json_path(path, json):
+            return True
+        else:
+            return False
+
+    def resolve_json_path(self, path: str, json: dict) -> list:
+        """
+        Find all values matched by JSON path.
+
+        This function validates JSON path and looks up its matches in a single
+        traversal, so callers don't need to run `check_json_path` first.
+
+        Parameters: `path : str` specifies property path that needs to be resolved.
+        `json : dict` specifies Python dictionary (JSON object), where this JSON path
+        needs to be present. It can also be a list (records of a JSON Lines file).
+
+        This function returns a list with all matched values (in document order).
+        If path cannot be accessed (does not exist), this list will be empty.
+
         This function raises a `IncorrectFunctionParameterTypeError` exception if one or more of its parameters have incorrect types.
         This function raises a `JSONPathError` exception is JSON path is equal to an empty string.
         """
@@ -128,18 +326,190 @@ class service:
         if path == "":
             raise JSONPathError("JSON path is empty.")
 
-        if type(json) != dict:
+        if type(json) != dict and type(json) != list:
             raise IncorrectFunctionParameterTypeError(
-                "json", "dict", type(json).__name__
+                "json", "dict or list", type(json).__name__
             )
 
-        js_expr = jsonpath.parse(path)  # Parsing JSON using JSON path
+        js_expr = path_cache.get(path)  # Compiling JSON path (or fetching it from cache)
 
-        # If path is valid, return True. Otherwise return False
-        if js_expr.find(json):
-            return True
-        else:
-            return False
+        # Simple paths are resolved by direct indexing, the rest by `jsonpath_ng`
+        return js_expr.find(json)
+
+    def resolve_json_paths(self, paths: list, json: dict) -> dict:
+        """
+        Find all values matched by several JSON paths at once.
+
+        All paths are compiled into a trie (or it is fetched from cache) once, and simple paths
+        are resolved in a single traversal that follows their common prefixes only once.
+
+        Parameters: `paths : list` specifies property paths that need to be resolved.
+        `json : dict` specifies Python dictionary (JSON object) or a list.
+
+        This function returns a Python dictionary that maps each path to a list
+        with all its matches (empty if path cannot be accessed).
+
+        This function raises a `IncorrectFunctionParameterTypeError` exception if one or more of its parameters have incorrect types.
+        This function raises a `JSONPathError` exception if one of JSON paths is equal to an empty string.
+        """
+        if type(paths) != list and type(paths) != tuple:
+            raise IncorrectFunctionParameterTypeError(
+                "json_paths", "list", type(paths).__name__
+            )
+
+        if type(json) != dict and type(json) != list:
+            raise IncorrectFunctionParameterTypeError(
+                "json", "dict or list", type(json).__name__
+            )
+
+        for path in paths:
+            if type(path) != str:
+                raise IncorrectFunctionParameterTypeError(
+                    "json_paths", "list of str", f"list with {type(path).__name__}"
+                )
+            if path == "":
+                raise JSONPathError("JSON path is empty.")
+
+        # Paths are compiled into a trie once (or fetched from cache)
+        return path_cache.get_many(tuple(paths)).find(json)
+
+    def group_changes(self, changes: list, name: str, size: int) -> dict:
+        """
+        Validate changes passed to `update_many` or `delete_many` and group them by JSON path.
+
+        Parameters: `changes : list` specifies changes: lists or tuples of `size` items,
+        where the first item is JSON path and the second one is key or index.
+        `name : str` specifies name of the parameter (used in error messages).
+
+        This function returns a Python dictionary that maps each distinct JSON path
+        to a list of its changes without the path (in the original order).
+
+        This function raises a `IncorrectFunctionParameterTypeError` exception if changes have incorrect types.
+        This function raises a `ValueError` if a change does not have `size` items.
+        """
+        if type(changes) != list and type(changes) != tuple:
+            raise IncorrectFunctionParameterTypeError(name, "list", type(changes).__name__)
+
+        groups = {}
+        for change in changes:
+            if type(change) != list and type(change) != tuple:
+                raise IncorrectFunctionParameterTypeError(
+                    name, "list of tuples", f"list with {type(change).__name__}"
+                )
+            if len(change) != size:
+                raise ValueError(
+                    f"Each item of `{name}` must contain {size} values; got {len(change)} instead."
+                )
+            if type(change[0]) != str:
+                raise IncorrectFunctionParameterTypeError(
+                    "json_path", "str", type(change[0]).__name__
+                )
+            if type(change[1]) not in [str, int]:
+                raise IncorrectFunctionParameterTypeError(
+                    "key_or_index", "str or int", type(change[1]).__name__
+                )
+            groups.setdefault(change[0], []).append(tuple(change[1:]))
+        return groups
+
+    def check_key_type(self, container: Any, path: str, key: Any) -> None:
+        """
+        Check that key or index can be used with container matched by JSON path.
+
+        Parameters: `container : Any` specifies JSON object or array, `path : str` specifies
+        JSON path that matched it, and `key : Any` specifies key or index.
+
+        This function raises a `TypeError` if key type does not match container type
+        or if JSON path is pointing to neither JSON object nor JSON array.
+        """
+        if type(container) != list and type(container) != dict:
+            raise TypeError(
+                f"Path `{path}` must point to a JSON object or a JSON array; got `{type(container).__name__}` instead."
+            )
+        if type(container) == list:
+            if type(key) != int:
+                raise TypeError(
+                    f"Path `{path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key).__name__}` instead."
+                )
+        elif type(key) != str:
+            raise TypeError(
+                f"Path `{path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key).__name__}` instead."
+            )
+
+    def check_updates(self, container: Any, path: str, updates: list, strict_mode: bool) -> None:
+        """
+        Check that updates can be applied to container without changing it.
+
+        Parameters: `container : Any` specifies JSON object or array, `path : str` specifies
+        JSON path that matched it, and `updates : list` specifies (key or index, new value) pairs.
+        `strict_mode : bool` specifies if types of old and new values must be the same.
+
+        This function raises a `TypeError` if key type does not match container type.
+        This function raises an `IndexError` if array index is out of range.
+        This function raises a `JSONStrictModeError` if types of old and new values
+        are not the same while Strict Mode is enabled.
+        """
+        for key, value in updates:
+            self.check_key_type(container, path, key)
+            if type(container) == list and not -len(container) <= key < len(container):
+                raise IndexError(f"Index {key} is out of range of array `{path}`.")
+            if strict_mode and type(container[key]) != type(value):
+                raise JSONStrictModeError(
+                    f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(container[key]).__name__}); got `{type(value).__name__}` instead."
+                )
+
+    def check_deletions(self, container: Any, path: str, keys: list) -> list:
+        """
+        Check that keys or indexes can be deleted from container.
+
+        Parameters: `container : Any` specifies JSON object or array, `path : str` specifies
+        JSON path that matched it, and `keys : list` specifies keys or indexes to delete.
+        All indexes refer to positions that items have before deletion.
+
+        This function returns a list of distinct keys or a list of distinct non-negative
+        indexes sorted in descending order (see `delete_items`).
+
+        This function raises a `TypeError` if key type does not match container type.
+        This function raises a `KeyError` if key does not exist and an `IndexError`
+        if index is out of range.
+        """
+        for key in keys:
+            self.check_key_type(container, path, key)
+
+        if type(container) != list:
+            res = list(dict.fromkeys(keys))
+            for key in res:
+                if key not in container:
+                    raise KeyError(key)
+            return res
+
+        size = len(container)
+        res = set()
+        for index in keys:
+            if not -size <= index < size:
+                raise IndexError(f"Index {index} is out of range of array `{path}`.")
+            res.add(index % size)
+        return sorted(res, reverse=True)
+
+    def delete_items(self, container: Any, keys: list) -> None:
+        """
+        Delete keys or indexes returned by `check_deletions` from container.
+
+        A few array items are deleted one by one, starting from the last one (so indexes
+        of remaining ones are not shifted); larger sets are removed by rebuilding array
+        in a single pass.
+        """
+        if type(container) != list or len(keys) <= _DELETE_ONE_BY_ONE:
+            for key in keys:
+                del container[key]
+            return
+        # Remaining items are copied slice by slice
+        res = []
+        start = 0
+        for index in reversed(keys):
+            res += container[start:index]
+            start = index + 1
+        res += container[start:]
+        container[:] = res
 
     def check_file_path(self, path: str) -> bool:
         """
@@ -168,3 +538,798 @@ class service:
             return True
         else:
             return False
+
+    def write_json_file(
+        self,
+        path: str,
+        json: Any,
+        indent: int = None,
+        codec: JsonCodec = None,
+        create_file: bool = False,
+        buffer_size: int = None,
+        atomic: bool = False,
+        fsync: str = "none",
+        json_lines: bool = False,
+    ) -> None:
+        """
+        Serialize JSON object and write it to file.
+
+        Parameters: `path : str` specifies path to the file. `json : Any` specifies
+        object that needs to be saved. `indent : int` specifies the number of spaces used
+        for indentation (`None` writes JSON in one line). `codec : JsonCodec` specifies
+        codec used for serialization (if not provided, default codec is used).
+        `create_file : bool` specifies if a new file needs to be created (in this case
+        function fails if file already exists) or an existing one needs to be overwritten.
+        `buffer_size : int` enables streaming: JSON is encoded and written in chunks of
+        this size instead of being serialized into one string first. If set to `None`,
+        streaming is disabled. With `json` codec, streaming uses pure-Python `JSONEncoder.iterencode`
+        instead of the C encoder, so it trades speed for bounded memory usage. Without `atomic`, streamed
+        output is collected in a temporary file and copied into target file once it is complete. `atomic : bool` enables atomic writes: JSON is written to a
+        temporary file in the same directory, which then replaces target file, so target
+        file is never left partially written. `fsync : str` specifies durability policy:
+        `none` (leave flushing to OS), `file` (flush file to disk before it's closed/renamed) or
+        `directory` (also flush parent directory, so the new directory entry survives a crash).
+        `json_lines : bool` enables JSON Lines format: `json` must be a list, and each of its
+        items is written on a separate line (`indent` is ignored).
+
+        This function raises a `ValueError` if `fsync` policy is not supported.
+        This function raises a `JSONFileError` if `json_lines` is `True` and `json` is not a list.
+        This function raises a `FileExistsError` if `create_file` is `True` and file already exists.
+        This function raises any exceptions raised during serialization or writing.
+        """
+        codec = get_codec(codec)
+
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f'Supported fsync policies are {", ".join(FSYNC_POLICIES)}; got `{fsync}` instead.'
+            )
+
+        if json_lines:
+            if type(json) != list:
+                raise JSONFileError(
+                    f"JSON Lines file can only store an array of records; got `{type(json).__name__}` instead."
+                )
+            indent = _JSON_LINES
+
+        # Writing to the real file, so atomic rename doesn't replace symbolic links
+        path = os.path.realpath(path)
+        directory = os.path.dirname(path)
+
+        with path_lock(path):
+            if atomic:
+                self.__write_atomic(path, json, indent, codec, create_file, buffer_size, fsync)
+            else:
+                self.__write_in_place(path, json, indent, codec, create_file, buffer_size, fsync)
+
+            if fsync == "directory":
+                self.__fsync_directory(directory)
+
+    def __write_in_place(
+        self,
+        path: str,
+        json: Any,
+        indent: int,
+        codec: JsonCodec,
+        create_file: bool,
+        buffer_size: int,
+        fsync: str,
+    ) -> None:
+        # Target file is opened (and truncated) only after the whole document has been
+        # serialized, so a serialization error leaves it untouched
+        mode = "xb" if create_file else "wb"
+        if buffer_size is None and indent is not _JSON_LINES:
+            data = codec.dumps(json, indent=indent).encode("utf-8")
+            with open(path, mode) as file:
+                file.write(data)
+                if fsync != "none":
+                    file.flush()
+                    os.fsync(file.fileno())
+            return
+
+        # Incremental output is spooled to a temporary file on the same file system
+        # (memory usage stays bounded) and then copied into target file
+        with tempfile.TemporaryFile(dir=os.path.dirname(path)) as spool:
+            self.__write_to(spool, json, indent, codec, buffer_size)
+            spool.seek(0)
+            with open(path, mode) as file:
+                shutil.copyfileobj(spool, file, buffer_size or 65536)
+                if fsync != "none":
+                    file.flush()
+                    os.fsync(file.fileno())
+
+    def __write_to(self, file, json: Any, indent: int, codec: JsonCodec, buffer_size: int) -> None:
+        if indent is _JSON_LINES:
+            self.__write_lines(file, json, codec, buffer_size or 65536)
+        elif buffer_size is None:
+            file.write(codec.dumps(json, indent=indent).encode("utf-8"))
+        else:
+            codec.dump(json, file, indent=indent, buffer_size=buffer_size)
+
+    def __write_lines(self, file, records: list, codec: JsonCodec, buffer_size: int) -> list:
+        # Writes one record per line; returns offsets (relative to the start) of written lines
+        offsets = []
+        buffer = []
+        buffered = 0
+        position = 0
+        for record in records:
+            line = codec.dumps(record).encode("utf-8") + b"\n"
+            offsets.append(position)
+            position += len(line)
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= buffer_size:
+                file.write(b"".join(buffer))
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            file.write(b"".join(buffer))
+        return offsets
+
+    def append_json_lines(
+        self, path: str, records: list, codec: JsonCodec = None, fsync: str = "none"
+    ) -> list:
+        """
+        Append records to the end of JSON Lines file, one record per line.
+
+        Unlike `write_json_file`, this function doesn't rewrite the file, so its cost
+        depends only on the size of new records.
+
+        Parameters: `path : str` specifies path to an existing file. `records : list`
+        specifies records that need to be appended. `codec : JsonCodec` specifies codec used
+        for serialization (if not provided, default codec is used). `fsync : str` specifies
+        durability policy (see `write_json_file`).
+
+        This function returns a list with offsets of appended lines in file.
+
+        This function raises a `ValueError` if `fsync` policy is not supported.
+        This function raises any exceptions raised during serialization or writing.
+        """
+        codec = get_codec(codec)
+
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f'Supported fsync policies are {", ".join(FSYNC_POLICIES)}; got `{fsync}` instead.'
+            )
+
+        # Records are serialized before file is opened, so a serialization error doesn't leave partial lines
+        encoded = io.BytesIO()
+        offsets = self.__write_lines(encoded, records, codec, 65536)
+
+        with path_lock(path):
+            # Writes always go to the end of file; reading is needed to check the last byte
+            file = open(path, "a+b")
+            try:
+                end = file.seek(0, os.SEEK_END)
+                if end > 0:
+                    file.seek(end - 1)
+                    if file.read(1) != b"\n":
+                        # Last line must be terminated, otherwise the first record would be glued to it
+                        file.write(b"\n")
+                        end += 1
+                file.write(encoded.getvalue())
+                if fsync != "none":
+                    file.flush()
+                    os.fsync(file.fileno())
+            finally:
+                file.close()
+
+        if fsync == "directory":
+            self.__fsync_directory(os.path.dirname(os.path.realpath(path)))
+        return [end + offset for offset in offsets]
+
+    def __write_atomic(
+        self,
+        path: str,
+        json: Any,
+        indent: int,
+        codec: JsonCodec,
+        create_file: bool,
+        buffer_size: int,
+        fsync: str,
+    ) -> None:
+        if create_file and os.path.exists(path):
+            raise FileExistsError(f"File `{path}` already exists.")
+
+        # Temporary file must be on the same file system, otherwise rename is not atomic
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path)
+        )
+        try:
+            file = os.fdopen(fd, "wb")
+            try:
+                self.__write_to(file, json, indent, codec, buffer_size)
+                file.flush()
+                if fsync != "none":
+                    os.fsync(file.fileno())
+            finally:
+                file.close()
+
+            # `mkstemp` creates files readable only by owner; keep permissions of the original file
+            if os.path.exists(path):
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+            else:
+                os.chmod(tmp_path, 0o666 & ~_get_umask())
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def __fsync_directory(self, directory: str) -> None:
+        # Directories cannot be opened (and synced) on Windows
+        if os.name == "nt":
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+# Supported durability policies (see `service.write_json_file`)
+FSYNC_POLICIES = ("none", "file", "directory")
+
+# Supported cross-process locking modes (see `FileLock`)
+LOCKING_MODES = ("none", "lock", "optimistic")
+
+# Extensions of JSON Lines files (see `service.is_json_lines`)
+JSON_LINES_FORMATS = (".jsonl", ".ndjson")
+
+# Passed as `indent` to select JSON Lines format
+_JSON_LINES = object()
+
+_umask = None
+
+
+def _get_umask() -> int:
+    # Umask can only be read by changing it, so it's read once and cached
+    global _umask
+    if _umask is None:
+        _umask = os.umask(0)
+        os.umask(_umask)
+    return _umask
+
+
+# Marker for omitted arguments (`None` is a valid JSON value)
+_NOT_SET = object()
+
+
+class CopyOnWrite:
+    """
+    Copy-on-write tracker for JSON objects.
+
+    Active object starts as the same tree as backup. Before a node is
+    modified, this class copies it (and all of its parents) so backup stays
+    untouched, while all other nodes are still shared between both objects.
+    Each node is copied only once, on the first write.
+    """
+
+    def __init__(self):
+        # ids of nodes that were copied and belong to active object only
+        self.__owned = set()
+
+    def reset(self) -> None:
+        """
+        Forget all copied nodes (e.g. after active object is replaced with backup).
+        """
+        self.__owned.clear()
+
+    def __own(self, node: Any) -> Any:
+        if id(node) in self.__owned:
+            return node
+        node = node.copy()
+        self.__owned.add(id(node))
+        return node
+
+    def own_items(self, array: list) -> list:
+        """
+        Copy all objects and arrays stored in an (already copied) array,
+        so they can be modified in place.
+        """
+        for index, value in enumerate(array):
+            value_type = type(value)
+            if value_type == dict or value_type == list:
+                array[index] = self.__own(value)
+        return array
+
+    def __own_steps(self, json: Any, steps: tuple, expected: Any = _NOT_SET) -> tuple:
+        # Copies every container along given steps. Returns `(False, None)` if steps
+        # don't fit the tree or don't lead to `expected` node (if it's provided)
+        node = json
+        original = json
+        for step in steps:
+            if isinstance(node, dict):
+                if type(step) != str or step not in node:
+                    return False, None
+            elif isinstance(node, list):
+                if type(step) != int or not -len(node) <= step < len(node):
+                    return False, None
+            else:
+                return False, None
+            original = node[step]
+            child = original
+            child_type = type(child)
+            if child_type == dict or child_type == list:
+                child = self.__own(child)
+                node[step] = child
+            node = child
+        if expected is not _NOT_SET and original is not expected:
+            return False, None
+        return True, node
+
+    def __own_all(self, json: Any) -> Any:
+        json = self.__own(json)
+        if type(json) == dict:
+            for key, value in json.items():
+                value_type = type(value)
+                if value_type == dict or value_type == list:
+                    json[key] = self.__own_all(value)
+        elif type(json) == list:
+            for index, value in enumerate(json):
+                value_type = type(value)
+                if value_type == dict or value_type == list:
+                    json[index] = self.__own_all(value)
+        return json
+
+    def resolve_json_path(self, path: str, json: dict) -> tuple:
+        """
+        Find all values matched by JSON path and prepare them for modification.
+
+        Parameters: `path : str` specifies property path that needs to be resolved.
+        `json : dict` specifies active JSON object.
+
+        This function returns a tuple of two items: active object (its root
+        is copied on the first write, so caller must store it) and a list of
+        matched values that can be safely modified in place.
+
+        This function raises a `IncorrectFunctionParameterTypeError` exception if one or more of its parameters have incorrect types.
+        This function raises a `JSONPathError` exception is JSON path is equal to an empty string.
+        """
+        if type(path) != str:
+            raise IncorrectFunctionParameterTypeError(
+                "path", "str", type(path).__name__
+            )
+
+        if path == "":
+            raise JSONPathError("JSON path is empty.")
+
+        if type(json) != dict and type(json) != list:
+            raise IncorrectFunctionParameterTypeError(
+                "json", "dict or list", type(json).__name__
+            )
+
+        js_expr = path_cache.get(path)
+        json = self.__own(json)
+
+        if js_expr.is_simple:
+            # Simple paths are copied while they are resolved
+            if not js_expr.find(json):
+                return json, []
+            return json, [self.__own_steps(json, js_expr.steps)[1]]
+
+        matches = []
+        for item in js_expr.expression.find(json):
+            steps = []
+            datum = item
+            while datum is not None:
+                if isinstance(datum.path, Fields) and len(datum.path.fields) == 1:
+                    steps.append(datum.path.fields[0])
+                elif isinstance(datum.path, Index):
+                    indices = getattr(datum.path, "indices", None)
+                    steps.append(indices[0] if indices else datum.path.index)
+                elif not isinstance(datum.path, (This, Root)):
+                    steps = None
+                    break
+                datum = datum.context
+
+            if steps is not None:
+                steps.reverse()
+                found, value = self.__own_steps(json, tuple(steps), item.value)
+                if found:
+                    matches.append(value)
+                    continue
+
+            # Location of this match cannot be tracked (e.g. it's a computed value),
+            # so the whole object is copied
+            json = self.__own_all(json)
+            return json, [item.value for item in js_expr.expression.find(json)]
+        return json, matches
+
+
+class BatchLog:
+    """
+    Undo log for `batch()` blocks.
+
+    Before a container (object or array) is modified inside a batch, this
+    class stores its shallow copy. If batch fails, every recorded container is
+    restored in place, which costs O(size of modified containers) instead of
+    copying the whole object when batch starts. Batches can be nested.
+    """
+
+    def __init__(self):
+        # One [root, {id: (container, shallow copy)}, changed] entry per open batch
+        self.__levels = []
+
+    @property
+    def active(self) -> bool:
+        """
+        `True` if at least one batch is open.
+        """
+        return bool(self.__levels)
+
+    def begin(self, root: Any) -> None:
+        """
+        Open a batch. `root` specifies active object at the beginning of the batch.
+        """
+        self.__levels.append([root, {}, False])
+
+    def touch(self, node: Any) -> None:
+        """
+        Record the state of a container that is about to be modified.
+        """
+        if not self.__levels:
+            return
+        undo = self.__levels[-1][1]
+        if id(node) not in undo and isinstance(node, (dict, list)):
+            undo[id(node)] = (node, node.copy())
+
+    def mark_changed(self) -> None:
+        """
+        Mark the innermost batch as changed.
+        """
+        self.__levels[-1][2] = True
+
+    def commit(self) -> bool:
+        """
+        Close the innermost batch and keep its changes.
+
+        This function returns `True` if the outermost batch was closed and
+        active object has been changed.
+        """
+        _, undo, changed = self.__levels.pop()
+        if not self.__levels:
+            return changed
+        # Outer batch needs to be able to undo changes of the inner one
+        outer = self.__levels[-1]
+        for key, record in undo.items():
+            outer[1].setdefault(key, record)
+        outer[2] = outer[2] or changed
+        return False
+
+    def rollback(self) -> Any:
+        """
+        Close the innermost batch and restore all containers it has modified.
+
+        This function returns active object from the beginning of the batch.
+        """
+        root, undo, _ = self.__levels.pop()
+        for node, state in undo.values():
+            if type(node) == list:
+                node[:] = state
+            else:
+                node.clear()
+                node.update(state)
+        return root
+
+
+class ReadWriteLock:
+    """
+    Reader/writer lock used by parsers in thread-safe mode.
+
+    Any number of threads can hold the lock for reading (`with lock.reader:`),
+    while only one thread can hold it for writing (`with lock:`). Writers are
+    preferred: once a writer is waiting, new readers wait as well, so a stream
+    of readers can't starve it. Lock is reentrant: a writer can acquire it again
+    (for reading or writing), and a reader can acquire it again for reading.
+    A reader can't acquire it for writing (this raises a `RuntimeError`).
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__depth = 0
+        self.__waiting_writers = 0
+        self.__local = threading.local()
+        self.reader = _ReaderLock(self)
+
+    def acquire_read(self) -> None:
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+            held = getattr(self.__local, "reads", 0)
+            if not held:
+                while self.__writer is not None or self.__waiting_writers:
+                    self.__condition.wait()
+                self.__readers += 1
+            self.__local.reads = held + 1
+
+    def release_read(self) -> None:
+        with self.__condition:
+            if self.__writer == threading.get_ident():
+                self.__depth -= 1
+                return
+            self.__local.reads -= 1
+            if not self.__local.reads:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__condition.notify_all()
+
+    def acquire(self) -> None:
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+            if getattr(self.__local, "reads", 0):
+                raise RuntimeError("Lock held for reading cannot be acquired for writing.")
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = me
+            self.__depth = 1
+
+    def release(self) -> None:
+        with self.__condition:
+            self.__depth -= 1
+            if not self.__depth:
+                self.__writer = None
+                self.__condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class _ReaderLock:
+    # Context manager that holds `ReadWriteLock` for reading
+
+    def __init__(self, lock: ReadWriteLock):
+        self.__lock = lock
+
+    def __enter__(self):
+        self.__lock.acquire_read()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__lock.release_read()
+
+
+class Journal:
+    """
+    Append-only journal of changes, stored next to JSON file (`<path>.journal`).
+
+    Journal is a JSON Lines file. Its first line (header) identifies the state of
+    JSON file (size and modification time) the changes apply to; each following line
+    is one operation. When JSON file is rewritten, journal is discarded. Journal whose
+    header doesn't match JSON file (e.g. file was rewritten, but journal could not be
+    removed because of a crash) is stale and is ignored.
+
+    Parameters: `path : str` specifies path to JSON file. `codec : JsonCodec` specifies
+    codec used for operations. `fsync : str` specifies durability policy (see `service.write_json_file`).
+    """
+
+    # Header is padded to a fixed size, so it can be rewritten in place
+    HEADER_SIZE = 64
+
+    def __init__(self, path: str, codec: JsonCodec = None, fsync: str = "none"):
+        self.__base_path = path
+        self.path = path + ".journal"
+        self.__codec = get_codec(codec)
+        self.__fsync = fsync
+        self.__file = None
+
+    def __header(self) -> bytes:
+        info = os.stat(self.__base_path)
+        header = JSON.dumps({"base": [info.st_size, info.st_mtime_ns]}).encode("utf-8")
+        return header.ljust(self.HEADER_SIZE - 1) + b"\n"
+
+    @property
+    def size(self) -> int:
+        """
+        Size of journal file in bytes (0 if it doesn't exist).
+        """
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read(self) -> list:
+        """
+        Read operations from journal.
+
+        Stale journal is removed. A truncated last line (e.g. after a crash
+        in the middle of writing) is ignored.
+
+        This function returns a list of operations.
+
+        This function raises a `ValueError` if journal is malformed.
+        """
+        self.close()
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        try:
+            header = file.read(self.HEADER_SIZE)
+            lines = file.read().split(b"\n")
+        finally:
+            file.close()
+
+        if header != self.__header():
+            self.discard()
+            return []
+
+        operations = []
+        for number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                operations.append(self.__codec.loads(line))
+            except ValueError:
+                if number == len(lines) - 1:
+                    # Last line was not written completely
+                    break
+                raise
+        return operations
+
+    def write(self, operations: list) -> None:
+        """
+        Append operations to journal (journal is created if needed).
+        """
+        if self.__file is None:
+            created = not os.path.exists(self.path)
+            self.__file = open(self.path, "ab")
+            if created or self.__file.tell() == 0:
+                self.__file.write(self.__header())
+        else:
+            created = False
+
+        data = b"".join(
+            self.__codec.dumps(operation).encode("utf-8") + b"\n" for operation in operations
+        )
+        self.__file.write(data)
+        self.__file.flush()
+        if self.__fsync != "none":
+            os.fsync(self.__file.fileno())
+        if created and self.__fsync == "directory" and os.name != "nt":
+            fd = os.open(os.path.dirname(os.path.realpath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def rebase(self) -> None:
+        """
+        Point journal to the current state of JSON file (after it has been
+        reformatted without changing its content).
+        """
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        file = open(self.path, "r+b")
+        try:
+            file.write(self.__header())
+            if self.__fsync != "none":
+                file.flush()
+                os.fsync(file.fileno())
+        finally:
+            file.close()
+
+    def discard(self) -> None:
+        """
+        Remove journal (after JSON file has been rewritten).
+        """
+        self.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        """
+        Close journal file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+class FileLock:
+    """
+    Advisory lock shared by processes working with the same JSON file.
+
+    Lock is held on a separate file (`<path>.lock`), because JSON file itself
+    can be replaced by atomic writes. Lock file also stores a generation counter,
+    which is incremented each time JSON file is written under the lock, so
+    changes are detected even if file size and modification time are the same.
+    Lock can be acquired again while it is held (shared lock can't be upgraded, though).
+    Lock belongs to the thread that holds it: other threads of the same process wait until
+    it is released (file locks alone don't exclude threads that share the lock file).
+
+    Parameters: `path : str` specifies path to JSON file.
+
+    This class raises an `OSError` if file locking is not supported on this platform.
+    """
+
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise OSError("File locking is not supported on this platform.")
+
+        self.path = path + ".lock"
+        self.__fd = None
+        self.__depth = 0
+        self.__exclusive = False
+        # Guards depth counter and lock file descriptor
+        self.__thread_lock = threading.RLock()
+
+    def __open(self) -> int:
+        if self.__fd is None:
+            self.__fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        return self.__fd
+
+    @contextlib.contextmanager
+    def hold(self, exclusive: bool = True):
+        """
+        Hold lock inside `with` block (`exclusive` lock for writing, shared lock for reading).
+        """
+        with self.__thread_lock:
+            if self.__depth:
+                if exclusive and not self.__exclusive:
+                    raise RuntimeError("Shared file lock cannot be upgraded to an exclusive one.")
+                self.__depth += 1
+                try:
+                    yield
+                finally:
+                    self.__depth -= 1
+                return
+
+            fd = self.__open()
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.__depth = 1
+            self.__exclusive = exclusive
+            try:
+                yield
+            finally:
+                self.__depth = 0
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    @property
+    def generation(self) -> int:
+        """
+        Number of times JSON file has been written under the lock.
+        """
+        with self.__thread_lock:
+            data = os.pread(self.__open(), 8, 0)
+        return int.from_bytes(data, "little") if len(data) == 8 else 0
+
+    def advance(self) -> None:
+        """
+        Register a write of JSON file (exclusive lock must be held).
+        """
+        os.pwrite(self.__open(), (self.generation + 1).to_bytes(8, "little"), 0)
+
+    def close(self) -> None:
+        """
+        Close lock file (unless lock is held).
+        """
+        if not self.__thread_lock.acquire(blocking=False):
+            # Lock is held by another thread
+            return
+        try:
+            if self.__fd is not None and not self.__depth:
+                os.close(self.__fd)
+                self.__fd = None
+        finally:
+            self.__thread_lock.release()
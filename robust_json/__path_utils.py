@@ -0,0 +1,250 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+###############################
+# * This file contains JSON path compiler
+# * and a fast evaluator for simple paths
+###############################
+
+import re
+import jsonpath_ng.ext as jsonpath
+
+# Plain field name, as accepted by `jsonpath_ng` lexer (without '@' and non-ASCII names)
+_FIELD_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_\-]*")
+# Quoted field name without escape sequences
+_QUOTED_RE = re.compile(r"'([^'\\]+)'|\"([^\"\\]+)\"")
+# Single array index
+_INDEX_RE = re.compile(r"\[(-?\d+)\]")
+
+# Words that have a special meaning for `jsonpath_ng` lexer
+_RESERVED_WORDS = {"where", "wherenot", "true", "false"}
+
+
+def tokenize_simple_path(path: str) -> tuple:
+    """
+    Split simple JSON path into steps.
+
+    Simple path consists only of field names and single array indexes
+    (e.g. `$.field1.field2[3].field3`, `field1.[0]` or `$`). Paths with
+    wildcards, filters, slices, recursive descent, etc. are not simple.
+
+    Parameters: `path : str` specifies JSON path that needs to be split.
+
+    This function returns a tuple of steps (`str` for field names and `int`
+    for array indexes). If path is not simple, this function returns `None`.
+    """
+    pos = 0
+    end = len(path)
+    steps = []
+
+    if path.startswith("$"):
+        pos = 1
+        if pos == end:
+            return ()
+        if path[pos] not in ".[":
+            return None
+        expect_field = False
+    else:
+        expect_field = True
+
+    while pos < end:
+        if expect_field:
+            # Field name (or an index when path starts with one)
+            match = _FIELD_RE.match(path, pos)
+            if match:
+                if match.group() in _RESERVED_WORDS:
+                    return None
+                steps.append(match.group())
+                pos = match.end()
+            else:
+                match = _QUOTED_RE.match(path, pos)
+                if match:
+                    field = match.group(1) or match.group(2)
+                    if field == "*":
+                        return None
+                    steps.append(field)
+                    pos = match.end()
+                elif not steps and path.startswith("[", pos):
+                    expect_field = False
+                    continue
+                else:
+                    return None
+            expect_field = False
+            continue
+
+        char = path[pos]
+        if char == ".":
+            pos += 1
+            if pos == end or path[pos] == ".":
+                # Trailing dot or recursive descent
+                return None
+            if path[pos] == "[":
+                continue
+            expect_field = True
+        elif char == "[":
+            match = _INDEX_RE.match(path, pos)
+            if not match:
+                return None
+            steps.append(int(match.group(1)))
+            pos = match.end()
+        else:
+            return None
+
+    if expect_field:
+        return None
+    return tuple(steps)
+
+
+def find_steps(json, steps: tuple) -> list:
+    """
+    Follow steps produced by `tokenize_simple_path`.
+
+    Parameters: `json : Any` specifies JSON object to be searched.
+    `steps : tuple` specifies steps that need to be followed.
+
+    This function returns a list with the matched value (the same list
+    `jsonpath_ng` would produce). If nothing is found, this list will be empty.
+    """
+    node = json
+    for step in steps:
+        if type(step) == str:
+            if not isinstance(node, dict) or step not in node:
+                return []
+            node = node[step]
+        else:
+            # Integer indexes apply to sequences, not mappings
+            if isinstance(node, dict) or not isinstance(node, (list, str)):
+                return []
+            if not -len(node) <= step < len(node):
+                return []
+            node = node[step]
+    return [node]
+
+
+class CompiledJsonPath:
+    """
+    Compiled JSON path.
+
+    Simple paths (see `tokenize_simple_path`) are evaluated directly with
+    dictionary and list indexing. All other paths are handled by `jsonpath_ng`.
+    Both ways produce the same matches.
+
+    Parameters: `path : str` specifies JSON path that needs to be compiled.
+
+    This class raises any exceptions raised by `jsonpath_ng` parser
+    if JSON path cannot be compiled.
+    """
+
+    __slots__ = ("path", "steps", "__expression")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.steps = tokenize_simple_path(path)
+        if self.steps is None:
+            self.__expression = jsonpath.parse(path)
+        else:
+            self.__expression = None
+
+    @property
+    def is_simple(self) -> bool:
+        """
+        `True` if this path can be evaluated without `jsonpath_ng`.
+        """
+        return self.steps is not None
+
+    @property
+    def expression(self):
+        """
+        Compiled `jsonpath_ng` expression (compiled on demand for simple paths).
+        """
+        if self.__expression is None:
+            self.__expression = jsonpath.parse(self.path)
+        return self.__expression
+
+    def find(self, json) -> list:
+        """
+        Find all values matched by this path.
+
+        Parameters: `json : Any` specifies JSON object to be searched.
+
+        This function returns a list with all matched values. If nothing
+        is found, this list will be empty.
+        """
+        if self.steps is None:
+            return [item.value for item in self.__expression.find(json)]
+        return find_steps(json, self.steps)
+
+
+class JsonPathTrie:
+    """
+    Set of compiled JSON paths that are resolved together.
+
+    Steps of simple paths are stored in a trie, so common prefixes
+    (e.g. `config.db` in `config.db.host` and `config.db.port`) are followed
+    only once and the whole set is resolved in a single walk of the object.
+    Other paths are evaluated by `jsonpath_ng` one by one.
+
+    Parameters: `paths : list` specifies `CompiledJsonPath` objects.
+    """
+
+    __slots__ = ("__root", "__simple", "__complex")
+
+    def __init__(self, paths: list):
+        # Trie node: [paths that end here, {field: child node}, {index: child node}]
+        self.__root = [[], {}, {}]
+        self.__simple = []
+        self.__complex = []
+        for path in paths:
+            if path.steps is None:
+                self.__complex.append(path)
+                continue
+            node = self.__root
+            for step in path.steps:
+                children = node[1] if type(step) == str else node[2]
+                child = children.get(step)
+                if child is None:
+                    child = children[step] = [[], {}, {}]
+                node = child
+            node[0].append(path.path)
+            self.__simple.append(path.path)
+
+    def find(self, json) -> dict:
+        """
+        Find values matched by all paths.
+
+        Parameters: `json : Any` specifies JSON object to be searched.
+
+        This function returns a Python dictionary that maps each path to a list
+        with all its matches (the same list `CompiledJsonPath.find` would return).
+        """
+        res = dict.fromkeys(self.__simple, ())
+        _walk(json, self.__root, res)
+        for path in res:
+            res[path] = list(res[path])
+        for path in self.__complex:
+            res[path.path] = path.find(json)
+        return res
+
+
+def _walk(value, node, res: dict) -> None:
+    # Follows all branches of `JsonPathTrie` node (same rules as in `find_steps`)
+    for path in node[0]:
+        res[path] = (value,)
+    if isinstance(value, dict):
+        for step, child in node[1].items():
+            if step in value:
+                _walk(value[step], child, res)
+    elif isinstance(value, (list, str)) and node[2]:
+        size = len(value)
+        for step, child in node[2].items():
+            if -size <= step < size:
+                _walk(value[step], child, res)
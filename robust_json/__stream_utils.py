@@ -0,0 +1,476 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+###############################
+# * This file contains incremental JSON reader
+# * used by lazy mode of `JsonFileParser`
+###############################
+
+import re
+import mmap
+from array import array
+from collections import deque
+from typing import Any
+
+from robust_json.codec import JsonCodec, get_codec
+from robust_json.__path_utils import find_steps
+
+_WHITESPACE_RE = re.compile(rb"[ \t\n\r]*")
+# Everything up to the next bracket, including complete strings ("unrolled" so it cannot backtrack exponentially)
+_CONTENT_RE = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+# Complete string
+_FULL_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+# Characters that matter inside a string
+_STRING_RE = re.compile(rb'["\\]')
+# Numbers, `true`, `false` and `null`
+_SCALAR_RE = re.compile(rb"[^\s,\]}:]*")
+
+_BOM = b"\xef\xbb\xbf"
+
+_OBJECT_START = ord("{")
+_OBJECT_END = ord("}")
+_ARRAY_START = ord("[")
+_ARRAY_END = ord("]")
+_QUOTE = ord('"')
+_COMMA = ord(",")
+_COLON = ord(":")
+
+
+class JsonStreamReader:
+    """
+    Incremental reader of UTF-8 JSON documents.
+
+    File is read in chunks of `chunk_size` bytes. Values that are not needed
+    are skipped without being decoded, and only requested values are
+    deserialized, so memory usage is bounded by the chunk size plus the size
+    of the largest requested value, regardless of the document size.
+    Content of skipped values is not validated.
+
+    Parameters: `source` specifies a file opened in binary mode or a buffer with the whole
+    document (`bytes` or `mmap.mmap`; a memory-mapped file is scanned in place, without
+    reading it in chunks). `codec : JsonCodec` specifies codec used for deserializing
+    requested values. `chunk_size : int` specifies how many bytes are read at once.
+
+    All methods of this class raise a `ValueError` if document is malformed.
+    """
+
+    def __init__(self, source, codec: JsonCodec = None, chunk_size: int = 65536):
+        self.__codec = get_codec(codec)
+        self.__chunk_size = chunk_size
+        # Position in buffer and offset of buffer's first byte in file
+        self.__pos = 0
+        self.__offset = 0
+        # Offset (in file) of a value that is being captured
+        self.__keep = None
+
+        if isinstance(source, (bytes, mmap.mmap)):
+            self.__file = None
+            self.__buffer = source
+            self.__eof = True
+        else:
+            self.__file = source
+            self.__buffer = b""
+            self.__eof = False
+            self.__fill()
+
+        if self.__buffer[: len(_BOM)] == _BOM:
+            self.__pos = len(_BOM)
+
+    def __fill(self) -> bool:
+        # Reads next chunk, dropping consumed part of the buffer
+        if self.__eof:
+            return False
+        data = self.__file.read(self.__chunk_size)
+        if not data:
+            self.__eof = True
+            return False
+        if self.__keep is None:
+            cut = self.__pos
+        else:
+            cut = self.__keep - self.__offset
+        self.__buffer = self.__buffer[cut:] + data
+        self.__offset += cut
+        self.__pos -= cut
+        return True
+
+    def __error(self, message: str):
+        return ValueError(f"{message} (char {self.__offset + self.__pos}).")
+
+    def tell(self) -> int:
+        """
+        Offset of the current position in file.
+        """
+        return self.__offset + self.__pos
+
+    def seek(self, offset: int) -> None:
+        """
+        Move to given offset in file.
+        """
+        if self.__file is None:
+            self.__pos = offset
+            return
+        self.__file.seek(offset)
+        self.__buffer = b""
+        self.__pos = 0
+        self.__offset = offset
+        self.__eof = False
+
+    def peek(self) -> int:
+        """
+        Skip whitespace and return the next byte without consuming it.
+        If document has ended, this function returns `None`.
+        """
+        while True:
+            self.__pos = _WHITESPACE_RE.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                return None
+
+    def __expect(self, char: int) -> None:
+        if self.peek() != char:
+            raise self.__error(f"Expecting '{chr(char)}'")
+        self.__pos += 1
+
+    def __skip_string(self) -> None:
+        # Current position is right after the opening quote
+        while True:
+            match = _STRING_RE.search(self.__buffer, self.__pos)
+            if match is None:
+                self.__pos = len(self.__buffer)
+                if not self.__fill():
+                    raise self.__error("Unterminated string")
+                continue
+            if match.group() == b'"':
+                self.__pos = match.end()
+                return
+            # Escape sequence: skip backslash and the escaped character
+            if match.end() + 1 > len(self.__buffer):
+                self.__pos = match.start()
+                if not self.__fill():
+                    raise self.__error("Unterminated string")
+                continue
+            self.__pos = match.end() + 1
+
+    def __skip_container(self) -> None:
+        # Current position is right after the opening bracket
+        depth = 1
+        while True:
+            self.__pos = _CONTENT_RE.match(self.__buffer, self.__pos).end()
+            if self.__pos >= len(self.__buffer):
+                if not self.__fill():
+                    raise self.__error("Unterminated object or array")
+                continue
+            char = self.__buffer[self.__pos]
+            self.__pos += 1
+            if char == _QUOTE:
+                # String doesn't end within the buffer
+                self.__skip_string()
+            elif char == _OBJECT_START or char == _ARRAY_START:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def __skip_scalar(self) -> None:
+        while True:
+            end = _SCALAR_RE.match(self.__buffer, self.__pos).end()
+            if end < len(self.__buffer) or not self.__fill():
+                break
+        if end == self.__pos:
+            raise self.__error("Expecting value")
+        self.__pos = end
+
+    def skip_value(self) -> None:
+        """
+        Skip the next value without deserializing it.
+        """
+        char = self.peek()
+        if char is None:
+            raise self.__error("Expecting value")
+        if char == _QUOTE:
+            match = _FULL_STRING_RE.match(self.__buffer, self.__pos)
+            if match is not None:
+                self.__pos = match.end()
+            else:
+                self.__pos += 1
+                self.__skip_string()
+        elif char == _OBJECT_START or char == _ARRAY_START:
+            self.__pos += 1
+            self.__skip_container()
+        else:
+            self.__skip_scalar()
+
+    def __capture(self) -> bytes:
+        # Skips the next value and returns its raw bytes
+        self.peek()
+        self.__keep = self.tell()
+        try:
+            self.skip_value()
+            return self.__buffer[self.__keep - self.__offset : self.__pos]
+        finally:
+            self.__keep = None
+
+    def read_value(self) -> Any:
+        """
+        Deserialize the next value.
+        """
+        return self.__codec.loads(self.__capture())
+
+    def __read_key(self) -> str:
+        if self.peek() != _QUOTE:
+            raise self.__error("Expecting property name enclosed in double quotes")
+        raw = self.__capture()
+        self.__expect(_COLON)
+        if b"\\" in raw:
+            return self.__codec.loads(raw)
+        return raw[1:-1].decode("utf-8")
+
+    def __after_item(self, end: int) -> bool:
+        # Consumes a separator; returns `False` if container has ended
+        char = self.peek()
+        self.__pos += 1
+        if char == _COMMA:
+            return True
+        if char == end:
+            return False
+        raise self.__error(f"Expecting ',' or '{chr(end)}' delimiter")
+
+    def __find_key(self, key: str) -> bool:
+        # Current position is right after '{'
+        if self.peek() == _OBJECT_END:
+            self.__pos += 1
+            return False
+        while True:
+            if self.__read_key() == key:
+                return True
+            self.skip_value()
+            if not self.__after_item(_OBJECT_END):
+                return False
+
+    def __find_index(self, index: int) -> bool:
+        # Current position is right after '['
+        if self.peek() == _ARRAY_END:
+            self.__pos += 1
+            return False
+
+        if index >= 0:
+            current = 0
+            while current < index:
+                self.skip_value()
+                if not self.__after_item(_ARRAY_END):
+                    return False
+                current += 1
+            return True
+
+        # Negative index: remember where the last items start, then go back
+        starts = deque(maxlen=-index)
+        while True:
+            self.peek()
+            starts.append(self.tell())
+            self.skip_value()
+            if not self.__after_item(_ARRAY_END):
+                break
+        if len(starts) < -index:
+            return False
+        self.seek(starts[0])
+        return True
+
+    def __step(self, step) -> bool:
+        # Moves into the child of the next value; returns `False` if there is no such child
+        char = self.peek()
+        if char == _OBJECT_START and type(step) == str:
+            self.__pos += 1
+            return self.__find_key(step)
+        if char == _ARRAY_START and type(step) == int:
+            self.__pos += 1
+            return self.__find_index(step)
+        if char is None:
+            raise self.__error("Expecting value")
+        return False
+
+    def locate(self, steps: tuple) -> bool:
+        """
+        Move to the value at the end of a simple JSON path.
+
+        Reader must be positioned at the beginning of the document. If an
+        object contains the same key several times, the first one is used.
+
+        Parameters: `steps : tuple` specifies steps produced by `tokenize_simple_path`.
+
+        This function returns `True` if the value is found.
+        """
+        for step in steps:
+            if not self.__step(step):
+                return False
+        return True
+
+    def find(self, steps: tuple) -> tuple:
+        """
+        Find and deserialize the value at the end of a simple JSON path.
+
+        Works like `locate`, but strings can be indexed as well.
+
+        Parameters: `steps : tuple` specifies steps produced by `tokenize_simple_path`.
+
+        This function returns a tuple of two items: `True` and the deserialized
+        value if it is found, `(False, None)` otherwise.
+        """
+        for number, step in enumerate(steps):
+            if self.peek() == _QUOTE and type(step) == int:
+                # Indexing a string: the rest is evaluated in memory
+                res = find_steps(self.read_value(), steps[number:])
+                if not res:
+                    return False, None
+                return True, res[0]
+            if not self.__step(step):
+                return False, None
+        return True, self.read_value()
+
+    def start_array(self) -> bool:
+        """
+        Enter the array at the current position.
+
+        This function returns `False` if the next value is not an array.
+        """
+        if self.peek() != _ARRAY_START:
+            return False
+        self.__pos += 1
+        return True
+
+    def iter_array(self):
+        """
+        Deserialize items of the array entered with `start_array` one by one.
+
+        This function returns a generator.
+        """
+        if self.peek() == _ARRAY_END:
+            self.__pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if not self.__after_item(_ARRAY_END):
+                return
+
+
+class JsonLinesReader:
+    """
+    Reader of JSON Lines files (one JSON value per line).
+
+    Records are read line by line, so memory usage is bounded by the size
+    of the largest record. Blank lines are ignored.
+
+    Parameters: `source` specifies a file opened in binary mode or a `mmap.mmap` object.
+    `codec : JsonCodec` specifies codec used for deserializing records. `line_index : list`
+    specifies offsets of all records in file (see `build_line_index`); if provided, records are
+    accessed by index without reading preceding lines. `tail : list` specifies records that
+    are not written to file yet; they follow records from file.
+
+    All methods of this class raise a `ValueError` if a record is malformed.
+    """
+
+    def __init__(self, source, codec: JsonCodec = None, line_index: array = None, tail: list = ()):
+        self.__source = source
+        self.__codec = get_codec(codec)
+        self.__line_index = line_index
+        self.__tail = tail
+
+    @staticmethod
+    def build_line_index(source) -> list:
+        """
+        Collect offsets of all records (non-blank lines) in file.
+
+        This function returns an array of 64-bit integers.
+        """
+        offsets = array("q")
+        offset = 0
+        source.seek(0)
+        for line in iter(source.readline, b""):
+            if line.strip():
+                offsets.append(offset)
+            offset += len(line)
+        return offsets
+
+    def __records(self):
+        # Raw lines of all records in file
+        self.__source.seek(0)
+        for line in iter(self.__source.readline, b""):
+            if line.strip():
+                yield line
+
+    def iter_records(self):
+        """
+        Deserialize records one by one.
+
+        This function returns a generator.
+        """
+        for line in self.__records():
+            yield self.__codec.loads(line)
+        yield from self.__tail
+
+    def record(self, index: int) -> tuple:
+        """
+        Get record by its index (negative indexes count from the end).
+
+        This function returns a tuple of two items: `True` and the record
+        if it exists, `(False, None)` otherwise.
+        """
+        tail = self.__tail
+        if index < 0:
+            if -index <= len(tail):
+                return True, tail[index]
+            # Index of the record among records from file
+            index += len(tail)
+
+        if self.__line_index is not None:
+            count = len(self.__line_index)
+            if -count <= index < count:
+                self.__source.seek(self.__line_index[index])
+                return True, self.__codec.loads(self.__source.readline())
+        elif index >= 0:
+            count = 0
+            for line in self.__records():
+                if count == index:
+                    return True, self.__codec.loads(line)
+                count += 1
+        else:
+            # Only the last `-index` lines are kept
+            last = deque(self.__records(), maxlen=-index)
+            count = len(last)
+            if count == -index:
+                return True, self.__codec.loads(last[0])
+
+        if 0 <= index - count < len(tail):
+            return True, tail[index - count]
+        return False, None
+
+    def find(self, steps: tuple) -> tuple:
+        """
+        Find the value at the end of a simple JSON path (records form the root array).
+
+        Parameters: `steps : tuple` specifies steps produced by `tokenize_simple_path`.
+
+        This function returns a tuple of two items: `True` and the deserialized
+        value if it is found, `(False, None)` otherwise.
+        """
+        if not steps:
+            return True, list(self.iter_records())
+        if type(steps[0]) != int:
+            return False, None
+        found, record = self.record(steps[0])
+        if not found:
+            return False, None
+        res = find_steps(record, steps[1:])
+        if not res:
+            return False, None
+        return True, res[0]
@@ -0,0 +1,270 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+################################
+# * This file contains `AsyncJsonFileParser` class,
+# * an asyncio counterpart of `JsonFileParser`
+################################
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+
+# Misc import
+from typing import Union, Any
+
+# Other modules import
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+
+
+class AsyncJsonFileParser:
+    """
+    This class provides asyncio-friendly functionality for working with JSON files.
+
+    It wraps a `JsonFileParser`: all methods that read or write files or parse and
+    serialize JSON (`load`, `save_to_file`, `minify`, `prettify`, `append`, `update_value`,
+    `delete`, `update_many`, `delete_many`, `reverse_array`, `create_index`, `flush` and `close`; mutations are offloaded because they can trigger autosave)
+    run in `executor`, so the event loop is never blocked by disk or codec work.
+    Reads (`get_key_value` and `lookup`) run in `executor` as well: underlying parser
+    is always thread-safe (see `thread_safe` parameter of `JsonFileParser`), so they wait
+    for changes and saves running in other executor threads, and the event loop doesn't wait for them.
+    Concurrent writes to the same file are serialized, even if they come
+    from different parsers.
+
+    Parameters: `path : str` specifies path to the source file. `executor : concurrent.futures.Executor`
+    specifies executor used for blocking work. If not provided, event loop's default executor is used.
+    All other parameters (`autosave`, `codec`, `atomic_write`, `autosave_policy`, etc.) are passed
+    to `JsonFileParser` (see its documentation).
+
+    File is not read when class instance is created: call `await load()` or use
+    `async with` statement first.
+
+    This class raises an `IncorrectFunctionParameterTypeError` if `executor` parameter has an incorrect type.
+    This class raises a `ValueError` if `thread_safe` parameter is set to `False`.
+
+    Examples:
+
+    >>> from robust_json.aio import AsyncJsonFileParser
+    >>> async with AsyncJsonFileParser('data.json', autosave=True) as op:
+    ...     await op.update_value('$', 'counter', 1)
+    ...     print(await op.get_key_value('counter'))
+    # Output: 1
+
+    For more information please visit:
+    https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#async-module-overview
+    """
+
+    def __init__(self, path, executor: Executor = None, **kwargs):
+        if executor is not None and not isinstance(executor, Executor):
+            raise IncorrectFunctionParameterTypeError(
+                "executor", "Executor", type(executor).__name__
+            )
+
+        # Parser is used by several executor threads at once
+        kwargs.setdefault("thread_safe", True)
+        if kwargs["thread_safe"] is False:
+            raise ValueError("AsyncJsonFileParser requires thread-safe mode.")
+
+        self.__path = path
+        self.__executor = executor
+        self.__kwargs = kwargs
+        self.__parser = None
+
+    async def __run(self, function, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, functools.partial(function, *args, **kwargs)
+        )
+
+    def __loaded_parser(self) -> JsonFileParser:
+        if self.__parser is None:
+            raise RuntimeError("File is not loaded. Call `load()` method first.")
+        return self.__parser
+
+    async def __aenter__(self):
+        if self.__parser is None:
+            await self.load()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self.__parser is not None:
+            await self.close()
+
+    @property
+    def path(self):
+        """
+        Path to file with JSON.
+        """
+        return self.__path
+
+    @property
+    def executor(self) -> Executor:
+        """
+        Executor used for blocking work (`None` means event loop's default executor).
+        """
+        return self.__executor
+
+    @property
+    def parser(self) -> JsonFileParser:
+        """
+        Underlying `JsonFileParser`. Its methods block the calling thread.
+
+        This property raises a `RuntimeError` if file has not been loaded yet.
+        """
+        return self.__loaded_parser()
+
+    @property
+    def active_json(self) -> Any:
+        """
+        Active JSON object (with all recent changes).
+
+        This property raises a `RuntimeError` if file has not been loaded yet.
+        """
+        return self.__loaded_parser().active_json
+
+    @property
+    def backup(self) -> Any:
+        """
+        The initial JSON object (without any recent changes).
+
+        This property raises a `RuntimeError` if file has not been loaded yet.
+        """
+        return self.__loaded_parser().backup
+
+    async def load(self) -> Any:
+        """
+        Read and parse source file.
+
+        The first call creates underlying `JsonFileParser`; subsequent calls
+        replace active object with the one from file (see `JsonFileParser.get_json_from_file`).
+
+        This function returns active object.
+
+        This function raises the same exceptions as `JsonFileParser`.
+        """
+        if self.__parser is None:
+            self.__parser = await self.__run(JsonFileParser, self.__path, **self.__kwargs)
+            return self.__parser.active_json
+        return await self.__run(self.__parser.get_json_from_file)
+
+    async def get_key_value(self, json_path: str) -> Any:
+        """
+        Retrieve value from JSON (see `JsonFileParser.get_key_value`).
+
+        Value is looked up in `executor`, so the event loop is not blocked
+        while a change or save holds the parser.
+        """
+        return await self.__run(self.__loaded_parser().get_key_value, json_path)
+
+    async def lookup(self, json_path: str, field: str, value: Any) -> list:
+        """
+        Find objects in JSON array whose `field` is equal to `value` (see `JsonFileParser.lookup`).
+
+        Like `get_key_value`, objects are looked up in `executor`.
+        """
+        return await self.__run(self.__loaded_parser().lookup, json_path, field, value)
+
+    async def create_index(self, json_path: str, field: str) -> Any:
+        """
+        Build a hash index over an array of JSON objects (see `JsonFileParser.create_index`).
+        """
+        return await self.__run(self.__loaded_parser().create_index, json_path, field)
+
+    async def append(self, json_path: str, append_value: Any, append_at_end: bool = False) -> Any:
+        """
+        Append new value to an existing JSON object (see `JsonFileParser.append`).
+        """
+        return await self.__run(
+            self.__loaded_parser().append, json_path, append_value, append_at_end
+        )
+
+    async def update_value(
+        self,
+        json_path: str,
+        key_or_index: Union[str, int],
+        new_value: Any,
+        strict_mode: bool = False,
+    ) -> Any:
+        """
+        Update value in JSON (see `JsonFileParser.update_value`).
+        """
+        return await self.__run(
+            self.__loaded_parser().update_value, json_path, key_or_index, new_value, strict_mode
+        )
+
+    async def delete(self, json_path: str, key_or_index: Union[str, int]) -> Any:
+        """
+        Delete value from JSON (see `JsonFileParser.delete`).
+        """
+        return await self.__run(self.__loaded_parser().delete, json_path, key_or_index)
+
+    async def update_many(self, changes: list, strict_mode: bool = False) -> Any:
+        """
+        Update several values in JSON at once (see `JsonFileParser.update_many`).
+        """
+        return await self.__run(self.__loaded_parser().update_many, changes, strict_mode)
+
+    async def delete_many(self, deletions: list) -> Any:
+        """
+        Delete several values from JSON at once (see `JsonFileParser.delete_many`).
+        """
+        return await self.__run(self.__loaded_parser().delete_many, deletions)
+
+    async def reverse_array(self, json_path: str) -> Any:
+        """
+        Reverse an array in JSON in place (see `JsonFileParser.reverse_array`).
+        """
+        return await self.__run(self.__loaded_parser().reverse_array, json_path)
+
+    async def reset(self, discard_active_object: bool = False) -> Any:
+        """
+        Discard changes to JSON (see `JsonFileParser.reset`).
+        """
+        return await self.__run(self.__loaded_parser().reset, discard_active_object)
+
+    async def save_to_file(
+        self, path: str = None, prettify: bool = True, create_file: bool = False
+    ) -> None:
+        """
+        Save JSON object to file (see `JsonFileParser.save_to_file`).
+
+        Active object can't be changed while it is being serialized.
+        """
+        await self.__run(self.__loaded_parser().save_to_file, path, prettify, create_file)
+
+    async def minify(self) -> None:
+        """
+        Minify all JSON in source file into one line (see `JsonFileParser.minify`).
+        """
+        await self.__run(self.__loaded_parser().minify)
+
+    async def prettify(self, indent: int = 4) -> None:
+        """
+        Add indentations to JSON in source file (see `JsonFileParser.prettify`).
+        """
+        await self.__run(self.__loaded_parser().prettify, indent)
+
+    async def flush(self) -> None:
+        """
+        Write all pending autosave changes to file (see `JsonFileParser.flush`).
+        """
+        await self.__run(self.__loaded_parser().flush)
+
+    async def close(self) -> None:
+        """
+        Stop background autosave (if enabled) and write all pending changes
+        to file (see `JsonFileParser.close`).
+
+        This function is called automatically on exit from `async with` block.
+        """
+        await self.__run(self.__loaded_parser().close)
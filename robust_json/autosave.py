@@ -0,0 +1,290 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+################################
+# * This file contains autosave policies
+# * and the scheduler that coalesces autosaves
+################################
+
+import atexit
+import threading
+import time
+import warnings
+
+from robust_json.errors import IncorrectFunctionParameterTypeError
+
+
+class AutosavePolicy:
+    """
+    Autosave policy.
+
+    Policy controls when active object is saved after it has been changed.
+    Changes are coalesced: instead of writing the whole file after each change,
+    file is written once `max_operations` changes are pending or `interval`
+    milliseconds have passed since the first pending change, whichever comes first.
+    Pending changes are always written when parser's `flush()` or `close()` method
+    is called, when parser's `with` block is exited and at interpreter exit.
+
+    Parameters: `max_operations : int` specifies how many changes can be pending
+    before active object is saved (default: 1, i.e. save after each change).
+    If set to `None`, the number of changes is not limited. `interval : int` specifies
+    how many milliseconds can pass since the first pending change before active
+    object is saved. If set to `None` (default), time is not limited. `background : bool`
+    enables background saving: files are written by a separate thread, so changes are
+    not blocked by disk writes. Without it, `interval` is checked each time a change is made.
+
+    This class raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+    This class raises a `ValueError` if `max_operations` or `interval` is not positive or both are `None`.
+
+    Examples:
+
+    >>> from robust_json.autosave import AutosavePolicy
+    >>> from robust_json.file import JsonFileParser
+    >>> policy = AutosavePolicy(max_operations=100, interval=500, background=True)
+    >>> with JsonFileParser('data.json', autosave=True, autosave_policy=policy) as op:
+    ...     for i in range(1000):
+    ...         op.update_value('$', 'counter', i)
+    # File is written about 10 times instead of 1000
+    """
+
+    def __init__(self, max_operations: int = 1, interval: int = None, background: bool = False):
+        if type(max_operations) != int and max_operations != None:
+            raise IncorrectFunctionParameterTypeError(
+                "max_operations", "int", type(max_operations).__name__
+            )
+
+        if type(interval) != int and interval != None:
+            raise IncorrectFunctionParameterTypeError(
+                "interval", "int", type(interval).__name__
+            )
+
+        if type(background) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "background", "bool", type(background).__name__
+            )
+
+        if max_operations == None and interval == None:
+            raise ValueError("Either `max_operations` or `interval` parameter needs to be specified.")
+
+        if max_operations != None and max_operations <= 0:
+            raise ValueError("Parameter `max_operations` must be a positive integer.")
+
+        if interval != None and interval <= 0:
+            raise ValueError("Parameter `interval` must be a positive integer.")
+
+        self.__max_operations = max_operations
+        self.__interval = interval
+        self.__background = background
+
+    @property
+    def max_operations(self):
+        """
+        Number of pending changes that triggers saving.
+        """
+        return self.__max_operations
+
+    @property
+    def interval(self):
+        """
+        Number of milliseconds after which pending changes are saved.
+        """
+        return self.__interval
+
+    @property
+    def background(self) -> bool:
+        """
+        `True` if files are written by a background thread.
+        """
+        return self.__background
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(max_operations={self.__max_operations}, "
+            f"interval={self.__interval}, background={self.__background})"
+        )
+
+
+# Schedulers with unsaved changes; they are flushed at interpreter exit
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _register(scheduler) -> None:
+    with _pending_lock:
+        _pending.add(scheduler)
+
+
+def _unregister(scheduler) -> None:
+    with _pending_lock:
+        _pending.discard(scheduler)
+
+
+@atexit.register
+def _flush_all() -> None:
+    with _pending_lock:
+        schedulers = list(_pending)
+    for scheduler in schedulers:
+        try:
+            scheduler.close()
+        except Exception as e:
+            warnings.warn(f"Autosave failed at interpreter exit: {e}", RuntimeWarning)
+
+
+class AutosaveScheduler:
+    """
+    Internal class that decides when active object is saved.
+
+    Parsers call `notify()` after each change. Scheduler calls `save`
+    callback according to `policy`. Callback is never called while scheduler's
+    internal lock is held, so it can acquire parser's own locks.
+
+    Parameters: `save : Callable` specifies function that saves active object.
+    `policy : AutosavePolicy` specifies autosave policy.
+    """
+
+    def __init__(self, save, policy: AutosavePolicy):
+        self.__save = save
+        self.__policy = policy
+        self.__condition = threading.Condition()
+        self.__pending = 0
+        self.__first_change = None
+        self.__thread = None
+        self.__stopping = False
+        self.__error = None
+
+    @property
+    def policy(self) -> AutosavePolicy:
+        return self.__policy
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of changes that have not been saved yet.
+        """
+        return self.__pending
+
+    def __is_due(self) -> bool:
+        # Caller must hold the condition
+        max_operations = self.__policy.max_operations
+        if max_operations != None and self.__pending >= max_operations:
+            return True
+        return self.__time_left() == 0
+
+    def __time_left(self):
+        # Caller must hold the condition; `None` means "wait until notified"
+        interval = self.__policy.interval
+        if interval == None or self.__first_change == None:
+            return None
+        elapsed = time.monotonic() - self.__first_change
+        return max(interval / 1000 - elapsed, 0)
+
+    def __raise_error(self) -> None:
+        # Caller must hold the condition
+        if self.__error is not None:
+            error = self.__error
+            self.__error = None
+            raise error
+
+    def notify(self) -> None:
+        """
+        Register a change of active object.
+
+        In synchronous mode, this function saves active object if it is due.
+
+        This function raises an exception raised by the background thread
+        during the previous save, if any.
+        """
+        with self.__condition:
+            self.__raise_error()
+            if self.__pending == 0:
+                self.__first_change = time.monotonic()
+                _register(self)
+            self.__pending += 1
+
+            if self.__policy.background:
+                if self.__thread is None:
+                    self.__thread = threading.Thread(
+                        target=self.__run, name="robust-json-autosave", daemon=True
+                    )
+                    self.__thread.start()
+                elif self.__is_due():
+                    self.__condition.notify_all()
+                return
+
+            due = self.__is_due()
+
+        if due:
+            self.flush()
+
+    def __run(self) -> None:
+        # Background thread exits as soon as there is nothing left to save
+        while True:
+            with self.__condition:
+                while self.__pending and not self.__stopping and not self.__is_due():
+                    self.__condition.wait(self.__time_left())
+                if not self.__pending or self.__stopping:
+                    self.__thread = None
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                with self.__condition:
+                    self.__error = e
+                    self.__thread = None
+                warnings.warn(f"Background autosave failed: {e}", RuntimeWarning)
+                return
+
+    def flush(self) -> None:
+        """
+        Save all pending changes.
+
+        This function raises an exception raised by the background thread
+        during the previous save, if any.
+        This function raises any exceptions raised by `save` callback.
+        Changes stay pending if they could not be saved.
+        """
+        with self.__condition:
+            self.__raise_error()
+            if not self.__pending:
+                return
+            pending = self.__pending
+            first_change = self.__first_change
+            self.__pending = 0
+            self.__first_change = None
+            # Unregistered under the condition, so a concurrent `notify` registers again after it
+            _unregister(self)
+
+        try:
+            self.__save()
+        except BaseException:
+            with self.__condition:
+                if self.__pending == 0:
+                    _register(self)
+                    self.__first_change = first_change
+                self.__pending += pending
+            raise
+
+    def close(self) -> None:
+        """
+        Stop background thread (if running) and save all pending changes.
+        """
+        with self.__condition:
+            self.__stopping = True
+            thread = self.__thread
+            self.__condition.notify_all()
+        try:
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
+        finally:
+            with self.__condition:
+                self.__stopping = False
+        self.flush()
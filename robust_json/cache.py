@@ -0,0 +1,426 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+################################
+# * This file contains process-wide caches
+# * shared by all parsers
+################################
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.__path_utils import CompiledJsonPath, JsonPathTrie
+
+
+class JsonPathCache:
+    """
+    Bounded LRU cache of compiled JSON path expressions.
+
+    Compiling a JSON path is much more expensive than evaluating it
+    on a small object, so every parser in this package shares a single
+    instance of this class (`robust_json.cache.path_cache`). Compiled
+    expressions are keyed by their path string. When cache is full, the least
+    recently used expression is evicted. Sets of paths resolved together (see `get_many`)
+    are kept in a separate LRU cache, limited to a quarter of `max_size`; they don't
+    count towards cache statistics.
+
+    Parameters: `max_size : int` specifies how many compiled expressions
+    can be stored at once. If set to 0, caching is disabled and every
+    lookup compiles the path again.
+
+    This class raises an `IncorrectFunctionParameterTypeError` if `max_size`
+    parameter has an incorrect type.
+    This class raises a `ValueError` if `max_size` parameter is negative.
+
+    Examples:
+
+    >>> from robust_json.cache import path_cache
+    >>> path_cache.max_size = 1024
+    >>> path_cache.stats()
+    # Output: { "hits": 0, "misses": 0, "evictions": 0, "size": 0, "max_size": 1024 }
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.__check_size(max_size)
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        # Tuple of paths -> JsonPathTrie
+        self.__sets = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @staticmethod
+    def __check_size(max_size):
+        if type(max_size) != int:
+            raise IncorrectFunctionParameterTypeError(
+                "max_size", "int", type(max_size).__name__
+            )
+
+        if max_size < 0:
+            raise ValueError("Parameter `max_size` cannot be negative.")
+
+    @property
+    def max_size(self) -> int:
+        """
+        Maximum number of compiled expressions kept in cache.
+        """
+        return self.__max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int) -> None:
+        self.__check_size(max_size)
+        with self.__lock:
+            self.__max_size = max_size
+            self.__shrink()
+
+    @property
+    def hits(self) -> int:
+        """
+        Number of lookups answered from cache.
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Number of lookups that required compiling a path.
+        """
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        """
+        Number of compiled expressions dropped because cache was full.
+        """
+        return self.__evictions
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.__entries
+
+    def __shrink(self) -> None:
+        # Caller must hold the lock
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+        while len(self.__sets) > self.__max_sets():
+            self.__sets.popitem(last=False)
+
+    def __max_sets(self) -> int:
+        # Sets are kept in a smaller cache, so they never push out single expressions
+        return (self.__max_size + 3) // 4
+
+    def get(self, path: str):
+        """
+        Get compiled JSON path expression.
+
+        If expression is not cached yet, this function compiles it
+        and stores the result.
+
+        Parameters: `path : str` specifies JSON path that needs to be compiled.
+
+        This function returns a `CompiledJsonPath` object. Simple paths
+        (e.g. `$.field1.field2[3]`) are evaluated without `jsonpath_ng`.
+
+        This function raises any exceptions raised by `jsonpath_ng` parser
+        if JSON path cannot be compiled. Such paths are never cached.
+        """
+        with self.__lock:
+            expr = self.__entries.get(path)
+            if expr is not None:
+                self.__entries.move_to_end(path)
+                self.__hits += 1
+                return expr
+            self.__misses += 1
+
+        # Compile outside of the lock so other threads are not blocked
+        expr = CompiledJsonPath(path)
+
+        with self.__lock:
+            if self.__max_size > 0:
+                self.__entries[path] = expr
+                self.__entries.move_to_end(path)
+                self.__shrink()
+        return expr
+
+    def get_many(self, paths: tuple) -> JsonPathTrie:
+        """
+        Get compiled set of JSON paths that are resolved together.
+
+        Sets are cached in a separate LRU cache (keyed by the tuple of paths, limited to
+        a quarter of `max_size`), so resolving the same set again doesn't compile anything.
+        Lookups of sets are not counted in cache statistics, but compiling a new set
+        looks up each of its paths as a single expression.
+
+        Parameters: `paths : tuple` specifies JSON paths.
+
+        This function returns a `JsonPathTrie` object.
+
+        This function raises any exceptions raised by `jsonpath_ng` parser
+        if one of JSON paths cannot be compiled.
+        """
+        with self.__lock:
+            trie = self.__sets.get(paths)
+            if trie is not None:
+                self.__sets.move_to_end(paths)
+                return trie
+
+        trie = JsonPathTrie([self.get(path) for path in paths])
+
+        with self.__lock:
+            if self.__max_size > 0:
+                self.__sets[paths] = trie
+                self.__sets.move_to_end(paths)
+                self.__shrink()
+        return trie
+
+    def clear(self) -> None:
+        """
+        Remove all compiled expressions from cache and reset its statistics.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__sets.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics of single expressions.
+
+        This function returns a Python dictionary with `hits`, `misses`,
+        `evictions`, `size` and `max_size` keys.
+        """
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+                "size": len(self.__entries),
+                "max_size": self.__max_size,
+            }
+
+
+# Process-wide cache used by `JsonFileParser`, `JsonObjectParser` and internal utils
+path_cache = JsonPathCache()
+
+
+class JsonDocumentCache:
+    """
+    Process-wide cache of parsed JSON files, bounded by memory usage.
+
+    Parsers created with `shared=True` load files through a single instance of this
+    class (`robust_json.cache.document_cache`), so a file is parsed once, no matter how
+    many parsers read it, and all of them share the same tree. Documents are keyed by
+    real path of the file, codec (its type and `repr`) and `use_mmap` setting, so parsers
+    that parse the file differently never share a tree, and checked against current state
+    of the file (device, inode, modification time and size), so a changed file is parsed
+    again. When total size
+    of cached documents exceeds `max_memory`, the least recently used documents are evicted
+    (parsers that use them keep them alive). Size of a document is estimated by the size
+    of its file; parsed objects usually take several times more memory.
+
+    Cached documents must never be modified: parsers share them in copy-on-write mode.
+
+    Parameters: `max_memory : int` specifies total size (in bytes) of cached documents.
+    If set to 0, caching is disabled and every file is parsed again.
+
+    This class raises an `IncorrectFunctionParameterTypeError` if `max_memory`
+    parameter has an incorrect type.
+    This class raises a `ValueError` if `max_memory` parameter is negative.
+
+    Examples:
+
+    >>> from robust_json.cache import document_cache
+    >>> from robust_json.file import JsonFileParser
+    >>> document_cache.max_memory = 512 * 1024 * 1024
+    >>> op1 = JsonFileParser('data.json', shared=True)
+    >>> op2 = JsonFileParser('data.json', shared=True)
+    # 'data.json' is parsed once; op1 and op2 share the same tree
+    >>> document_cache.stats()
+    # Output: { "hits": 1, "misses": 1, "evictions": 0, "size": 1, "memory": ..., "max_memory": 536870912 }
+    """
+
+    def __init__(self, max_memory: int = 256 * 1024 * 1024):
+        self.__check_memory(max_memory)
+        self.__max_memory = max_memory
+        # (real path, codec, use_mmap) -> (file state, document, size)
+        self.__entries = OrderedDict()
+        self.__memory = 0
+        self.__lock = threading.Lock()
+        # Files being parsed; concurrent loads of the same file wait for each other
+        self.__loading = weakref.WeakValueDictionary()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @staticmethod
+    def __check_memory(max_memory):
+        if type(max_memory) != int:
+            raise IncorrectFunctionParameterTypeError(
+                "max_memory", "int", type(max_memory).__name__
+            )
+
+        if max_memory < 0:
+            raise ValueError("Parameter `max_memory` cannot be negative.")
+
+    @property
+    def max_memory(self) -> int:
+        """
+        Maximum total size (in bytes) of cached documents.
+        """
+        return self.__max_memory
+
+    @max_memory.setter
+    def max_memory(self, max_memory: int) -> None:
+        self.__check_memory(max_memory)
+        with self.__lock:
+            self.__max_memory = max_memory
+            self.__shrink()
+
+    @property
+    def memory(self) -> int:
+        """
+        Total size (in bytes) of cached documents.
+        """
+        return self.__memory
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, path: str) -> bool:
+        path = os.path.realpath(path)
+        return any(key[0] == path for key in list(self.__entries))
+
+    def __shrink(self) -> None:
+        # Caller must hold the lock
+        while self.__memory > self.__max_memory:
+            _, (_, _, size) = self.__entries.popitem(last=False)
+            self.__memory -= size
+            self.__evictions += 1
+
+    def __remove(self, key: tuple) -> None:
+        # Caller must hold the lock
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__memory -= entry[2]
+
+    def __remove_path(self, path: str, state: tuple = None) -> None:
+        # Caller must hold the lock. Removes documents of the file parsed with any codec
+        # (only those parsed from another state of the file, if `state` is provided)
+        for key, entry in list(self.__entries.items()):
+            if key[0] == path and (state is None or entry[0] != state):
+                self.__remove(key)
+
+    def __lookup(self, key: tuple, state: tuple):
+        # Caller must hold the lock
+        entry = self.__entries.get(key)
+        if entry is not None and entry[0] == state:
+            self.__entries.move_to_end(key)
+            return entry
+        return None
+
+    def get(self, path: str, state: tuple, loader, codec=None, use_mmap: bool = False):
+        """
+        Get parsed document.
+
+        If document is not cached or file has changed, this function calls `loader`
+        and caches its result.
+
+        Parameters: `path : str` specifies path to the file. `state : tuple` specifies
+        state of the file (see `robust_json.__internal_utils.service.file_state`), taken before
+        the file is read. `loader : Callable` specifies function that reads and parses the file.
+        `codec : JsonCodec` and `use_mmap : bool` specify how `loader` parses the file; documents
+        parsed with different codecs (or codec settings) are cached separately. Custom codecs
+        with settings that change parsed documents should reflect them in their `repr`.
+
+        This function returns parsed document (it must not be modified).
+
+        This function raises any exceptions raised by `loader`. Failed loads are never cached.
+        """
+        key = (os.path.realpath(path), type(codec), repr(codec), use_mmap)
+        with self.__lock:
+            entry = self.__lookup(key, state)
+            if entry is not None:
+                self.__hits += 1
+                return entry[1]
+            loading = self.__loading.get(key)
+            if loading is None:
+                loading = self.__loading[key] = threading.Lock()
+
+        # File is parsed outside of the cache lock, so other files are not blocked
+        with loading:
+            with self.__lock:
+                entry = self.__lookup(key, state)
+                if entry is not None:
+                    # Parsed by another thread in the meantime
+                    self.__hits += 1
+                    return entry[1]
+                self.__misses += 1
+            document = loader()
+            size = state[-1]
+            with self.__lock:
+                self.__remove(key)
+                # Documents parsed from the previous state of the file are never used again
+                self.__remove_path(key[0], state)
+                if size <= self.__max_memory:
+                    self.__entries[key] = (state, document, size)
+                    self.__memory += size
+                    self.__shrink()
+        return document
+
+    def invalidate(self, path: str) -> None:
+        """
+        Remove documents of the file under `path` from cache (if they are cached).
+        """
+        with self.__lock:
+            self.__remove_path(os.path.realpath(path))
+
+    def clear(self) -> None:
+        """
+        Remove all documents from cache and reset its statistics.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__memory = 0
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        This function returns a Python dictionary with `hits`, `misses`,
+        `evictions`, `size` (number of documents), `memory` and `max_memory` keys.
+        """
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+                "size": len(self.__entries),
+                "memory": self.__memory,
+                "max_memory": self.__max_memory,
+            }
+
+
+# Process-wide cache used by parsers created with `shared=True`
+document_cache = JsonDocumentCache()
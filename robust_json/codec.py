@@ -0,0 +1,395 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+################################
+# * This file contains JSON codecs (serialization backends)
+# * used by all parsers
+################################
+
+import json as JSON
+from typing import Any, Union
+
+from robust_json.errors import IncorrectFunctionParameterTypeError
+
+# Optional backends
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# Maps every digit to b"0" and everything else to b" ", so long runs of digits
+# can be found with a plain substring search (much faster than a regular expression)
+_DIGITS_TABLE = bytes(48 if 48 <= i <= 57 else 32 for i in range(256))
+# Run of digits long enough to overflow a 64-bit integer
+_LONG_NUMBER = b"0" * 19
+_WHITESPACE = b" \t\r\n"
+
+
+# Documents are checked in chunks of this size (so they are never copied as a whole);
+# chunks overlap by `_MARGIN` bytes (longer than `_LONG_NUMBER`), so a run of digits on
+# the boundary is not missed, and its context can be seen
+_CHUNK_SIZE = 1 << 20
+_MARGIN = 64
+
+
+def _has_long_integer(data: Union[str, bytes, memoryview]) -> bool:
+    # Looks for integer tokens of 19+ digits. Runs of digits inside strings (IDs, hashes,
+    # timestamps) and floats are skipped: a run counts only if it is a whole value, i.e. it follows
+    # `[`, `:`, `,` or the start of document and is followed by `,`, `]`, `}` or the end of document.
+    # When context can't be seen (very long runs of digits or whitespace), run is counted
+    size = len(data)
+    for start in range(0, size, _CHUNK_SIZE):
+        begin = max(start - _MARGIN, 0)
+        end = min(start + _CHUNK_SIZE + _MARGIN, size)
+        chunk = data[begin:end]
+        if type(chunk) == str:
+            chunk = chunk.encode("utf-8", "surrogatepass")
+        elif type(chunk) != bytes:
+            chunk = bytes(chunk)
+        digits = chunk.translate(_DIGITS_TABLE)
+        position = digits.find(_LONG_NUMBER)
+        while position != -1:
+            stop = digits.find(b" ", position)
+            if stop == -1:
+                stop = len(chunk)
+            if _is_whole_value(chunk, position, stop, begin == 0, end == size):
+                return True
+            position = digits.find(_LONG_NUMBER, stop)
+    return False
+
+
+def _is_whole_value(chunk: bytes, start: int, stop: int, first: bool, last: bool) -> bool:
+    # Checks characters around `chunk[start:stop]` (a run of digits)
+    before = start - 1
+    if before >= 0 and chunk[before] == 45:  # b"-"
+        before -= 1
+    while before >= 0 and chunk[before] in _WHITESPACE:
+        before -= 1
+    if before < 0:
+        if not first:
+            return True
+    elif chunk[before] not in b"[:,":
+        return False
+
+    after = stop
+    while after < len(chunk) and chunk[after] in _WHITESPACE:
+        after += 1
+    if after == len(chunk):
+        return True
+    return chunk[after] in b",]}"
+
+
+def _as_bytes(data: Union[str, bytes, memoryview]) -> Union[str, bytes]:
+    # `json` and `ujson` modules accept only strings and bytes
+    if type(data) == memoryview:
+        return data.tobytes()
+    return data
+
+
+class JsonCodec:
+    """
+    Base class for JSON codecs.
+
+    Codec is responsible for deserializing JSON documents (`loads`) and
+    serializing Python objects (`dumps`). To use a custom backend, subclass
+    this class and pass its instance as `codec` parameter to a parser.
+    """
+
+    name = None
+    # `True` if `loads` can parse a `memoryview` without copying it
+    # (used for memory-mapped files)
+    accepts_buffers = False
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """
+        Deserialize JSON document.
+
+        Parameters: `data : str or bytes` specifies JSON document. If `accepts_buffers`
+        is `True`, `data` can also be a `memoryview`.
+
+        This function returns deserialized object.
+
+        This function raises a `ValueError` (`json.JSONDecodeError`) if document cannot be parsed.
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj: Any, indent: int = None) -> str:
+        """
+        Serialize object to JSON.
+
+        Parameters: `obj : Any` specifies object that needs to be serialized.
+        `indent : int` specifies the number of spaces used for indentation.
+        If set to `None`, JSON will be written in one line.
+
+        This function returns a string with JSON.
+        """
+        raise NotImplementedError
+
+    def dump(self, obj: Any, file, indent: int = None, buffer_size: int = 65536) -> None:
+        """
+        Serialize object to JSON and write it to a binary file in chunks.
+
+        Unlike `dumps`, this function never builds the whole document in memory:
+        JSON is encoded piece by piece and written each time `buffer_size`
+        characters are collected, so peak memory usage stays bounded.
+        Output is identical to the one produced by `dumps` with `StdlibCodec`.
+
+        Parameters: `obj : Any` specifies object that needs to be serialized.
+        `file` specifies a file opened in binary mode. `indent : int` specifies the
+        number of spaces used for indentation. If set to `None`, JSON will be written in one line.
+        `buffer_size : int` specifies how many characters are collected before they are written.
+        """
+        encoder = JSON.JSONEncoder(indent=indent)
+        buffer = []
+        buffered = 0
+        for chunk in encoder.iterencode(obj):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= buffer_size:
+                file.write("".join(buffer).encode("utf-8"))
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            file.write("".join(buffer).encode("utf-8"))
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class StdlibCodec(JsonCodec):
+    """
+    Codec based on Python's standard `json` module. It is always available.
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return JSON.loads(_as_bytes(data))
+
+    def dumps(self, obj: Any, indent: int = None) -> str:
+        return JSON.dumps(obj, indent=indent)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec based on `orjson` package.
+
+    Documents are deserialized by `orjson`. Documents `orjson` cannot handle
+    exactly (e.g. with NaN or integers larger than 64 bits, which `orjson` would turn
+    into floats) are deserialized by `json` module. Such integers are found by a quick
+    scan for integer values of 19 or more digits (digits inside strings and floats are ignored).
+
+    Parameters: `strict_format : bool` controls serialization. If set to `True`
+    (default), `dumps` uses `json` module, so output is identical to the one
+    produced by `StdlibCodec` (`orjson` cannot produce the same separators, 4-space
+    indentation and escaped non-ASCII characters). If set to `False`, `dumps` uses `orjson`
+    as well: output is written in one line without spaces or with 2-space indentation.
+
+    This class raises an `ImportError` if `orjson` package is not installed.
+    """
+
+    name = "orjson"
+    accepts_buffers = True
+
+    def __init__(self, strict_format: bool = True):
+        if orjson is None:
+            raise ImportError("Package `orjson` is not installed.")
+
+        if type(strict_format) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "strict_format", "bool", type(strict_format).__name__
+            )
+
+        self.strict_format = strict_format
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        if _has_long_integer(data):
+            # Possibly an integer outside of 64-bit range
+            return JSON.loads(_as_bytes(data))
+        try:
+            return orjson.loads(data)
+        except (ValueError, TypeError):
+            # Let `json` module handle (or report) everything `orjson` rejects
+            return JSON.loads(_as_bytes(data))
+
+    def dumps(self, obj: Any, indent: int = None) -> str:
+        if self.strict_format:
+            return JSON.dumps(obj, indent=indent)
+        try:
+            if indent:
+                return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            return JSON.dumps(obj, indent=indent)
+
+    def dump(self, obj: Any, file, indent: int = None, buffer_size: int = 65536) -> None:
+        if self.strict_format:
+            return super().dump(obj, file, indent, buffer_size)
+        # `orjson` cannot encode incrementally, but it produces compact bytes directly
+        try:
+            if indent:
+                file.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+            else:
+                file.write(orjson.dumps(obj))
+        except TypeError:
+            super().dump(obj, file, indent, buffer_size)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(strict_format={self.strict_format})"
+
+
+class UjsonCodec(JsonCodec):
+    """
+    Codec based on `ujson` package.
+
+    Documents are deserialized by `ujson`. Values `ujson` cannot handle
+    are handled by `json` module.
+
+    Parameters: `strict_format : bool` controls serialization. If set to `True`
+    (default), `dumps` uses `json` module, so output is identical to the one
+    produced by `StdlibCodec`. If set to `False`, `dumps` uses `ujson` as well:
+    output is written without spaces after separators.
+
+    This class raises an `ImportError` if `ujson` package is not installed.
+    """
+
+    name = "ujson"
+
+    def __init__(self, strict_format: bool = True):
+        if ujson is None:
+            raise ImportError("Package `ujson` is not installed.")
+
+        if type(strict_format) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "strict_format", "bool", type(strict_format).__name__
+            )
+
+        self.strict_format = strict_format
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        data = _as_bytes(data)
+        try:
+            return ujson.loads(data)
+        except (ValueError, TypeError, OverflowError):
+            # Let `json` module handle (or report) everything `ujson` rejects
+            return JSON.loads(data)
+
+    def dumps(self, obj: Any, indent: int = None) -> str:
+        if self.strict_format:
+            return JSON.dumps(obj, indent=indent)
+        try:
+            return ujson.dumps(obj, indent=indent or 0, escape_forward_slashes=False)
+        except (TypeError, OverflowError):
+            return JSON.dumps(obj, indent=indent)
+
+    def dump(self, obj: Any, file, indent: int = None, buffer_size: int = 65536) -> None:
+        if self.strict_format:
+            return super().dump(obj, file, indent, buffer_size)
+        file.write(self.dumps(obj, indent).encode("utf-8"))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(strict_format={self.strict_format})"
+
+
+# Codecs that can be selected by name
+_CODECS = {
+    StdlibCodec.name: StdlibCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+
+def available_codecs() -> list:
+    """
+    List names of all codecs that can be used in this environment.
+    """
+    res = [StdlibCodec.name]
+    if orjson is not None:
+        res.append(OrjsonCodec.name)
+    if ujson is not None:
+        res.append(UjsonCodec.name)
+    return res
+
+
+def _detect_codec() -> JsonCodec:
+    # The fastest installed backend wins
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return StdlibCodec()
+
+
+_default_codec = _detect_codec()
+
+
+def get_codec(codec: Union[str, JsonCodec] = None) -> JsonCodec:
+    """
+    Get codec instance.
+
+    Parameters: `codec : str or JsonCodec` specifies codec name (`json`, `orjson`
+    or `ujson`) or codec instance. If not provided, this function returns
+    default codec.
+
+    This function returns a `JsonCodec` instance.
+
+    This function raises an `IncorrectFunctionParameterTypeError` if `codec` parameter has an incorrect type.
+    This function raises a `ValueError` if there is no codec with given name.
+    This function raises an `ImportError` if codec backend is not installed.
+    """
+    if codec is None:
+        return _default_codec
+
+    if isinstance(codec, JsonCodec):
+        return codec
+
+    if type(codec) != str:
+        raise IncorrectFunctionParameterTypeError(
+            "codec", "str or JsonCodec", type(codec).__name__
+        )
+
+    if codec not in _CODECS:
+        raise ValueError(
+            f'Supported codecs are {", ".join(_CODECS)}; got `{codec}` instead.'
+        )
+
+    return _CODECS[codec]()
+
+
+def set_default_codec(codec: Union[str, JsonCodec]) -> JsonCodec:
+    """
+    Change codec used by parsers that were created without `codec` parameter.
+
+    By default, the fastest installed backend is selected when this module
+    is imported (`orjson`, then `ujson`, then `json`).
+
+    Parameters: `codec : str or JsonCodec` specifies codec name or codec instance.
+
+    This function returns new default codec.
+
+    This function raises the same exceptions as `get_codec`.
+    """
+    global _default_codec
+
+    if codec is None:
+        raise IncorrectFunctionParameterTypeError(
+            "codec", "str or JsonCodec", type(codec).__name__
+        )
+
+    _default_codec = get_codec(codec)
+    return _default_codec
@@ -10,6 +10,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from robust_json.ext.filter_json_array import filter_json_array
+from robust_json.ext.filter_json_array import filter_json_array, JsonFilter
 from robust_json.ext.get_item_index import get_item_index
-from robust_json.ext.reverse_array import reverse_array
+from robust_json.ext.reverse_array import reverse_array, ReversedView
@@ -10,17 +10,306 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import operator
+from typing import Any, Iterator, Union
+
 from robust_json.errors import IncorrectFunctionParameterTypeError, JSONObjectError
+from robust_json.index import JsonArrayIndex
+
+_MISSING = object()
+
+_COMPARISONS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
 
 
-def filter_json_array(json_array: list, field: str, value: any) -> list:
+class JsonFilter:
+    """
+    Compiled filter for arrays of JSON objects.
+
+    Query is a dictionary that maps field names to conditions. Field names can refer
+    to nested fields (`address.city`; numeric parts are used as indexes of nested arrays
+    and as keys of nested objects). A condition is either a value (field must be equal to it) or a dictionary of operators:
+    `$eq`, `$ne`, `$gt`, `$gte`, `$lt`, `$lte` (comparisons), `$in` (field is equal to one of
+    values in a list) and `$prefix` (field is a string that starts with given string).
+    All conditions of a query (and all operators of a condition) must be met. `$and` and `$or`
+    keys combine lists of nested queries. Objects that don't have a field (or whose field
+    can't be compared with given value) don't match its condition.
+
+    Query is compiled into a chain of closures once, so one filter can be applied to
+    many objects (and reused by several `filter_json_array` calls) without parsing it again.
+
+    Parameters: `query : dict` specifies filter conditions.
+
+    This class raises an `IncorrectFunctionParameterTypeError` if query or one of its parts has an incorrect type.
+    This class raises a `ValueError` if query contains an unknown operator.
+
+    Examples:
+
+    >>> from robust_json.ext import JsonFilter
+    >>> adults = JsonFilter({ "age": { "$gte": 18 }, "$or": [ { "country": "USA" }, { "address.city": { "$prefix": "New" } } ] })
+    >>> adults({ "age": 30, "country": "Canada", "address": { "city": "New Westminster" } })
+    # Output: True
+    """
+
+    def __init__(self, query: dict):
+        if type(query) != dict:
+            raise IncorrectFunctionParameterTypeError("query", "dict", type(query).__name__)
+
+        self.__query = query
+        self.__match = _compile_query(query)
+        # Top-level equality conditions on plain fields (they can be looked up in indexes)
+        self.__equalities = {
+            field: condition
+            for field, condition in query.items()
+            if not field.startswith("$") and "." not in field and not _is_operators(condition)
+        }
+
+    @property
+    def query(self) -> dict:
+        """
+        Query this filter has been compiled from.
+        """
+        return self.__query
+
+    @property
+    def equalities(self) -> dict:
+        """
+        Top-level `field: value` conditions of the query.
+        """
+        return self.__equalities
+
+    @property
+    def predicate(self):
+        """
+        Compiled function that takes a JSON object and returns `True` if it matches the filter.
+        """
+        return self.__match
+
+    def __call__(self, item: dict) -> bool:
+        """
+        Check if JSON object matches the filter.
+        """
+        return self.__match(item)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.__query!r})"
+
+
+def _is_operators(condition) -> bool:
+    return type(condition) == dict and bool(condition) and all(
+        type(key) == str and key.startswith("$") for key in condition
+    )
+
+
+def _compile_query(query: dict):
+    predicates = []
+    for field, condition in query.items():
+        if type(field) != str:
+            raise IncorrectFunctionParameterTypeError("field", "str", type(field).__name__)
+        if field in ("$and", "$or"):
+            if type(condition) != list and type(condition) != tuple:
+                raise IncorrectFunctionParameterTypeError(
+                    field, "list", type(condition).__name__
+                )
+            parts = []
+            for part in condition:
+                if type(part) != dict:
+                    raise IncorrectFunctionParameterTypeError(
+                        field, "list of dict", f"list with {type(part).__name__}"
+                    )
+                parts.append(_compile_query(part))
+            predicates.append(_all(parts) if field == "$and" else _any(parts))
+        elif field.startswith("$"):
+            raise ValueError(f"Unknown logical operator `{field}`.")
+        elif field == "":
+            raise ValueError("Field name is empty.")
+        elif _is_operators(condition):
+            getter = _compile_getter(field, True)
+            for name, operand in condition.items():
+                predicates.append(_compile_operator(getter, name, operand))
+        else:
+            predicates.append(_compile_operator(_compile_getter(field, True), "$eq", condition))
+    return _all(predicates)
+
+
+def _compile_getter(field: str, nested: bool):
+    # Returns a key for plain fields (operators look them up inline, which saves
+    # a function call per item) or a function that finds value of nested field
+    steps = field.split(".") if nested else [field]
+    if len(steps) == 1:
+        return field
+
+    # Each step is a key and an array index (numeric steps are keys of objects, too)
+    steps = [(step, int(step) if step.isdecimal() else None) for step in steps]
+
+    def get_nested(item):
+        for key, index in steps:
+            if type(item) == dict:
+                item = item.get(key, _MISSING)
+            elif type(item) == list and index is not None and index < len(item):
+                item = item[index]
+            else:
+                return _MISSING
+            if item is _MISSING:
+                return _MISSING
+        return item
+
+    return get_nested
+
+
+def _compile_operator(get, name: str, operand):
+    if type(get) == str:
+        key = get
+        if name == "$eq":
+            # Missing values are never equal to operand, so they need no special check
+            def match_key_eq(item):
+                return item.get(key, _MISSING) == operand
+
+            return match_key_eq
+
+        if name in _COMPARISONS:
+            compare = _COMPARISONS[name]
+
+            def match_key(item):
+                value = item.get(key, _MISSING)
+                if value is _MISSING:
+                    return False
+                try:
+                    return compare(value, operand)
+                except TypeError:
+                    return False
+
+            return match_key
+
+        def get(item):
+            return item.get(key, _MISSING)
+
+    if name == "$eq":
+
+        def match_eq(item):
+            return get(item) == operand
+
+        return match_eq
+
+    if name in _COMPARISONS:
+        compare = _COMPARISONS[name]
+
+        def match(item):
+            value = get(item)
+            if value is _MISSING:
+                return False
+            try:
+                return compare(value, operand)
+            except TypeError:
+                # Values of different types (e.g. string and number) can't be ordered
+                return False
+
+        return match
+
+    if name == "$in":
+        if type(operand) not in (list, tuple, set, frozenset):
+            raise IncorrectFunctionParameterTypeError("$in", "list", type(operand).__name__)
+        try:
+            choices = frozenset(operand)
+        except TypeError:
+            # Unhashable values (objects and arrays) are compared one by one
+            choices = list(operand)
+
+        def match_in(item):
+            value = get(item)
+            if value is _MISSING:
+                return False
+            try:
+                return value in choices
+            except TypeError:
+                return value in list(choices)
+
+        return match_in
+
+    if name == "$prefix":
+        if type(operand) != str:
+            raise IncorrectFunctionParameterTypeError("$prefix", "str", type(operand).__name__)
+
+        def match_prefix(item):
+            value = get(item)
+            return type(value) == str and value.startswith(operand)
+
+        return match_prefix
+
+    raise ValueError(f"Unknown operator `{name}`.")
+
+
+def _all(predicates: list):
+    if len(predicates) == 1:
+        return predicates[0]
+
+    if len(predicates) == 2:
+        first, second = predicates
+
+        def match_both(item):
+            return first(item) and second(item)
+
+        return match_both
+
+    def match_all(item):
+        for predicate in predicates:
+            if not predicate(item):
+                return False
+        return True
+
+    return match_all
+
+
+def _any(predicates: list):
+    def match_any(item):
+        for predicate in predicates:
+            if predicate(item):
+                return True
+        return False
+
+    return match_any
+
+
+def filter_json_array(
+    json_array: list,
+    field: Union[str, dict, JsonFilter],
+    value: Any = _MISSING,
+    limit: int = None,
+    lazy: bool = False,
+    index: JsonArrayIndex = None,
+) -> Union[list, Iterator]:
     """
     Filter JSON array of objects according to given parameters.
 
-    This function filters an array of JSON objects
-    using provided key:value pair.
+    This function filters an array of JSON objects either by a single key:value pair
+    (`field` is a key and `value` is a value) or by a query (`field` is a dictionary
+    or a compiled `JsonFilter`, see its documentation). Objects that don't have
+    filtered field are skipped.
+
+    If an index over this array by a filtered field is passed (see `create_index` method of parsers),
+    matching objects are found through it instead of scanning the array (for queries, index
+    narrows the search when query contains `field: value` condition on indexed field).
+
+    Parameters: `json_array : list` specifies array of JSON objects. `field : Union[str, dict, JsonFilter]`
+    specifies key or query. `value : Any` specifies value of the key (it is required for keys and ignored for queries).
+    `limit : int` specifies maximum number of returned objects; filtering stops as soon as it's reached.
+    `lazy : bool` parameter sets return type to a generator that finds objects one by one, as they are consumed.
+    `index : JsonArrayIndex` specifies index over `json_array` (it is rebuilt if it is outdated or has been built over another array).
+
+    This function returns a list (or a generator, if `lazy` is set to `True`) of matched objects in array order.
 
-    Example:
+    This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+    This function raises a `ValueError` if `field` is empty, `limit` is negative or query is not valid.
+    This function raises a `JSONObjectError` if array contains anything but objects (generator raises it
+    when it reaches such item).
+
+    Examples:
 
     Filtering an array of objects by a specific key:value pair
 
@@ -29,6 +318,25 @@ def filter_json_array(json_array: list, field: str, value: any) -> list:
     >>> filtered  = filter_json_array(obj, 'country', 'USA')
     >>> filtered
     # Output: [ { "order_id": 1648, "country": "USA" }, { "order_id": 6703, "country": "USA" } ]
+
+    Filtering an array of objects by a query
+
+    >>> filtered = filter_json_array(obj, { "country": { "$in": [ "USA", "Canada" ] }, "order_id": { "$gt": 5000 } })
+    >>> filtered
+    # Output: [ { "order_id": 6703, "country": "USA" } ]
+
+    Finding the first match only
+
+    >>> next(filter_json_array(obj, 'country', 'USA', lazy=True))
+    # Output: { "order_id": 1648, "country": "USA" }
+
+    Filtering through an index created by parser
+
+    >>> from robust_json.object import JsonObjectParser
+    >>> op = JsonObjectParser({ "orders": obj })
+    >>> index = op.create_index('orders', 'country')
+    >>> filter_json_array(op.active_json['orders'], 'country', 'Liberia', index=index)
+    # Output: [ { "order_id": 1830, "country": "Liberia" } ]
     """
     # TODO Add REGEX support
 
@@ -37,22 +345,97 @@ def filter_json_array(json_array: list, field: str, value: any) -> list:
             "json_array", "list", type(json_array).__name__
         )
 
-    if type(field) != str:
-        raise IncorrectFunctionParameterTypeError("field", "str", type(field).__name__)
+    if type(field) == str:
+        if field == "":
+            raise ValueError("Parameter `field` is empty.")
+        if value is _MISSING:
+            raise TypeError("filter_json_array() missing 1 required positional argument: 'value'")
+        # Key:value pair is checked inline (without calling compiled predicate)
+        predicate = None
+        equalities = {field: value}
+    elif type(field) == dict or type(field) == JsonFilter:
+        if type(field) == dict:
+            field = JsonFilter(field)
+        predicate = field.predicate
+        equalities = field.equalities
+    else:
+        raise IncorrectFunctionParameterTypeError(
+            "field", "str, dict or JsonFilter", type(field).__name__
+        )
+
+    if limit is not None:
+        if type(limit) != int:
+            raise IncorrectFunctionParameterTypeError("limit", "int", type(limit).__name__)
+        if limit < 0:
+            raise ValueError("Parameter `limit` must not be negative.")
 
-    if field == "":
-        raise ValueError("Parameter `field` is empty.")
+    if type(lazy) != bool:
+        raise IncorrectFunctionParameterTypeError("lazy", "bool", type(lazy).__name__)
 
-    item_indexes = []
-    for i in enumerate(json_array):
-        if type(i[1]) == dict:
-            if i[1][field] == value:
-                item_indexes.append(i[1])
+    if index is not None and type(index) != JsonArrayIndex:
+        raise IncorrectFunctionParameterTypeError(
+            "index", "JsonArrayIndex", type(index).__name__
+        )
+
+    # Index over one of equality fields narrows the search to matching objects
+    candidates = None
+    if index is not None and index.field in equalities:
+        if index.sync(json_array) and index.objects_only:
+            key = index.field
+            expected = equalities[key]
+            try:
+                candidates = index.items(expected)
+            except TypeError:
+                # Unhashable values (objects and arrays) are not indexed
+                pass
             else:
+                # Index is only trusted while its items still match; otherwise array is scanned
+                for item in candidates:
+                    if type(item) != dict or item.get(key, _MISSING) != expected:
+                        candidates = None
+                        break
+
+    if candidates is None:
+        if predicate is None and limit is None and not lazy:
+            try:
+                return [item for item in json_array if item.get(field, _MISSING) == value]
+            except AttributeError:
+                # Array contains something but objects; scan reports where
                 pass
-        else:
+        res = _scan(json_array, predicate, field, value, limit)
+    else:
+        if predicate is not None:
+            candidates = (item for item in candidates if predicate(item))
+        res = _take(candidates, limit)
+
+    if lazy:
+        return res
+    return list(res)
+
+
+def _scan(json_array: list, predicate, field: str, value: any, limit: int):
+    if limit == 0:
+        return
+    found = 0
+    for position, item in enumerate(json_array):
+        if type(item) != dict:
             raise JSONObjectError(
-                f"Parameter `json_array` must contain only Python dictionaries; got {type(i[1]).__name__} instead (Array index: [{i[0]}])"
+                f"Parameter `json_array` must contain only Python dictionaries; got {type(item).__name__} instead (Array index: [{position}])"
             )
+        if (item.get(field, _MISSING) == value) if predicate is None else predicate(item):
+            yield item
+            found += 1
+            if found == limit:
+                return
+
 
-    return item_indexes
+def _take(items, limit: int):
+    if limit is None:
+        yield from items
+        return
+    if limit == 0:
+        return
+    for found, item in enumerate(items, 1):
+        yield item
+        if found == limit:
+            return
@@ -10,15 +10,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from _typeshed import NoneType
+import bisect
 from typing import Union
 
 from robust_json.errors import IncorrectFunctionParameterTypeError
 
 
 def get_item_index(
-    item: any, array: list, always_array: bool = False
-) -> Union[int, list, NoneType]:
+    item: any,
+    array: list,
+    always_array: bool = False,
+    first_only: bool = False,
+    start: int = 0,
+    stop: int = None,
+    max_results: int = None,
+    assume_sorted: bool = False,
+) -> Union[int, list, None]:
     """
     Get items' index in an array.
 
@@ -27,13 +34,21 @@ def get_item_index(
     parameter sets return type strictly to a list. If set to `True`, this function will
     always return an array even if there is only one element. This is useful when in the future
     this output will be iterated. If set to `False`, return type will be determined automatically.
+    `first_only : bool` parameter stops the search at the first match (it is the same as `max_results=1`).
+    `start : int` and `stop : int` parameters limit the search to `array[start:stop]` (negative values
+    are counted from the end of array, like in slices); returned indexes are still indexes in `array`.
+    `max_results : int` parameter specifies maximum number of returned indexes; the search stops
+    as soon as they are found. `assume_sorted : bool` parameter tells that array (or its searched part)
+    is sorted in ascending order, so item is found by binary search in O(log n) instead of scanning the array.
 
     This function returns an index/an array if indexes. If item is not present in the array,
     this function will return `None` (if `always_array` is set to `True` and item is not found in
     the array, this function will return an empty list)
 
     This function raises a `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
-    This function raises a `ValueError` exception if `array` parameter is equal to an empty list.
+    This function raises a `ValueError` exception if `array` parameter is equal to an empty list
+    or if `max_results` parameter is negative.
+    This function raises a `TypeError` if `assume_sorted` is set to `True` and item can't be compared with array items.
     This function raises any additional exceptions if occurred.
 
     Examples:
@@ -46,7 +61,7 @@ def get_item_index(
     >>> arr = ['1', '2', '3', '4', '1', '5', '1']
     >>> index = get_item_index('1', arr)
     >>> index
-    # index = [0, 6]
+    # index = [0, 4, 6]
 
     >>> arr = ['1', '2', '3', '4']
     >>> index = get_item_index('1', arr, True)
@@ -63,6 +78,16 @@ def get_item_index(
     >>> index
     # index = []
 
+    >>> arr = ['1', '2', '3', '4', '1', '5', '1']
+    >>> index = get_item_index('1', arr, first_only=True, start=1)
+    >>> index
+    # index = 4
+
+    >>> arr = [1, 3, 3, 3, 8, 13]
+    >>> index = get_item_index(3, arr, assume_sorted=True)
+    >>> index
+    # index = [1, 2, 3]
+
     For more information please visit:
     https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#methods
     """
@@ -70,16 +95,59 @@ def get_item_index(
     if type(array) != list:
         raise IncorrectFunctionParameterTypeError("array", "list", type(array).__name__)
 
+    if type(first_only) != bool:
+        raise IncorrectFunctionParameterTypeError(
+            "first_only", "bool", type(first_only).__name__
+        )
+
+    if type(start) != int:
+        raise IncorrectFunctionParameterTypeError("start", "int", type(start).__name__)
+
+    if stop is not None and type(stop) != int:
+        raise IncorrectFunctionParameterTypeError("stop", "int", type(stop).__name__)
+
+    if max_results is not None:
+        if type(max_results) != int:
+            raise IncorrectFunctionParameterTypeError(
+                "max_results", "int", type(max_results).__name__
+            )
+        if max_results < 0:
+            raise ValueError("Parameter `max_results` must not be negative.")
+
+    if type(assume_sorted) != bool:
+        raise IncorrectFunctionParameterTypeError(
+            "assume_sorted", "bool", type(assume_sorted).__name__
+        )
+
     if array == []:
         raise ValueError("Parameter `array` is an empty list.")
 
+    if first_only:
+        max_results = 1 if max_results is None else min(max_results, 1)
+
+    # Negative and out-of-range bounds are handled like in slices
+    start, stop, _ = slice(start, stop).indices(len(array))
+
     item_indexes = []
 
-    for i in enumerate(array):
-        if i[1] == item:
-            item_indexes.append(i[0])
-        else:
-            pass
+    if max_results == 0 or start >= stop:
+        pass
+    elif assume_sorted:
+        first = bisect.bisect_left(array, item, start, stop)
+        last = bisect.bisect_right(array, item, first, stop)
+        if max_results is not None:
+            last = min(last, first + max_results)
+        item_indexes = list(range(first, last))
+    else:
+        # `list.index` compares items in C, which is much faster than a Python loop
+        position = start
+        while max_results is None or len(item_indexes) < max_results:
+            try:
+                position = array.index(item, position, stop)
+            except ValueError:
+                break
+            item_indexes.append(position)
+            position += 1
 
     if len(item_indexes) == 1 and always_array == False:
         return item_indexes[0]
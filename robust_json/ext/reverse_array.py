@@ -10,17 +10,94 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Any, Iterator, Union
+
 from robust_json.errors import IncorrectFunctionParameterTypeError
 
 
-def reverse_array(array: list) -> list:
+class ReversedView:
+    """
+    Reversed view of an array.
+
+    View doesn't copy the array: it translates indexes into indexes of the original array
+    on access, so creating it costs O(1). It supports `len()`, indexing (including negative indexes),
+    slicing (slice of a view is another view), iteration and `in` operator. Changes of items
+    of the original array are visible through the view; if its length changes, create a new view.
+
+    Parameters: `array : list` specifies the original array.
+
+    This class raises an `IncorrectFunctionParameterTypeError` if `array` parameter has an incorrect type.
+
+    Examples:
+
+    >>> from robust_json.ext import ReversedView
+    >>> view = ReversedView(['a', 'b', 'c', 'd'])
+    >>> view[0], len(view), list(view[1:3])
+    # Output: ('d', 4, ['c', 'b'])
+    """
+
+    def __init__(self, array: list, indexes: range = None):
+        if type(array) != list:
+            raise IncorrectFunctionParameterTypeError("array", "list", type(array).__name__)
+        self.__array = array
+        # Indexes of the original array, in view order
+        self.__indexes = range(len(array) - 1, -1, -1) if indexes is None else indexes
+
+    def __len__(self) -> int:
+        return len(self.__indexes)
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        if type(key) == slice:
+            return ReversedView(self.__array, self.__indexes[key])
+        try:
+            index = self.__indexes[key]
+        except IndexError:
+            raise IndexError("ReversedView index out of range")
+        return self.__array[index]
+
+    def __iter__(self) -> Iterator:
+        return map(self.__array.__getitem__, self.__indexes)
+
+    def __reversed__(self) -> Iterator:
+        return map(self.__array.__getitem__, reversed(self.__indexes))
+
+    def __contains__(self, item: Any) -> bool:
+        return any(value == item for value in self)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) == ReversedView or type(other) == list:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_list()!r})"
+
+    def to_list(self) -> list:
+        """
+        Copy items of the view into a new list.
+        """
+        indexes = self.__indexes
+        if not indexes:
+            return []
+        # Range of indexes is converted into a slice, so items are copied in C
+        stop = indexes.stop if indexes.stop >= 0 else None
+        return self.__array[indexes.start : stop : indexes.step]
+
+
+def reverse_array(array: list, in_place: bool = False, lazy: bool = False) -> Union[list, ReversedView]:
     """
     Reverse an array
 
     This function reverses an array and returns it.
 
-    This function will raise an `IncorrectFunctionParameterTypeError` exception if `array`
-    paramete has an incorrect type.
+    Parameters: `array : list` specifies array that needs to be reversed. If `in_place : bool` is set
+    to `True`, array is reversed in place (without copying) and returned. If `lazy : bool` is set to `True`,
+    this function returns a `ReversedView` of the array, which is created in O(1) and doesn't copy it
+    (useful when reversed array is only iterated or partially read). By default, a reversed copy is returned.
+
+    This function will raise an `IncorrectFunctionParameterTypeError` exception if one or more of its
+    parameters have incorrect types.
+    This function raises a `ValueError` if both `in_place` and `lazy` are set to `True`.
     This function raises any additional exceptions if occurred.
 
     For more information about this method, please visit:
@@ -29,4 +106,20 @@ def reverse_array(array: list) -> list:
     if type(array) != list:
         raise IncorrectFunctionParameterTypeError("array", "list", type(array).__name__)
 
+    if type(in_place) != bool:
+        raise IncorrectFunctionParameterTypeError("in_place", "bool", type(in_place).__name__)
+
+    if type(lazy) != bool:
+        raise IncorrectFunctionParameterTypeError("lazy", "bool", type(lazy).__name__)
+
+    if in_place and lazy:
+        raise ValueError("Parameters `in_place` and `lazy` can't be used together.")
+
+    if in_place:
+        array.reverse()
+        return array
+
+    if lazy:
+        return ReversedView(array)
+
     return array[::-1]
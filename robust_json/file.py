@@ -17,9 +17,10 @@
 
 
 # JSON modules import
-import json as JSON
 import os
-import jsonpath_ng.ext as jsonpath
+import mmap
+import threading
+import contextlib
 
 # Misc import
 from typing import Union, Any
@@ -31,29 +32,323 @@ from robust_json.errors import (
     JSONStrictModeError,
     IncorrectFunctionParameterTypeError,
 )
-from robust_json.__internal_utils import service
+from robust_json.__internal_utils import (
+    service,
+    CopyOnWrite,
+    BatchLog,
+    Journal,
+    ReadWriteLock,
+    FileLock,
+    FSYNC_POLICIES,
+    LOCKING_MODES,
+)
+from robust_json.codec import JsonCodec, get_codec
+from robust_json.cache import path_cache, document_cache
+from robust_json.autosave import AutosavePolicy, AutosaveScheduler
+from robust_json.index import JsonArrayIndex, JsonIndexSet
+from robust_json.watcher import FileWatcher
+from robust_json.__stream_utils import JsonStreamReader, JsonLinesReader
 
 
 class JsonFileParser:
     """
     This class provides functionality for working with JSON files.
 
+    Parameters: `path : str` specifies path to the source file. `autosave : bool` enables
+    saving active object to the source file (or to `autosave_path` keyword argument, if provided)
+    after each change. `copy_on_write : bool` enables copy-on-write mode: instead of keeping
+    a separate copy of the initial object, backup shares all nodes with active object and
+    only nodes that are modified by this class' methods are copied (on the first write).
+    In this mode, modifying `active_json` (or values returned by `get_key_value`)
+    directly will also modify backup. `codec : str or JsonCodec` specifies JSON
+    codec (`json`, `orjson`, `ujson` or a custom `robust_json.codec.JsonCodec` instance)
+    used for reading and writing files. If not provided, default codec is used
+    (see `robust_json.codec.set_default_codec`). `streaming : bool` enables streaming
+    serialization: `save_to_file` (and autosave) encodes JSON and writes it in chunks of
+    `write_buffer_size : int` characters (default: 65536) instead of building the whole document
+    in memory (with `json` codec it uses pure-Python `JSONEncoder.iterencode` instead of the C
+    encoder, so it trades speed for memory; without `atomic_write`, output is collected in a
+    temporary file first, so a serialization error never leaves target file truncated).
+    `atomic_write : bool` enables crash-safe writes: JSON is written to a temporary file
+    in the same directory, which then replaces the target file. `fsync : str` specifies
+    durability policy for all writes: `none` (default), `file` (file content is flushed to disk)
+    or `directory` (parent directory is flushed as well). `autosave_policy : AutosavePolicy`
+    specifies when autosave writes the file (see `robust_json.autosave.AutosavePolicy`); by default
+    file is written after each change. Pending changes are written by `flush()`, `close()`, on exit
+    from `with` block and at interpreter exit. `lazy : bool` enables lazy mode: file is not loaded
+    when parser is created. Until `active_json` is needed, `get_key_value` (for simple paths) and
+    `iter_array` read the file incrementally, so memory usage doesn't depend on file size.
+    `use_mmap : bool` enables reading the file through a memory mapping: fast codecs parse JSON
+    straight from the mapped pages and lazy mode scans them without reading the file in chunks.
+
+    JSON Lines files (`.jsonl` and `.ndjson`, one JSON value per line) are loaded as an array of
+    records. Appending records to the end of this array (`append('$', record, True)`) is autosaved
+    by writing new lines to the end of file instead of rewriting it (in lazy mode, the file is not
+    even loaded). `line_index : bool` enables an in-memory index of line offsets, so records are
+    accessed by index (e.g. `get_key_value('[1000000].id')`) without reading preceding lines
+    (it can only be enabled in lazy mode).
+
+    `journal : bool` enables change journal (requires autosaving): instead of rewriting the source file,
+    autosave appends each change (`append`, `update_value` or `delete`) to a journal file next to it
+    (`<path>.journal`) as a small operation. Journal is replayed when the file is loaded. Once journal
+    grows larger than `journal_threshold : int` bytes (default: 1 MiB), the source file is rewritten
+    and journal is removed (see `compact()`).
+
+    `thread_safe : bool` enables thread-safe mode for parsers shared between threads: reads
+    (`get_key_value`, `iter_array`) hold a reader/writer lock for reading, so they run in parallel,
+    while changes and saves (including autosave) hold it for writing, so they are exclusive.
+    Without it, changes and saves are still serialized, but reads are not synchronized with them.
+
+    `locking : str` enables cross-process locking of the source file (POSIX only): `none` (default),
+    `lock` (file is loaded under a shared lock and written under an exclusive one) or `optimistic`
+    (requires `atomic_write`: file is loaded without locking, so readers never wait for writers).
+    Before the source file is written, parser checks if it has been changed
+    by another process since it was loaded; if so, file is loaded again and pending changes are
+    reapplied on top of it, so changes of other processes are not overwritten. If they can't be
+    reapplied (e.g. another process has deleted an object they change), a `JSONFileError` is raised,
+    and parser keeps its active object and pending changes. Use `locked()` to
+    hold the lock for a whole read-modify-write sequence.
+
+    `shared : bool` enables sharing of parsed files: file is loaded through the process-wide document
+    cache (see `robust_json.cache.document_cache`), so parsers of the same (unchanged) file that use the same
+    codec parse it only once and share one tree. This mode implies `copy_on_write`: nodes are copied only when they are changed
+    by this class' methods. Shared tree must never be modified directly (e.g. through `active_json`).
+
+    Parameters that only make sense together with another one raise a `ValueError` when it is missing:
+    `autosave_policy` and `journal` require `autosave`, `write_buffer_size` requires
+    `streaming`, `journal_threshold` requires `journal`, `line_index` requires `lazy` and a JSON Lines
+    file, and `optimistic` locking requires `atomic_write`. `journal` can't be combined with `lazy`,
+    `autosave_path` or `locking`. All other combinations are supported: e.g. `streaming` with
+    `atomic_write` streams JSON into the temporary file, and `shared` implies `copy_on_write`
+    (passing both is allowed).
+
     For more information please visit:
     https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-overview
     """
 
-    def __init__(self, path, autosave: bool = False, **kwargs):
+    def __init__(
+        self,
+        path,
+        autosave: bool = False,
+        copy_on_write: bool = False,
+        codec: Union[str, JsonCodec] = None,
+        streaming: bool = False,
+        write_buffer_size: int = None,
+        atomic_write: bool = False,
+        fsync: str = "none",
+        autosave_policy: AutosavePolicy = None,
+        lazy: bool = False,
+        use_mmap: bool = False,
+        line_index: bool = False,
+        journal: bool = False,
+        journal_threshold: int = None,
+        thread_safe: bool = False,
+        locking: str = "none",
+        shared: bool = False,
+        **kwargs,
+    ):
+        if type(copy_on_write) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "copy_on_write", "bool", type(copy_on_write).__name__
+            )
+
+        if type(streaming) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "streaming", "bool", type(streaming).__name__
+            )
+
+        if type(write_buffer_size) != int and write_buffer_size != None:
+            raise IncorrectFunctionParameterTypeError(
+                "write_buffer_size", "int", type(write_buffer_size).__name__
+            )
+
+        if write_buffer_size != None and write_buffer_size <= 0:
+            raise ValueError("Parameter `write_buffer_size` must be a positive integer.")
+
+        if write_buffer_size != None and not streaming:
+            raise ValueError("Parameter `write_buffer_size` requires streaming to be enabled.")
+
+        if type(atomic_write) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "atomic_write", "bool", type(atomic_write).__name__
+            )
+
+        if type(fsync) != str:
+            raise IncorrectFunctionParameterTypeError("fsync", "str", type(fsync).__name__)
+
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f'Supported fsync policies are {", ".join(FSYNC_POLICIES)}; got `{fsync}` instead.'
+            )
+
+        if type(autosave_policy) != AutosavePolicy and autosave_policy != None:
+            raise IncorrectFunctionParameterTypeError(
+                "autosave_policy", "AutosavePolicy", type(autosave_policy).__name__
+            )
+
+        if autosave_policy != None and not autosave:
+            raise ValueError("Parameter `autosave_policy` requires autosaving to be enabled.")
+
+        if type(lazy) != bool:
+            raise IncorrectFunctionParameterTypeError("lazy", "bool", type(lazy).__name__)
+
+        if type(use_mmap) != bool:
+            raise IncorrectFunctionParameterTypeError("use_mmap", "bool", type(use_mmap).__name__)
+
+        if type(line_index) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "line_index", "bool", type(line_index).__name__
+            )
+
+        if line_index and not (lazy and type(path) == str and service().is_json_lines(path)):
+            raise ValueError("Parameter `line_index` requires lazy mode and a JSON Lines file.")
+
+        if type(journal) != bool:
+            raise IncorrectFunctionParameterTypeError("journal", "bool", type(journal).__name__)
+
+        if type(journal_threshold) != int and journal_threshold != None:
+            raise IncorrectFunctionParameterTypeError(
+                "journal_threshold", "int", type(journal_threshold).__name__
+            )
+
+        if journal_threshold != None and journal_threshold <= 0:
+            raise ValueError("Parameter `journal_threshold` must be a positive integer.")
+
+        if journal_threshold != None and not journal:
+            raise ValueError("Parameter `journal_threshold` requires journal to be enabled.")
+
+        if journal and not autosave:
+            raise ValueError("Parameter `journal` requires autosaving to be enabled.")
+
+        if journal and (lazy or "autosave_path" in kwargs):
+            raise ValueError(
+                "Parameter `journal` cannot be used together with lazy mode or `autosave_path`."
+            )
+
+        if type(thread_safe) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "thread_safe", "bool", type(thread_safe).__name__
+            )
+
+        if type(locking) != str:
+            raise IncorrectFunctionParameterTypeError("locking", "str", type(locking).__name__)
+
+        if locking not in LOCKING_MODES:
+            raise ValueError(
+                f'Supported locking modes are {", ".join(LOCKING_MODES)}; got `{locking}` instead.'
+            )
+
+        if journal and locking != "none":
+            raise ValueError("Parameter `journal` cannot be used together with file locking.")
+
+        if locking == "optimistic" and not atomic_write:
+            # A file that is rewritten in place can't be read without locking
+            raise ValueError("Locking mode `optimistic` requires `atomic_write` to be enabled.")
+
+        if type(shared) != bool:
+            raise IncorrectFunctionParameterTypeError("shared", "bool", type(shared).__name__)
+
         self.__path = path
-        self.__file_formats = [".json", ".txt"]
+        self.__use_mmap = use_mmap
+        self.__file_formats = [".json", ".txt", ".jsonl", ".ndjson"]
         self.__service = service()
+        self.__json_lines = type(path) == str and self.__service.is_json_lines(path)
+        # JSON Lines state: records already written to file (`__saved_records` first items
+        # of `__saved_root`), records appended in lazy mode and offsets of lines in file
+        self.__saved_root = None
+        self.__saved_records = 0
+        self.__pending_records = []
+        self.__use_line_index = line_index
+        self.__line_index = None
+        self.__codec = get_codec(codec)
+        self.__streaming = streaming
+        self.__write_buffer_size = write_buffer_size if write_buffer_size != None else 65536
+        self.__atomic_write = atomic_write
+        self.__fsync = fsync
         self.__is_autosaving = autosave
+        # Shared tree is never modified, so only copy-on-write mode can use it
+        self.__shared = shared
+        self.__copy_on_write = copy_on_write or shared
+        self.__cow = CopyOnWrite()
         self.__kwargs = kwargs
+        # Guards active object while it is changed or saved by background autosave;
+        # in thread-safe mode, reads hold it as well (for reading)
+        if thread_safe:
+            self.__lock = ReadWriteLock()
+            self.__read_lock = self.__lock.reader
+        else:
+            self.__lock = threading.RLock()
+            self.__read_lock = contextlib.nullcontext()
+        self.__batch_log = BatchLog()
+        self.__indexes = JsonIndexSet()
+        self.__journal = Journal(path, self.__codec, fsync) if journal else None
+        self.__journal_threshold = journal_threshold if journal_threshold != None else 1048576
+        # Cross-process locking: lock mode and state of source file when it was last read or written
+        self.__locking = locking
+        self.__file_lock = FileLock(path) if locking != "none" else None
+        self.__signature = None
+        # State (and content hash, if it has been calculated) of source file when it was last read or written
+        self.__file_state = None
+        self.__digest = None
+        self.__watcher = None
+        # Changes not written to journal (or source file, if locking is enabled) yet
+        self.__operations = []
+        self.__replaying = False
+        if self.__is_autosaving:
+            self.__autosave = AutosaveScheduler(
+                self.__save_autosave, autosave_policy or AutosavePolicy()
+            )
 
-        if self.__service.check_file(self.__path, self.__file_formats):
-            self.active_json = self.get_json_from_file()
-            self.__backup = self.get_json_from_file()
+        self.__loaded = False
+        if lazy:
+            # Document is loaded on first access to `active_json`
+            self.__service.verify_file(self.__path, self.__file_formats)
+            if os.path.getsize(self.__path) == 0:
+                self.__load()
         else:
+            self.__load()
+
+    def __load(self) -> None:
+        pending = list(self.__pending_records)
+        # File is read and parsed only once; backup is copied from parsed object
+        try:
+            self.get_json_from_file()
+        except ValueError:
             raise JSONFileError(f"Error parsing file `{self.path}`. Its content cannot be parsed.")
+        if pending:
+            # Records appended in lazy mode that are not saved yet
+            self.active_json = self.active_json + pending
+            self.__saved_root = self.active_json
+
+    def __unload(self) -> None:
+        # Returns to lazy mode; file will be loaded again when needed
+        self.__loaded = False
+        del self.active_json
+        self.__indexes.invalidate()
+
+    def __getattr__(self, name):
+        # In lazy mode, `active_json` attribute is created on first access
+        if name == "active_json" and self.__dict__.get("_JsonFileParser__loaded") == False:
+            with self.__lock:
+                if not self.__loaded:
+                    self.__load()
+            return self.active_json
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @contextlib.contextmanager
+    def __reading(self):
+        # Holds the lock for reading and yields active object. In lazy mode, file is loaded
+        # first: loading needs the lock for writing, which can't be acquired by a reader
+        while True:
+            if not self.__loaded:
+                with self.__lock:
+                    if not self.__loaded:
+                        self.__load()
+            with self.__read_lock:
+                # Batch rollback may have returned parser to lazy mode in the meantime
+                if self.__loaded:
+                    yield self.active_json
+                    return
 
     @property
     def file_formats(self):
@@ -62,6 +357,13 @@ class JsonFileParser:
         """
         return self.__file_formats
 
+    @property
+    def codec(self) -> JsonCodec:
+        """
+        JSON codec used for reading and writing files.
+        """
+        return self.__codec
+
     @property
     def path(self):
         """
@@ -74,35 +376,526 @@ class JsonFileParser:
         """
         The initial JSON object (without any recent changes).
         """
+        if not self.__loaded:
+            with self.__lock:
+                if not self.__loaded:
+                    self.__load()
         return self.__backup
 
+    @property
+    def lazy(self) -> bool:
+        """
+        `True` if file has not been loaded yet (lazy mode).
+        """
+        return not self.__loaded
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __changed(self, operation: list, appended: bool = False) -> None:
+        # Called after each change of active object. `operation` describes the change
+        # for the journal and file locking; `appended` means that records were only appended
+        # to the end of root array (JSON Lines files)
+        if not appended:
+            self.__saved_root = None
+        if self.__replaying:
+            # Change is being reapplied (from the journal or after another process changed the file)
+            return
+        if self.__journal is not None or self.__file_lock is not None:
+            self.__batch_log.touch(self.__operations)
+            self.__operations.append(operation)
+        if self.__batch_log.active:
+            # Batch is saved once, when it ends
+            self.__batch_log.mark_changed()
+        elif self.__is_autosaving:
+            self.__autosave.notify()
+
+    def __save_autosave(self) -> None:
+        if "autosave_path" in self.__kwargs:
+            if type(self.__kwargs["autosave_path"]) != str:
+                raise IncorrectFunctionParameterTypeError(
+                    "autosave_path", "str", type(self.__kwargs["autosave_path"]).__name__
+                )
+            path = self.__kwargs["autosave_path"]
+            if not os.path.exists(path):
+                create_file = True
+            else:
+                create_file = False
+        else:
+            path = self.__path
+            create_file = False
+        with self.__lock, self.__locked_file(path):
+            if self.__journal is not None:
+                self.__write_journal()
+                return
+            if path == self.__path and self.__json_lines and not self.__atomic_write:
+                if self.__append_records():
+                    return
+            self.save_to_file(path=path, create_file=create_file)
+
+    def __write_journal(self) -> None:
+        if self.__operations and self.__operations[0] == ["reset"]:
+            # Active object has been reset (inside a batch): journal no longer applies to it
+            self.compact()
+            return
+        if self.__operations:
+            self.__journal.write(self.__operations)
+            self.__operations.clear()
+        if self.__journal.size >= self.__journal_threshold:
+            self.compact()
+
+    def __replay_journal(self) -> None:
+        # Applies changes from the journal to the object that has just been loaded
+        try:
+            operations = self.__journal.read()
+        except ValueError:
+            raise JSONFileError(f"Error parsing journal `{self.__journal.path}`.")
+        self.__apply_operations(operations)
+
+    def __apply_operations(self, operations: list) -> None:
+        self.__replaying = True
+        try:
+            for operation in operations:
+                if operation[0] == "append":
+                    self.append(*operation[1:])
+                elif operation[0] == "update":
+                    self.update_value(*operation[1:])
+                elif operation[0] == "delete":
+                    self.delete(*operation[1:])
+                elif operation[0] == "update_many":
+                    self.update_many(*operation[1:])
+                elif operation[0] == "delete_many":
+                    self.delete_many(*operation[1:])
+                elif operation[0] == "reverse":
+                    self.reverse_array(*operation[1:])
+                elif operation[0] == "reset":
+                    self.reset(True)
+                else:
+                    raise ValueError(f"Unknown operation `{operation[0]}`.")
+        except Exception as e:
+            raise JSONFileError(f"Changes cannot be applied to file `{self.path}`: {e}")
+        finally:
+            self.__replaying = False
+
+    def __reload(self) -> None:
+        # Loads source file again and reapplies pending changes on top of it. If they can't be
+        # reapplied (e.g. another process has deleted an object they change), parser is restored
+        # to the state it had before, so pending changes are neither lost nor saved half-applied
+        operations = list(self.__operations)
+        state = (
+            self.active_json,
+            self.__file_state,
+            self.__signature,
+            self.__digest,
+            self.__saved_root,
+            self.__saved_records,
+            list(self.__pending_records),
+            self.__line_index,
+        )
+        try:
+            try:
+                self.get_json_from_file()
+            except ValueError:
+                raise JSONFileError(f"Error parsing file `{self.path}`. Its content cannot be parsed.")
+            self.__apply_operations(operations)
+        except BaseException:
+            (
+                self.active_json,
+                self.__file_state,
+                self.__signature,
+                self.__digest,
+                self.__saved_root,
+                self.__saved_records,
+                self.__pending_records[:],
+                self.__line_index,
+            ) = state
+            self.__operations[:] = operations
+            # Nodes copied while changes were reapplied belong to the discarded object
+            self.__cow.reset()
+            self.__indexes.invalidate()
+            raise
+        self.__operations.extend(operations)
+
+    def __file_signature(self) -> tuple:
+        return (self.__file_lock.generation, self.__service.file_state(self.__path))
+
+    @contextlib.contextmanager
+    def __locked_file(self, path: str):
+        # Holds source file locked for writing. If another process has changed it since
+        # it was read, it is loaded again and pending changes are reapplied on top of it
+        if self.__file_lock is None or path != self.__path:
+            yield
+            return
+        with self.__file_lock.hold(True):
+            signature = self.__file_signature()
+            if signature != self.__signature:
+                if self.__loaded:
+                    self.__reload()
+                else:
+                    # Only records appended in lazy mode are pending; they don't conflict
+                    self.__signature = signature
+                    self.__line_index = None
+            yield
+
+    def __file_written(self, changes_saved: bool = True) -> None:
+        # Called after source file has been written (under the lock, if locking is enabled)
+        self.__file_state = self.__service.file_state(self.__path)
+        self.__digest = None
+        if self.__file_lock is not None:
+            self.__file_lock.advance()
+            self.__signature = self.__file_signature()
+            if changes_saved:
+                self.__operations.clear()
+
+    @contextlib.contextmanager
+    def locked(self):
+        """
+        Hold exclusive cross-process lock of the source file inside `with` block.
+
+        When block starts, changes made to the source file by other processes are loaded
+        (pending changes of this parser are reapplied on top of them). Other processes with
+        file locking enabled can't read (in `lock` mode) or write the file until block ends,
+        so a read-modify-write sequence is never interleaved with their changes. If autosave
+        is enabled, all pending changes are written when block ends.
+
+        This function returns a context manager which yields this parser.
+
+        This function raises a `ValueError` if file locking is disabled.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('counter.json', autosave=True, locking='lock')
+        >>> with op.locked():
+        ...     op.update_value('$', 'counter', op.get_key_value('counter') + 1)
+        # Counter is incremented exactly once, even if several processes do it at the same time
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if self.__file_lock is None:
+            raise ValueError("File locking is disabled. Set `locking` parameter to enable it.")
+        with self.__lock, self.__locked_file(self.__path):
+            yield self
+            if self.__is_autosaving:
+                self.__autosave.flush()
+
+    def compact(self) -> None:
+        """
+        Rewrite source file with active object and remove change journal.
+
+        Autosave calls this function automatically when journal grows larger
+        than `journal_threshold` bytes. If journal is disabled, this function
+        simply saves active object to the source file.
+
+        This function raises any exceptions raised while saving.
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        with self.__lock:
+            self.save_to_file()
+
+    def __append_records(self) -> bool:
+        # Writes records appended to JSON Lines file since the last save;
+        # returns `False` if the whole file needs to be rewritten
+        if not self.__loaded:
+            records = self.__pending_records
+        elif self.active_json is self.__saved_root and len(self.active_json) >= self.__saved_records:
+            records = self.active_json[self.__saved_records :]
+        else:
+            return False
+
+        if records:
+            offsets = self.__service.append_json_lines(
+                self.__path, records, self.__codec, self.__fsync
+            )
+            if self.__line_index is not None:
+                self.__line_index.extend(offsets)
+            self.__file_written()
+
+        if not self.__loaded:
+            self.__pending_records.clear()
+        else:
+            self.__saved_records = len(self.active_json)
+        return True
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group several changes into one operation.
+
+        Inside `with` block, `append`, `update_value` and `delete` change
+        active object in memory only; autosave (if enabled) runs at most once, when
+        block ends. If an exception escapes the block, active object is restored
+        to the state it had before the block, and the exception is re-raised.
+        Batches can be nested: inner batch is rolled back on its own, while its
+        changes are saved together with the outermost batch.
+
+        This function returns a context manager which yields this parser.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('users.json', autosave=True)
+        >>> with op.batch():
+        ...     for i in range(1000):
+        ...         op.append('users', { 'id': i }, True)
+        # File is written once instead of 1000 times
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        with self.__lock:
+            loaded = self.__loaded
+            self.__batch_log.begin(self.active_json if loaded else None)
+            try:
+                yield self
+            except BaseException:
+                root = self.__batch_log.rollback()
+                # Containers have been restored in place
+                self.__indexes.invalidate()
+                if loaded:
+                    self.active_json = root
+                elif self.__loaded:
+                    # File was loaded inside the batch
+                    self.__unload()
+                raise
+            if self.__batch_log.commit() and self.__is_autosaving:
+                self.__autosave.notify()
+
+    def flush(self) -> None:
+        """
+        Write all pending autosave changes to file.
+
+        If autosaving is disabled, this function does nothing.
+
+        This function raises any exceptions raised while saving (including
+        the ones raised earlier by background autosave).
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if self.__is_autosaving:
+            self.__autosave.flush()
+
+    def close(self) -> None:
+        """
+        Stop file watcher and background autosave (if enabled) and write all pending changes to file.
+
+        This function is called automatically on exit from `with` block.
+        Parser can still be used after it is closed.
+
+        This function raises the same exceptions as `flush`.
+        """
+        if self.__watcher is not None:
+            self.__watcher.stop()
+            self.__watcher = None
+        if self.__is_autosaving:
+            self.__autosave.close()
+        if self.__journal is not None:
+            self.__journal.close()
+        if self.__file_lock is not None:
+            self.__file_lock.close()
+
+    def refresh(self, use_hash: bool = False) -> bool:
+        """
+        Reload source file if it has changed since it was last read or written.
+
+        Unlike `get_json_from_file`, this function doesn't read the file if its metadata
+        (inode, size and modification time) is unchanged, so it is cheap to call often.
+        If file is reloaded, changes of active object that have not been saved are lost
+        (unless journal or file locking is enabled: then they are reapplied to the new object).
+        In lazy mode nothing is loaded, so this function only drops stale line index.
+
+        Parameters: `use_hash : bool` enables content check: file is read and its hash is
+        compared with the hash of the loaded content, so file is reloaded only if its content
+        has changed (e.g. not when it was only touched), and changes that keep size and
+        modification time the same are not missed. Hashing is much cheaper than parsing.
+        Hash of the loaded content is recorded by the first check with `use_hash` (file is
+        reloaded instead if its metadata has changed by then), so such changes are detected
+        only after that check.
+
+        This function returns `True` if file has been reloaded.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if `use_hash` parameter has an incorrect type.
+        This function raises a `JSONFileError` if file content cannot be parsed or pending changes
+        cannot be reapplied to it (active object and pending changes are kept then).
+        This function raises an `OSError` if file cannot be accessed.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('config.json')
+        >>> op.refresh()
+        # Output: False (file has not changed)
+        # ...'config.json' is changed by another program...
+        >>> op.refresh()
+        # Output: True (op.active_json contains new configuration)
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(use_hash) != bool:
+            raise IncorrectFunctionParameterTypeError("use_hash", "bool", type(use_hash).__name__)
+
+        with self.__lock:
+            state = self.__service.file_state(self.__path)
+            if not self.__loaded:
+                if state != self.__file_state:
+                    self.__line_index = None
+                return False
+
+            if use_hash:
+                digest = self.__service.hash_file(self.__path)
+                if self.__digest is None and state == self.__file_state:
+                    # Hash of loaded content is calculated on the first check
+                    self.__digest = digest
+                if digest == self.__digest:
+                    self.__file_state = state
+                    return False
+            elif state == self.__file_state:
+                return False
+
+            self.__reload()
+            if use_hash:
+                self.__digest = digest
+            return True
+
+    def watch(self, interval: int = 1000, use_hash: bool = False, callback=None) -> FileWatcher:
+        """
+        Start reloading source file in background when it changes.
+
+        Watcher thread calls `refresh()` every `interval` milliseconds. Only one watcher
+        can run at a time: previous watcher is stopped. Watcher is stopped by `close()`
+        (or on exit from `with` block).
+
+        Parameters: `interval : int` specifies how many milliseconds pass between checks
+        (default: 1000). `use_hash : bool` enables content check (see `refresh()`).
+        `callback : Callable` specifies function that is called with this parser
+        as its only argument each time the file has been reloaded.
+
+        This function returns a `robust_json.watcher.FileWatcher` instance (it can be stopped with its `stop()` method).
+
+        This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+        This function raises a `ValueError` if `interval` is not positive.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('config.json')
+        >>> op.watch(500, callback=lambda parser: print('Reloaded'))
+        # 'config.json' is checked twice a second; op.active_json always holds recent configuration
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(interval) != int:
+            raise IncorrectFunctionParameterTypeError("interval", "int", type(interval).__name__)
+
+        if type(use_hash) != bool:
+            raise IncorrectFunctionParameterTypeError("use_hash", "bool", type(use_hash).__name__)
+
+        if callback is not None and not callable(callback):
+            raise IncorrectFunctionParameterTypeError(
+                "callback", "Callable", type(callback).__name__
+            )
+
+        if interval <= 0:
+            raise ValueError("Parameter `interval` must be a positive integer.")
+
+        if self.__watcher is not None:
+            self.__watcher.stop()
+        self.__watcher = FileWatcher(
+            lambda: self.refresh(use_hash),
+            interval,
+            (lambda: callback(self)) if callback is not None else None,
+        )
+        self.__watcher.start()
+        return self.__watcher
+
     def get_json_from_file(self) -> dict:
         """
         Extract all JSON from source file.
 
         This function reads the source file and returns JSON object from it
-        as a Python dictionary.
+        as a Python dictionary (or a list of records for JSON Lines files).
 
         This function is automatically called when class instance is
-        created.
+        created (in lazy mode, when `active_json` is accessed for the first time).
+        It also replaces active object with the one from file,
+        so returned dictionary and `active_json` are the same object.
+
+        This function raises a `ValueError` if file content cannot be parsed.
 
         For more information please visit: https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
         """
-        file = open(self.__path, "r")
-        cont = file.read()
-        file.close()
-
-        self.active_json = JSON.loads(
-            cont
-        )  # * May deprecate this line due to the fact that in __init__ its return value is assigned to self.active_json (double assignment)
-        return JSON.loads(cont)
+        # Active object is replaced, so concurrent changes (and readers, in thread-safe mode) wait
+        with self.__lock:
+            # With atomic writes (required by optimistic mode), file is never seen partially written,
+            # so optimistic mode reads it without locking
+            if self.__file_lock is not None and self.__locking == "lock":
+                lock = self.__file_lock.hold(False)
+            else:
+                lock = contextlib.nullcontext()
+            with lock:
+                # State is recorded before file is read, so a concurrent write is never missed
+                self.__service.verify_file(self.__path, self.__file_formats)
+                state = self.__service.file_state(self.__path)
+                if self.__file_lock is not None:
+                    self.__signature = (self.__file_lock.generation, state)
+                # File is read and parsed in a single pass
+                if self.__shared:
+                    self.active_json = document_cache.get(
+                        self.__path,
+                        state,
+                        lambda: self.__service.load_file(
+                            self.__path, self.__file_formats, self.__codec, self.__use_mmap
+                        ),
+                        self.__codec,
+                        self.__use_mmap,
+                    )
+                else:
+                    self.active_json = self.__service.load_file(
+                        self.__path, self.__file_formats, self.__codec, self.__use_mmap
+                    )
+            self.__file_state = state
+            if self.__copy_on_write:
+                # None of the new nodes are owned by this parser yet
+                self.__cow.reset()
+            # Indexed arrays belong to the previous object
+            self.__indexes.invalidate()
+            self.__digest = None
+            if self.__json_lines:
+                self.__saved_root = self.active_json
+                self.__saved_records = len(self.active_json)
+                self.__pending_records.clear()
+                self.__line_index = None
+            first_load = not self.__loaded
+            self.__loaded = True
+            # Active object is in sync with file (and journal) now
+            self.__operations.clear()
+            if self.__journal is not None:
+                self.__replay_journal()
+            if first_load:
+                if self.__copy_on_write:
+                    # Active object shares all nodes with backup until they are modified
+                    self.__backup = self.active_json
+                    self.__cow.reset()
+                else:
+                    self.__backup = self.__service.copy_json(self.active_json)
+            return self.active_json
 
     def get_key_value(self, json_path: str) -> Any:
         """
         Retrieve specific key:value pair from JSON.
 
         This function fetches key:value pair from JSON object according to provided path
-        and returns only the value.
+        and returns only the value. In lazy mode, simple paths (e.g. `field1.field2.[3]`) are
+        resolved by reading the file incrementally, without loading it.
 
         Parameters: `json_path : str` specifies JSON property path (e.g. field1.field2.[...].fieldn).
 
@@ -139,22 +932,341 @@ class JsonFileParser:
         if type(json_path) != str:
             raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
 
-        json_content = self.active_json
-
-        # Verifying JSON path
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+        if not self.__loaded and json_path != "":
+            steps = path_cache.get(json_path).steps
+            if steps is not None:
+                # File can't be loaded (and changed) while it is being read
+                with self.__read_lock:
+                    if not self.__loaded:
+                        return self.__find_in_file(json_path, steps)
 
-        js_expr = jsonpath.parse(json_path)  # Parsing JSON
+        with self.__reading() as json_content:
+            # Resolving JSON path (validation and lookup share one traversal)
+            res = self.__service.resolve_json_path(json_path, json_content)
 
-        res = [
-            item.value for item in js_expr.find(json_content)
-        ]  # Filling an array with all matches
+        if not res:
+            raise JSONPathError(f"Path `{json_path}` is not valid.")
 
         if len(res) == 1:
             return res[0]
         return res
 
+    def get_key_values(self, json_paths: list) -> dict:
+        """
+        Retrieve values of several key:value pairs from JSON at once.
+
+        Unlike calling `get_key_value` for each path, this function compiles all paths
+        once and resolves simple paths (e.g. `field1.field2.[3]`) in a single traversal
+        of JSON object, following their common prefixes only once. In lazy mode, paths are
+        resolved one by one (see `get_key_value`).
+
+        Parameters: `json_paths : list` specifies JSON property paths (e.g. field1.field2.[...].fieldn).
+
+        This function returns a Python dictionary that maps each path to its value
+        (the same value `get_key_value` would return).
+
+        This function raises an `IncorrectFunctionParameterTypeError` if
+        `json_paths` parameter has an incorrect type.
+        This function raises a `JSONPathError` if one of JSON paths is not valid.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('config.json')
+        # Object from `config.json` >> { "db": { "host": "localhost", "port": 5432 }, "debug": false }
+        >>> op.get_key_values(['db.host', 'db.port', 'debug'])
+        # Output: { "db.host": "localhost", "db.port": 5432, "debug": False }
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(json_paths) != list and type(json_paths) != tuple:
+            raise IncorrectFunctionParameterTypeError(
+                "json_paths", "list", type(json_paths).__name__
+            )
+
+        if not self.__loaded:
+            steps = [
+                path_cache.get(path).steps if type(path) == str and path != "" else None
+                for path in json_paths
+            ]
+            if None not in steps:
+                # Simple paths are resolved by reading the file incrementally; all of them
+                # are read under one lock, so file can't be loaded and changed in between
+                with self.__read_lock:
+                    if not self.__loaded:
+                        return {
+                            path: self.__find_in_file(path, path_steps)
+                            for path, path_steps in zip(json_paths, steps)
+                        }
+
+        with self.__reading() as json_content:
+            matches = self.__service.resolve_json_paths(json_paths, json_content)
+
+        res = {}
+        for path in json_paths:
+            found = matches[path]
+            if not found:
+                raise JSONPathError(f"Path `{path}` is not valid.")
+            res[path] = found[0] if len(found) == 1 else found
+        return res
+
+    def create_index(self, json_path: str, field: str) -> JsonArrayIndex:
+        """
+        Build a hash index over an array of JSON objects.
+
+        Index maps values of `field` to array items, so `lookup` (and `robust_json.ext.filter_json_array`
+        called with this index) finds items in O(1) instead of scanning the whole array. Index is kept
+        up to date by `append`, `update_value`, `delete`, `update_many` and `delete_many`: appending items
+        to the end of array, replacing items and changing indexed field update it in place, while other
+        changes (e.g. deleting an item from the middle of array) invalidate it, and it is rebuilt on the
+        next lookup. Changes made to `active_json` directly are not tracked (see `JsonArrayIndex.rebuild`).
+        When active object is replaced (e.g. reloaded or reset), indexes release the old one.
+        If index already exists, it is rebuilt.
+
+        Parameters: `json_path : str` specifies path to the array (it is used as a key of the index, so
+        `lookup` must be called with the same path), `field : str` specifies indexed field.
+
+        This function returns a `JsonArrayIndex` object.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+        This function raises a `ValueError` if `field` parameter is empty.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to an array.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('users.json')
+        # Object from `users.json` >> { "users": [ { "id": 1, "name": "Ann" }, { "id": 2, "name": "Bob" } ] }
+        >>> op.create_index('users', 'id')
+        >>> op.lookup('users', 'id', 2)
+        # Output: [ { "id": 2, "name": "Bob" } ]
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        if type(field) != str:
+            raise IncorrectFunctionParameterTypeError("field", "str", type(field).__name__)
+
+        if field == "":
+            raise ValueError("Parameter `field` is empty.")
+
+        with self.__lock:
+            array = self.__resolve_array(json_path, self.active_json)
+            index = self.__indexes.get(json_path, field)
+            if index is None:
+                index = JsonArrayIndex(json_path, field)
+                self.__indexes.add(index)
+            index.build(array)
+            return index
+
+    def drop_index(self, json_path: str, field: str) -> None:
+        """
+        Remove index created by `create_index`.
+
+        Parameters: `json_path : str` specifies path to the array, `field : str` specifies indexed field.
+
+        This function raises a `ValueError` if index does not exist.
+        """
+        with self.__lock:
+            self.__indexes.remove(json_path, field)
+
+    @property
+    def indexes(self) -> list:
+        """
+        List of indexes created by `create_index`.
+        """
+        with self.__read_lock:
+            return list(self.__indexes)
+
+    def lookup(self, json_path: str, field: str, value: Any) -> list:
+        """
+        Find objects in JSON array whose `field` is equal to `value`.
+
+        If array has been indexed by this field (see `create_index`), objects are found
+        through index in O(1); otherwise array is scanned. Array items that are not objects
+        or don't have this field are skipped.
+
+        Parameters: `json_path : str` specifies path to the array, `field : str` specifies
+        field name and `value : Any` specifies its value.
+
+        This function returns a list of matched objects (in array order).
+
+        This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to an array.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('users.json')
+        # Object from `users.json` >> { "users": [ { "id": 1, "name": "Ann" }, { "id": 2, "name": "Bob" } ] }
+        >>> op.lookup('users', 'name', 'Ann')
+        # Output: [ { "id": 1, "name": "Ann" } ]
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        if type(field) != str:
+            raise IncorrectFunctionParameterTypeError("field", "str", type(field).__name__)
+
+        with self.__reading() as json_content:
+            array = self.__resolve_array(json_path, json_content)
+            index = self.__indexes.get(json_path, field)
+            if index is not None and index.sync(array):
+                try:
+                    return index.items(value)
+                except TypeError:
+                    # Unhashable values (objects and arrays) are not indexed
+                    pass
+            return [item for item in array if type(item) == dict and field in item and item[field] == value]
+
+    def __resolve_array(self, json_path: str, json_content: Any) -> list:
+        matches = self.__service.resolve_json_path(json_path, json_content)
+        if not matches:
+            raise JSONPathError(f"Path `{json_path}` is not valid.")
+        if type(matches[0]) != list:
+            raise TypeError(
+                f"Path `{json_path}` must point to a JSON array; got `{type(matches[0]).__name__}` instead."
+            )
+        return matches[0]
+
+    def iter_array(self, json_path: str):
+        """
+        Iterate over elements of a JSON array.
+
+        In lazy mode, if JSON path is simple (e.g. `field1.field2.[3]`), elements are
+        read from file one by one, so memory usage is bounded by the size of
+        the largest element. Otherwise, elements of an array from active object are iterated.
+        Iteration itself never holds parser's lock (in thread-safe mode, the read lock is only held
+        while array is located), so the array can be changed while it is iterated. In lazy mode, file
+        stays open while it is iterated: with `atomic_write`, elements are read from the file as it was
+        when iteration started, while a file that is rewritten in place in the meantime may make
+        iteration fail with a `JSONFileError`.
+
+        Parameters: `json_path : str` specifies JSON path to the array.
+
+        This function returns an iterator over array elements.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if
+        `json_path` parameter has an incorrect type.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to a JSON array.
+        This function raises a `JSONFileError` if file content cannot be parsed (lazy mode).
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('events.json', lazy=True)
+        # Object from `events.json` >> { "events": [ { "id": 1 }, { "id": 2 }, ... ] }
+        >>> for event in op.iter_array('events'):
+        ...     print(event['id'])
+        # Output: 1 2 ...
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        if not self.__loaded and json_path != "":
+            steps = path_cache.get(json_path).steps
+            if steps is not None:
+                # Array is located under the lock; items are read after it is released
+                with self.__read_lock:
+                    if not self.__loaded:
+                        return self.__iter_file_array(json_path, steps)
+
+        with self.__reading() as json_content:
+            matches = self.__service.resolve_json_path(json_path, json_content)
+
+        if not matches:
+            raise JSONPathError(f"Path `{json_path}` is not valid.")
+
+        if len(matches) != 1 or type(matches[0]) != list:
+            raise TypeError(f"Path `{json_path}` is not pointing to a JSON array.")
+        return iter(matches[0])
+
+    def __iter_file_array(self, json_path: str, steps: tuple):
+        # Array is located eagerly, so errors are raised before iteration starts
+        reader, release = self.__open_reader()
+        try:
+            if self.__json_lines:
+                if not steps:
+                    return self.__read_file_array(reader.iter_records(), release)
+                found, value = reader.find(steps)
+                release()
+                if not found:
+                    raise JSONPathError(f"Path `{json_path}` is not valid.")
+                if type(value) != list:
+                    raise TypeError(f"Path `{json_path}` is not pointing to a JSON array.")
+                return iter(value)
+            if not reader.locate(steps):
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
+            if not reader.start_array():
+                raise TypeError(f"Path `{json_path}` is not pointing to a JSON array.")
+        except ValueError:
+            release()
+            raise JSONFileError(f"Error parsing file `{self.path}`. Its content cannot be parsed.")
+        except BaseException:
+            release()
+            raise
+        return self.__read_file_array(reader.iter_array(), release)
+
+    def __read_file_array(self, items, release):
+        try:
+            yield from items
+        except ValueError:
+            raise JSONFileError(f"Error parsing file `{self.path}`. Its content cannot be parsed.")
+        finally:
+            release()
+
+    def __find_in_file(self, json_path: str, steps: tuple) -> Any:
+        # Looks up simple path in source file without loading it
+        reader, release = self.__open_reader()
+        try:
+            found, value = reader.find(steps)
+        except ValueError:
+            raise JSONFileError(f"Error parsing file `{self.path}`. Its content cannot be parsed.")
+        finally:
+            release()
+        if not found:
+            raise JSONPathError(f"Path `{json_path}` is not valid.")
+        return value
+
+    def __open_reader(self) -> tuple:
+        # Returns incremental reader of source file and a function that closes it
+        file = open(self.__path, "rb")
+        if not self.__use_mmap:
+            source, release = file, file.close
+        else:
+            try:
+                # Mapping stays valid after file is closed
+                source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            finally:
+                file.close()
+            release = source.close
+
+        if not self.__json_lines:
+            return JsonStreamReader(source, self.__codec), release
+
+        try:
+            if self.__use_line_index and self.__line_index is None:
+                self.__file_state = self.__service.file_state(self.__path)
+                self.__line_index = JsonLinesReader.build_line_index(source)
+        except BaseException:
+            release()
+            raise
+        reader = JsonLinesReader(source, self.__codec, self.__line_index, self.__pending_records)
+        return reader, release
+
     def append(self, json_path: str, append_value: Any, append_at_end: bool = False) -> dict:
         """
         Append new value to an existing JSON object.
@@ -172,6 +1284,8 @@ class JsonFileParser:
 
 
         This function returns a Python dictionary with updated content.
+        For JSON Lines files in lazy mode, records appended to the root array (`append('$', record, True)`)
+        are kept aside without loading the file, and this function returns `None`.
 
         This function raises a `FunctionParameterTypeError` exception if one or more of its parameters have an incorrect type.
         This function raises a `ValueError` exception if `append_value` parameter is empty (i.e
@@ -241,51 +1355,67 @@ class JsonFileParser:
         if append_value in empty_obj:
             raise ValueError(f"Parameter `append_value` is empty.")
 
-        json_content = self.active_json
+        if not self.__loaded and self.__json_lines and json_path == "$" and append_at_end:
+            with self.__lock:
+                # Record is written to the end of file on save; file is not loaded
+                self.__batch_log.touch(self.__pending_records)
+                self.__pending_records.append(append_value)
+                self.__changed(["append", json_path, append_value, True], appended=True)
+            return None
 
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+        with self.__lock:
+            json_content = self.active_json
 
-        js_expr = jsonpath.parse(json_path)
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
 
-        for item in js_expr.find(json_content):
-            temp = item.value
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-            if type(temp) == list:
+            for temp in matches:
 
-                if append_at_end == True:
-                    temp.append(append_value)
-                    self.active_json = json_content
-                    return json_content
-                else:
-                    for i in iter(temp):
-                        if type(i) == dict:
-                            if type(append_value) == dict:
-                                i.update(append_value)
-                            else:
-                                raise TypeError(
-                                    f"To append to a JSON object, parameter `append_value` must be a dictionary; got `{type(append_value).__name__}` instead."
-                                )
-                    self.active_json = json_content
-                    return json_content
-            temp.update(append_value)
-            self.active_json = json_content
-            if self.__is_autosaving:
-                if "autosave_path" in self.__kwargs:
-                    if type(self.__kwargs["autosave_path"]) != str:
-                        raise IncorrectFunctionParameterTypeError(
-                            "autosave_path", "str", type(self.__kwargs["autosave_path"]).__name__
+                if type(temp) == list:
+
+                    if append_at_end == True:
+                        self.__batch_log.touch(temp)
+                        temp.append(append_value)
+                        if self.__indexes:
+                            self.__indexes.item_appended(temp)
+                        self.active_json = json_content
+                        self.__changed(
+                            ["append", json_path, append_value, True],
+                            appended=temp is json_content,
                         )
-                    path = self.__kwargs["autosave_path"]
-                    if not os.path.exists(path):
-                        create_file = True
+                        return json_content
                     else:
-                        create_file = False
-                else:
-                    path = self.__path
-                    create_file = False
-                self.save_to_file(path=path, create_file=create_file)
-            return json_content
+                        if self.__copy_on_write:
+                            self.__cow.own_items(temp)
+                        for i in iter(temp):
+                            if type(i) == dict:
+                                if type(append_value) == dict:
+                                    self.__batch_log.touch(i)
+                                    i.update(append_value)
+                                else:
+                                    raise TypeError(
+                                        f"To append to a JSON object, parameter `append_value` must be a dictionary; got `{type(append_value).__name__}` instead."
+                                    )
+                        if self.__indexes:
+                            self.__indexes.items_changed(temp, append_value)
+                        self.active_json = json_content
+                        self.__changed(["append", json_path, append_value, False])
+                        return json_content
+                if self.__indexes:
+                    old_values = self.__indexes.old_values(temp, append_value)
+                self.__batch_log.touch(temp)
+                temp.update(append_value)
+                if self.__indexes:
+                    self.__indexes.fields_changed(temp, old_values)
+                self.active_json = json_content
+                self.__changed(["append", json_path, append_value, append_at_end])
+                return json_content
 
     def update_value(
         self,
@@ -387,58 +1517,57 @@ class JsonFileParser:
                 "key_or_index", "str or int", type(key_or_index).__name__
             )
 
-        json_content = self.active_json
+        with self.__lock:
+            json_content = self.active_json
 
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
 
-        js_expr = jsonpath.parse(json_path)
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-        for item in js_expr.find(json_content):
-            temp = item.value
-            if type(temp) == list:
-                if type(key_or_index) != int:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                if strict_mode == True:
-                    if type(temp[key_or_index]) != type(new_value):
-                        raise JSONStrictModeError(
-                            f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+            for temp in matches:
+                if type(temp) == list:
+                    if type(key_or_index) != int:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
                         )
-                temp[key_or_index] = new_value
-                self.active_json = json_content
-                return json_content
-            else:
-                if type(key_or_index) != str:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                if strict_mode == True:
-                    if type(temp[key_or_index]) != type(new_value):
-                        raise JSONStrictModeError(
-                            f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+                    if strict_mode == True:
+                        if type(temp[key_or_index]) != type(new_value):
+                            raise JSONStrictModeError(
+                                f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+                            )
+                    if self.__indexes:
+                        old_item = temp[key_or_index]
+                    self.__batch_log.touch(temp)
+                    temp[key_or_index] = new_value
+                    if self.__indexes:
+                        self.__indexes.item_replaced(temp, key_or_index, old_item)
+                    self.active_json = json_content
+                    self.__changed(["update", json_path, key_or_index, new_value])
+                    return json_content
+                else:
+                    if type(key_or_index) != str:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
                         )
-                temp.update({key_or_index: new_value})
-                self.active_json = json_content
-                if self.__is_autosaving:
-                    if "autosave_path" in self.__kwargs:
-                        if type(self.__kwargs["autosave_path"]) != str:
-                            raise IncorrectFunctionParameterTypeError(
-                                "autosave_path",
-                                "str",
-                                type(self.__kwargs["autosave_path"]).__name__,
+                    if strict_mode == True:
+                        if type(temp[key_or_index]) != type(new_value):
+                            raise JSONStrictModeError(
+                                f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
                             )
-                        path = self.__kwargs["autosave_path"]
-                        if not os.path.exists(path):
-                            create_file = True
-                        else:
-                            create_file = False
-                    else:
-                        path = self.__path
-                        create_file = False
-                    self.save_to_file(path=path, create_file=create_file)
-                return json_content
+                    if self.__indexes:
+                        old_values = self.__indexes.old_values(temp, (key_or_index,))
+                    self.__batch_log.touch(temp)
+                    temp.update({key_or_index: new_value})
+                    if self.__indexes:
+                        self.__indexes.fields_changed(temp, old_values)
+                    self.active_json = json_content
+                    self.__changed(["update", json_path, key_or_index, new_value])
+                    return json_content
 
     def delete(self, json_path: str, key_or_index: Union[str, int]) -> dict:
         """
@@ -515,48 +1644,250 @@ class JsonFileParser:
                 "key_or_index", "str or int", type(key_or_index).__name__
             )
 
-        json_content = self.active_json
+        with self.__lock:
+            json_content = self.active_json
 
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
 
-        js_expr = jsonpath.parse(json_path)
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-        for item in js_expr.find(json_content):
-            temp = item.value
-            if type(temp) == list:
-                if type(key_or_index) != int:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                del temp[key_or_index]
+            for temp in matches:
+                if type(temp) == list:
+                    if type(key_or_index) != int:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
+                        )
+                    if self.__indexes:
+                        old_item = temp[key_or_index]
+                    self.__batch_log.touch(temp)
+                    del temp[key_or_index]
+                    if self.__indexes:
+                        self.__indexes.item_deleted(temp, key_or_index, old_item)
+                    self.active_json = json_content
+                    self.__changed(["delete", json_path, key_or_index])
+                    return json_content
+                else:
+                    if type(key_or_index) != str:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
+                        )
+                    if self.__indexes:
+                        old_values = self.__indexes.old_values(temp, (key_or_index,))
+                    self.__batch_log.touch(temp)
+                    del temp[key_or_index]
+                    if self.__indexes:
+                        self.__indexes.fields_changed(temp, old_values)
+                    self.active_json = json_content
+                    self.__changed(["delete", json_path, key_or_index])
+                    return json_content
+
+    def update_many(self, changes: list, strict_mode: bool = False) -> dict:
+        """
+        Update several values in JSON at once.
+
+        Each distinct JSON path is resolved only once, and all paths refer to the object
+        as it was before this call. Unlike `update_value`, changes are applied to every
+        value matched by JSON path. Either all changes are applied or none of them: all of
+        them are checked before active object is modified. Autosave (if enabled) runs once per call.
+
+        Parameters: `changes : list` specifies changes as `(json_path, key_or_index, new_value)` tuples
+        (see `update_value` for the meaning of each item). `strict_mode : bool` parameter enables Strict Mode
+        (see `update_value`).
+
+        This function returns a Python dictionary with updated content.
+
+        This function raises an `IncorrectFunctionParameterTypeError` exception if one or more of its parameters
+        have incorrect types.
+        This function raises a `ValueError` if a change does not contain exactly 3 values.
+        This function raises a `JSONPathError` if one of JSON paths is not valid.
+        This function raises a `JSONStrictModeError` if types of old and new values are not the same while Strict Mode is enabled.
+        This function raises any additional exceptions if occurred.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('config.json', autosave=True)
+        # Object from `config.json` >> { "db": { "host": "localhost", "port": 5432 }, "ports": [ 80, 443 ] }
+        >>> op.update_many([('db', 'host', 'db.local'), ('db', 'port', 6432), ('ports', 0, 8080)])
+        >>> op.active_json
+        # Output: { "db": { "host": "db.local", "port": 6432 }, "ports": [ 8080, 443 ] }
+        # File is written once
+
+        For more information about this method, please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(strict_mode) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "strict_mode", "bool", type(strict_mode).__name__
+            )
+
+        groups = self.__service.group_changes(changes, "changes", 3)
+
+        with self.__lock:
+            json_content, targets = self.__resolve_targets(groups)
+
+            for temp, json_path, updates in targets:
+                self.__service.check_updates(temp, json_path, updates, strict_mode)
+
+            for temp, _, updates in targets:
+                self.__batch_log.touch(temp)
+                for key_or_index, new_value in updates:
+                    if not self.__indexes:
+                        temp[key_or_index] = new_value
+                    elif type(temp) == list:
+                        old_item = temp[key_or_index]
+                        temp[key_or_index] = new_value
+                        self.__indexes.item_replaced(temp, key_or_index, old_item)
+                    else:
+                        old_values = self.__indexes.old_values(temp, (key_or_index,))
+                        temp[key_or_index] = new_value
+                        self.__indexes.fields_changed(temp, old_values)
+
+            if targets:
                 self.active_json = json_content
-                return json_content
-            else:
-                if type(key_or_index) != str:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                del temp[key_or_index]
+                self.__changed(["update_many", [list(change) for change in changes], strict_mode])
+            return json_content
+
+    def delete_many(self, deletions: list) -> dict:
+        """
+        Delete several values from JSON at once.
+
+        Each distinct JSON path is resolved only once, and all paths and array indexes refer
+        to the object as it was before this call: e.g. deleting items 1 and 3 from
+        `[ "a", "b", "c", "d" ]` leaves `[ "a", "c" ]`. Unlike `delete`, values are deleted from
+        every object or array matched by JSON path. Array items are removed in a single pass over
+        each array. Either all values are deleted or none of them: all deletions are checked
+        before active object is modified. Autosave (if enabled) runs once per call.
+
+        Parameters: `deletions : list` specifies values to delete as `(json_path, key_or_index)` tuples
+        (see `delete` for the meaning of each item).
+
+        This function returns a Python dictionary with updated content.
+
+        This function raises an `IncorrectFunctionParameterTypeError` exception if one or more of its parameters have incorrect types.
+        This function raises a `ValueError` if a deletion does not contain exactly 2 values.
+        This function raises a `JSONPathError` if one of JSON paths is not valid.
+        This function raises a `KeyError` if key does not exist and an `IndexError` if array index is out of range.
+        This function raises any additional exceptions if occurred.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('array.json')
+        # Object from `array.json` >> { "colors": [ "red", "magenta", "green", "cyan" ], "version": "1.0" }
+        >>> op.delete_many([('colors', 0), ('colors', 2), ('$', 'version')])
+        >>> op.active_json
+        # Output: { "colors": [ "magenta", "cyan" ] }
+
+        For more information about this method, please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        groups = self.__service.group_changes(deletions, "deletions", 2)
+
+        with self.__lock:
+            json_content, targets = self.__resolve_targets(groups)
+
+            targets = [
+                (temp, self.__service.check_deletions(temp, json_path, [key for key, in keys]))
+                for temp, json_path, keys in targets
+            ]
+
+            for temp, keys in targets:
+                if self.__indexes and type(temp) == list:
+                    self.__indexes.items_changed(temp)
+                old_values = self.__indexes.old_values(temp, keys) if type(temp) == dict else {}
+                self.__batch_log.touch(temp)
+                self.__service.delete_items(temp, keys)
+                if old_values:
+                    self.__indexes.fields_changed(temp, old_values)
+
+            if targets:
                 self.active_json = json_content
-                if self.__is_autosaving:
-                    if "autosave_path" in self.__kwargs:
-                        if type(self.__kwargs["autosave_path"]) != str:
-                            raise IncorrectFunctionParameterTypeError(
-                                "autosave_path",
-                                "str",
-                                type(self.__kwargs["autosave_path"]).__name__,
-                            )
-                        path = self.__kwargs["autosave_path"]
-                        if not os.path.exists(path):
-                            create_file = True
-                        else:
-                            create_file = False
-                    else:
-                        path = self.__path
-                        create_file = False
-                    self.save_to_file(path=path, create_file=create_file)
-                return json_content
+                self.__changed(["delete_many", [list(deletion) for deletion in deletions]])
+            return json_content
+
+    def reverse_array(self, json_path: str) -> dict:
+        """
+        Reverse an array in JSON in place.
+
+        Unlike `robust_json.ext.reverse_array` applied to a value returned by `get_key_value`,
+        this function changes active object directly, without copying the array.
+
+        Parameters: `json_path : str` specifies path to the array.
+
+        This function returns a Python dictionary with updated content.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if `json_path` parameter has an incorrect type.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to an array.
+
+        Examples:
+
+        >>> from robust_json.file import JsonFileParser
+        >>> op = JsonFileParser('array.json')
+        # Object from `array.json` >> { "colors": [ "red", "magenta", "green" ] }
+        >>> op.reverse_array('colors')
+        >>> op.active_json
+        # Output: { "colors": [ "green", "magenta", "red" ] }
+
+        For more information about this method, please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        with self.__lock:
+            json_content = self.active_json
+
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
+
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
+
+            temp = matches[0]
+            if type(temp) != list:
+                raise TypeError(
+                    f"Path `{json_path}` must point to a JSON array; got `{type(temp).__name__}` instead."
+                )
+            self.__batch_log.touch(temp)
+            temp.reverse()
+            if self.__indexes:
+                self.__indexes.items_changed(temp)
+            self.active_json = json_content
+            self.__changed(["reverse", json_path])
+            return json_content
+
+    def __resolve_targets(self, groups: dict) -> tuple:
+        # Resolves each JSON path once; returns active object and a list of
+        # [container, json_path, changes] entries (one per matched container)
+        json_content = self.active_json
+        targets = {}
+        for json_path, changes in groups.items():
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
+
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
+
+            for temp in matches:
+                if id(temp) in targets:
+                    # Different paths may point to the same container
+                    targets[id(temp)][2].extend(changes)
+                else:
+                    targets[id(temp)] = [temp, json_path, list(changes)]
+        return json_content, list(targets.values())
 
     def minify(self) -> None:
         """
@@ -566,14 +1897,26 @@ class JsonFileParser:
         please visit: https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#file-module-methods-and-properties
         """
 
-        file = open(self.__path, "r")
-        unfiltered = file.read()
-        cont = JSON.loads(unfiltered)
-        file.close()
-
-        file_w = open(self.__path, "w")
-        file_w.write(JSON.dumps(cont, indent=None))
-        file_w.close()
+        with self.__lock, self.__locked_file(self.__path):
+            cont = self.__service.parse_file(self.__path, self.__codec, self.__use_mmap)
+
+            self.__service.write_json_file(
+                self.__path,
+                cont,
+                None,
+                self.__codec,
+                buffer_size=self.__write_buffer_size if self.__streaming else None,
+                atomic=self.__atomic_write,
+                fsync=self.__fsync,
+                json_lines=self.__json_lines,
+            )
+            # Line offsets might have changed
+            self.__line_index = None
+            if self.__journal is not None:
+                # Content is the same, so journal still applies to it
+                self.__journal.rebase()
+            # Changes that are still pending are not in file yet
+            self.__file_written(changes_saved=False)
 
     def prettify(self, indent: int = 4) -> None:
         """
@@ -593,18 +1936,28 @@ class JsonFileParser:
         if type(indent) != int and indent != None:
             raise IncorrectFunctionParameterTypeError("indent", "int", type(indent).__name__)
 
-        if indent == 0 or indent == None:
+        if indent == 0 or indent == None or self.__json_lines:
+            # Records of JSON Lines file are always written in one line
             self.minify()
             return
 
-        file = open(self.__path, "r")
-        unfiltered = file.read()
-        cont = JSON.loads(unfiltered)
-        file.close()
-
-        file_w = open(self.__path, "w")
-        file_w.write(JSON.dumps(cont, indent=indent))
-        file.close()
+        with self.__lock, self.__locked_file(self.__path):
+            cont = self.__service.parse_file(self.__path, self.__codec, self.__use_mmap)
+
+            self.__service.write_json_file(
+                self.__path,
+                cont,
+                indent,
+                self.__codec,
+                buffer_size=self.__write_buffer_size if self.__streaming else None,
+                atomic=self.__atomic_write,
+                fsync=self.__fsync,
+            )
+            if self.__journal is not None:
+                # Content is the same, so journal still applies to it
+                self.__journal.rebase()
+            # Changes that are still pending are not in file yet
+            self.__file_written(changes_saved=False)
 
     def reset(self, discard_active_object: bool = False) -> dict:
         # ? Do we need autosaving feature here?
@@ -617,7 +1970,10 @@ class JsonFileParser:
         Parameters: `discard_active_object : bool` specifies if
         changes will be discarded on active object or not. If
         set to `True`, active object will be reset to an initial
-        state, otherwise it will be left untouched.
+        state, otherwise it will be left untouched. If journal is enabled,
+        resetting active object rewrites the source file and removes the journal
+        (inside a batch, this happens when batch is saved), because changes recorded
+        in the journal can't be applied to the initial object.
 
         This function returns a Python dictionary with initial object.
 
@@ -669,10 +2025,34 @@ class JsonFileParser:
                 "discard_active_object", "bool", type(discard_active_object).__name__
             )
 
-        if discard_active_object == True:
-            self.active_json = self.__backup
+        with self.__lock:
+            if not self.__loaded:
+                self.__load()
 
-        return self.__backup
+            if discard_active_object == True:
+                self.__saved_root = None
+                if self.__copy_on_write:
+                    # Active object shares all nodes with backup again
+                    self.active_json = self.__backup
+                    self.__cow.reset()
+                else:
+                    # Backup must stay intact when active object is changed again
+                    self.active_json = self.__service.copy_json(self.__backup)
+                self.__indexes.invalidate()
+                if (self.__journal is not None or self.__file_lock is not None) and not self.__replaying:
+                    # Pending changes were made to the discarded object and must never be
+                    # applied to another one; reset replaces them
+                    self.__batch_log.touch(self.__operations)
+                    self.__operations[:] = [["reset"]]
+                    if self.__journal is not None:
+                        # Journal records changes of the previous object, so it can't be
+                        # appended to anymore: source file is rewritten and journal is removed
+                        if self.__batch_log.active:
+                            self.__batch_log.mark_changed()
+                        else:
+                            self.compact()
+
+            return self.__backup
 
     def save_to_file(
         self, path: str = None, prettify: bool = True, create_file: bool = False
@@ -684,6 +2064,8 @@ class JsonFileParser:
         `prettify : bool` enables indentations in JSON (improves its readability). `create_file : bool` enables file creation.
         If set to `True`, this function will create a new file and save JSON there, if provided path leads to file that does not exist. Note:
         if set to `True` and path is pointing to an existing file, this function will raise an exception.
+        If path is pointing to a JSON Lines file (`.jsonl` or `.ndjson`), active object must be an array,
+        and each of its items is written on a separate line (`prettify` is ignored).
 
         This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect type.
 
@@ -754,26 +2136,57 @@ class JsonFileParser:
         else:
             file_path = path
 
-        file_json = self.active_json
+        # Active object can't be changed while it is being written
+        with self.__lock, self.__locked_file(file_path):
+            file_json = self.active_json
 
-        if prettify == True:
-            indent = 4
-        else:
-            indent = None
+            if prettify == True:
+                indent = 4
+            else:
+                indent = None
 
-        if create_file == True:
-            if self.__service.check_file_path(file_path):
-                raise FileExistsError(
-                    f"File `{file_path}` already exists. Either set `create_file` parameter to `False` or change `path` parameter to silence this error."
+            if create_file == True:
+                if self.__service.check_file_path(file_path):
+                    raise FileExistsError(
+                        f"File `{file_path}` already exists. Either set `create_file` parameter to `False` or change `path` parameter to silence this error."
+                    )
+                self.__service.write_json_file(
+                    file_path,
+                    file_json,
+                    indent,
+                    self.__codec,
+                    create_file=True,
+                    buffer_size=self.__write_buffer_size if self.__streaming else None,
+                    atomic=self.__atomic_write,
+                    fsync=self.__fsync,
+                    json_lines=self.__service.is_json_lines(file_path),
                 )
-            file = open(file_path, "x")
-            file.write(JSON.dumps(file_json, indent=indent))
-            file.close()
-        else:
-            if not self.__service.check_file_path(file_path):
-                raise FileNotFoundError(
-                    f"File `{file_path}` doesn't exist. If you want to create a new file under this path, please set `create_file` parameter to `True`."
+            else:
+                if not self.__service.check_file_path(file_path):
+                    raise FileNotFoundError(
+                        f"File `{file_path}` doesn't exist. If you want to create a new file under this path, please set `create_file` parameter to `True`."
+                    )
+                self.__service.write_json_file(
+                    file_path,
+                    file_json,
+                    indent,
+                    self.__codec,
+                    buffer_size=self.__write_buffer_size if self.__streaming else None,
+                    atomic=self.__atomic_write,
+                    fsync=self.__fsync,
+                    json_lines=self.__service.is_json_lines(file_path),
                 )
-            file = open(file_path, "w")
-            file.write(JSON.dumps(file_json, indent=indent))
-            file.close()
+
+            if self.__json_lines and file_path == self.__path:
+                # Source file is in sync with active object
+                self.__saved_root = file_json
+                self.__saved_records = len(file_json)
+                self.__line_index = None
+
+            if self.__journal is not None and file_path == self.__path:
+                # Source file contains all changes now
+                self.__journal.discard()
+                self.__operations.clear()
+
+            if file_path == self.__path:
+                self.__file_written()
@@ -0,0 +1,454 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+################################
+# * This file contains hash indexes over
+# * arrays of JSON objects
+################################
+
+import bisect
+import threading
+from typing import Any
+
+from robust_json.errors import IncorrectFunctionParameterTypeError
+
+_MISSING = object()
+
+
+class JsonArrayIndex:
+    """
+    Hash index over an array of JSON objects.
+
+    Index maps each value of `field` to positions of array items (objects) that have this value,
+    so items can be found in O(1) instead of scanning the whole array. Indexes are created by
+    `create_index` method of parsers (`JsonFileParser` and `JsonObjectParser`), which keep them
+    up to date: `append`, `update_value`, `delete`, `update_many` and `delete_many` update
+    index in place when possible (e.g. when item is appended to the end of array or value of
+    indexed field is changed) and invalidate it otherwise (e.g. when items are shifted); invalidated
+    index is rebuilt on the next lookup. Changes made to array directly (not through parser)
+    are not tracked, call `rebuild()` after them: index detects items that no longer have
+    looked up value (and rebuilds itself), but it can't find items that got this value.
+
+    Index is only used where it is passed explicitly (`lookup` method of parsers and `index`
+    parameter of `robust_json.ext.filter_json_array`). Parsers release indexed arrays when
+    active object is replaced (e.g. reloaded or reset), so indexes never keep old objects alive.
+
+    Parameters: `json_path : str` specifies path to indexed array, `field : str` specifies indexed field.
+
+    Examples:
+
+    >>> from robust_json.object import JsonObjectParser
+    >>> op = JsonObjectParser({ "users": [ { "id": 1, "name": "Ann" }, { "id": 2, "name": "Bob" } ] })
+    >>> index = op.create_index('users', 'id')
+    >>> index.positions(2)
+    # Output: [1]
+    >>> op.lookup('users', 'id', 2)
+    # Output: [ { "id": 2, "name": "Bob" } ]
+    """
+
+    def __init__(self, json_path: str, field: str):
+        self.__path = json_path
+        self.__field = field
+        self.__array = None
+        self.__values = {}
+        self.__size = 0
+        # Items that can't be found through index: non-objects, objects
+        # without indexed field and objects with unhashable values of it
+        self.__non_objects = 0
+        self.__missing = 0
+        self.__unhashable = 0
+        self.__valid = False
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """
+        Path to indexed array.
+        """
+        return self.__path
+
+    @property
+    def field(self) -> str:
+        """
+        Indexed field.
+        """
+        return self.__field
+
+    @property
+    def valid(self) -> bool:
+        """
+        `False` if index has been invalidated and will be rebuilt on the next lookup.
+        """
+        return self.__valid
+
+    @property
+    def complete(self) -> bool:
+        """
+        `True` if every item of indexed array is an object with indexed field.
+        """
+        return self.__non_objects == 0 and self.__missing == 0
+
+    @property
+    def objects_only(self) -> bool:
+        """
+        `True` if every item of indexed array is an object.
+        """
+        return self.__non_objects == 0
+
+    def __len__(self) -> int:
+        """
+        Number of distinct values of indexed field.
+        """
+        return len(self.__values)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(path={self.__path!r}, field={self.__field!r}, valid={self.__valid})"
+
+    def build(self, array: list) -> None:
+        """
+        Build index over given array.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if `array` parameter is not a list.
+        """
+        if type(array) != list:
+            raise IncorrectFunctionParameterTypeError("array", "list", type(array).__name__)
+
+        field = self.__field
+        values = {}
+        non_objects = missing = unhashable = 0
+        for position, item in enumerate(array):
+            if type(item) != dict:
+                non_objects += 1
+                continue
+            value = item.get(field, _MISSING)
+            if value is _MISSING:
+                missing += 1
+                continue
+            try:
+                positions = values.get(value)
+            except TypeError:
+                unhashable += 1
+                continue
+            # Unique values (the most common case) store a single position instead of a list
+            if positions is None:
+                values[value] = position
+            elif type(positions) == int:
+                values[value] = [positions, position]
+            else:
+                positions.append(position)
+
+        self.__array = array
+        self.__values = values
+        self.__size = len(array)
+        self.__non_objects = non_objects
+        self.__missing = missing
+        self.__unhashable = unhashable
+        self.__valid = True
+
+    def rebuild(self) -> None:
+        """
+        Build index again over the same array (e.g. after it has been changed directly).
+        """
+        if self.__array is not None:
+            self.build(self.__array)
+
+    def sync(self, array: list) -> bool:
+        """
+        Make sure that index is built over given array and is up to date (rebuild it if needed).
+
+        This function returns `True` if index can be used for lookups in `array`.
+        """
+        if self.__valid and self.__array is array and self.__size == len(array):
+            return True
+        if type(array) != list:
+            return False
+        with self.__lock:
+            if not (self.__valid and self.__array is array and self.__size == len(array)):
+                self.build(array)
+        return True
+
+    def invalidate(self) -> None:
+        """
+        Mark index as outdated, so it is rebuilt on the next lookup.
+        """
+        self.__valid = False
+
+    def drop(self) -> None:
+        """
+        Release indexed array (index is built again on the next `sync`).
+        """
+        self.__array = None
+        self.__values = {}
+        self.__size = 0
+        self.__valid = False
+
+    def positions(self, value: Any) -> list:
+        """
+        Find positions of array items whose indexed field is equal to `value`.
+
+        This function returns a sorted list of positions (empty if there are no such items).
+
+        This function raises a `TypeError` if `value` is unhashable (e.g. a list or a dictionary):
+        such values can't be looked up in index.
+        """
+        return list(self.__positions(value))
+
+    def items(self, value: Any) -> list:
+        """
+        Find array items whose indexed field is equal to `value`.
+
+        Items are checked before they are returned: if one of them no longer has this value
+        (array has been changed directly), index is rebuilt and value is looked up again.
+
+        This function returns a list of items in array order.
+
+        This function raises a `TypeError` if `value` is unhashable.
+        """
+        array = self.__array
+        if array is None:
+            return []
+        field = self.__field
+        size = len(array)
+        found = []
+        for position in self.__positions(value):
+            item = array[position] if position < size else None
+            if type(item) != dict or item.get(field, _MISSING) != value:
+                self.build(array)
+                return [array[position] for position in self.__positions(value)]
+            found.append(item)
+        return found
+
+    def __positions(self, value: Any):
+        positions = self.__values.get(value)
+        if positions is None:
+            return ()
+        if type(positions) == int:
+            return (positions,)
+        return positions
+
+    def __add(self, position: int, item: Any) -> None:
+        if type(item) != dict:
+            self.__non_objects += 1
+            return
+        value = item.get(self.__field, _MISSING)
+        if value is _MISSING:
+            self.__missing += 1
+            return
+        try:
+            positions = self.__values.get(value)
+        except TypeError:
+            self.__unhashable += 1
+            return
+        if positions is None:
+            self.__values[value] = position
+        elif type(positions) == int:
+            self.__values[value] = sorted([positions, position])
+        else:
+            bisect.insort(positions, position)
+
+    def __remove(self, position: int, item: Any, value: Any = _MISSING) -> bool:
+        # Returns `False` if item can't be found in index (index needs to be rebuilt)
+        if type(item) != dict:
+            self.__non_objects -= 1
+            return True
+        if value is _MISSING:
+            value = item.get(self.__field, _MISSING)
+        if value is _MISSING:
+            self.__missing -= 1
+            return True
+        try:
+            positions = self.__values.get(value)
+        except TypeError:
+            self.__unhashable -= 1
+            return True
+        if positions is None:
+            return False
+        if type(positions) == int:
+            if positions != position:
+                return False
+            del self.__values[value]
+            return True
+        if position not in positions:
+            return False
+        positions.remove(position)
+        if len(positions) == 1:
+            self.__values[value] = positions[0]
+        return True
+
+    def item_appended(self, array: list) -> None:
+        """
+        Update index after an item has been appended to the end of `array`.
+        """
+        if not self.__valid or array is not self.__array:
+            return
+        self.__add(len(array) - 1, array[-1])
+        self.__size = len(array)
+
+    def item_replaced(self, array: list, position: int, old_item: Any) -> None:
+        """
+        Update index after an item of `array` has been replaced.
+        """
+        if not self.__valid or array is not self.__array:
+            return
+        position %= len(array)
+        if not self.__remove(position, old_item):
+            self.__valid = False
+            return
+        self.__add(position, array[position])
+
+    def item_deleted(self, array: list, position: int, old_item: Any) -> None:
+        """
+        Update index after an item has been deleted from `array`.
+
+        Deleting the last item updates index; deleting any other item shifts
+        positions of the following ones, so index is invalidated.
+        """
+        if not self.__valid or array is not self.__array:
+            return
+        if position % (len(array) + 1) != len(array) or not self.__remove(len(array), old_item):
+            self.__valid = False
+            return
+        self.__size = len(array)
+
+    def items_changed(self, array: list) -> None:
+        """
+        Invalidate index if items of `array` have been changed or moved.
+        """
+        if array is self.__array:
+            self.__valid = False
+
+    def field_changed(self, item: dict, key: str, old_value: Any) -> None:
+        """
+        Update index after key `key` of `item` object has been set or deleted.
+        `old_value` specifies previous value (`robust_json.index._MISSING` if key did not exist).
+        """
+        if not self.__valid or key != self.__field:
+            return
+        array = self.__array
+        position = None
+        if old_value is _MISSING:
+            if self.__missing == 0:
+                # Every item of array has this field, so object is not an item
+                return
+        else:
+            try:
+                positions = self.__positions(old_value)
+            except TypeError:
+                if self.__unhashable == 0:
+                    return
+                positions = None
+            if positions is not None:
+                for candidate in positions:
+                    if array[candidate] is item:
+                        position = candidate
+                        break
+                else:
+                    # Object is not an item of indexed array
+                    return
+        if position is None:
+            # Object can't be found without scanning the array
+            self.__valid = False
+            return
+        self.__remove(position, item, old_value)
+        self.__add(position, item)
+
+
+class JsonIndexSet:
+    """
+    Indexes created by one parser.
+
+    Parsers notify this class about every change they make; it forwards
+    notifications to all indexes.
+    """
+
+    def __init__(self):
+        self.__indexes = {}
+        self.__fields = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.__indexes)
+
+    def __iter__(self):
+        return iter(list(self.__indexes.values()))
+
+    def get(self, json_path: str, field: str):
+        """
+        Return index over `json_path` array by `field` or `None` if it does not exist.
+        """
+        return self.__indexes.get((json_path, field))
+
+    def add(self, index: JsonArrayIndex) -> None:
+        """
+        Add index to this set.
+        """
+        self.__indexes[(index.path, index.field)] = index
+        self.__fields.add(index.field)
+
+    def remove(self, json_path: str, field: str) -> JsonArrayIndex:
+        """
+        Remove index from this set and return it.
+
+        This function raises a `ValueError` if index does not exist.
+        """
+        index = self.__indexes.pop((json_path, field), None)
+        if index is None:
+            raise ValueError(f"Array `{json_path}` is not indexed by field `{field}`.")
+        index.drop()
+        self.__fields = {index.field for index in self.__indexes.values()}
+        return index
+
+    def invalidate(self) -> None:
+        """
+        Invalidate all indexes and release their arrays (e.g. after active object
+        has been restored or replaced).
+        """
+        for index in self.__indexes.values():
+            index.drop()
+
+    def old_values(self, item: dict, keys) -> dict:
+        """
+        Return current values of indexed fields among `keys` of `item` object
+        (to be passed to `fields_changed` after they are changed).
+        """
+        if type(item) != dict:
+            return {}
+        return {key: item.get(key, _MISSING) for key in self.__fields if key in keys}
+
+    def fields_changed(self, item: dict, old_values: dict) -> None:
+        """
+        Update indexes after keys of `item` object have been set or deleted
+        (`old_values` is returned by `old_values`).
+        """
+        for key, old_value in old_values.items():
+            for index in self.__indexes.values():
+                index.field_changed(item, key, old_value)
+
+    def item_appended(self, array: list) -> None:
+        for index in self.__indexes.values():
+            index.item_appended(array)
+
+    def item_replaced(self, array: list, position: int, old_item: Any) -> None:
+        for index in self.__indexes.values():
+            index.item_replaced(array, position, old_item)
+
+    def item_deleted(self, array: list, position: int, old_item: Any) -> None:
+        for index in self.__indexes.values():
+            index.item_deleted(array, position, old_item)
+
+    def items_changed(self, array: list, keys=None) -> None:
+        """
+        Invalidate indexes over `array` after its items have been moved or (if `keys`
+        are given) after these keys have been set in all of its items.
+        """
+        for index in self.__indexes.values():
+            if keys is None or index.field in keys:
+                index.items_changed(array)
@@ -17,9 +17,9 @@
 
 
 # JSON modules import
-import json as JSON
 import os
-import jsonpath_ng.ext as jsonpath
+import threading
+import contextlib
 
 # Misc import
 from typing import Union
@@ -31,18 +31,66 @@ from robust_json.errors import (
     JSONStrictModeError,
     IncorrectFunctionParameterTypeError,
 )
-from robust_json.__internal_utils import service
+from robust_json.__internal_utils import (
+    service,
+    CopyOnWrite,
+    BatchLog,
+    ReadWriteLock,
+    FSYNC_POLICIES,
+)
+from robust_json.codec import JsonCodec, get_codec
+from robust_json.autosave import AutosavePolicy, AutosaveScheduler
+from robust_json.index import JsonArrayIndex, JsonIndexSet
 
 
 class JsonObjectParser:
     """
     This class provides functionality for working with JSON objects directly.
 
+    Parameters: `json : dict` specifies JSON object. `autosave : bool` enables
+    saving active object to `autosave_path : str` file after each change.
+    `copy_on_write : bool` enables copy-on-write mode: active object shares all
+    nodes with backup and only nodes that are modified by this class' methods are copied
+    (on the first write). In this mode, modifying `active_json` (or values returned by
+    `get_key_value`) directly will also modify backup. `codec : str or JsonCodec` specifies
+    JSON codec (`json`, `orjson`, `ujson` or a custom `robust_json.codec.JsonCodec` instance)
+    used for saving files. If not provided, default codec is used (see `robust_json.codec.set_default_codec`).
+    `streaming : bool` enables streaming serialization: `save_to_file` (and autosave) encodes JSON
+    and writes it in chunks of `write_buffer_size : int` characters (default: 65536) instead of
+    building the whole document in memory (with `json` codec it uses pure-Python
+    `JSONEncoder.iterencode` instead of the C encoder, so it trades speed for memory; without
+    `atomic_write`, output is collected in a temporary file first, so a serialization error never
+    leaves target file truncated). `atomic_write : bool` enables crash-safe writes: JSON is written to a
+    temporary file in the same directory, which then replaces the target file. `fsync : str`
+    specifies durability policy for all writes: `none` (default), `file` (file content is
+    flushed to disk) or `directory` (parent directory is flushed as well). `autosave_policy : AutosavePolicy`
+    specifies when autosave writes the file (see `robust_json.autosave.AutosavePolicy`); by default
+    file is written after each change. Pending changes are written by `flush()`, `close()`, on exit
+    from `with` block and at interpreter exit. `thread_safe : bool` enables thread-safe mode for
+    parsers shared between threads: `get_key_value` holds a reader/writer lock for reading, so
+    lookups run in parallel, while changes and saves (including autosave) hold it for writing.
+
+    `autosave_policy` requires `autosave`, and `write_buffer_size` requires `streaming`;
+    otherwise a `ValueError` is raised.
+
     For more information please visit:
     https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-overview
     """
 
-    def __init__(self, json: dict, autosave: bool = False, autosave_path: str = None):
+    def __init__(
+        self,
+        json: dict,
+        autosave: bool = False,
+        autosave_path: str = None,
+        copy_on_write: bool = False,
+        codec: Union[str, JsonCodec] = None,
+        streaming: bool = False,
+        write_buffer_size: int = None,
+        atomic_write: bool = False,
+        fsync: str = "none",
+        autosave_policy: AutosavePolicy = None,
+        thread_safe: bool = False,
+    ):
 
         if type(json) != dict:
             raise IncorrectFunctionParameterTypeError(
@@ -59,8 +107,61 @@ class JsonObjectParser:
                 "autosave_path", "str", type(autosave_path).__name__
             )
 
+        if type(copy_on_write) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "copy_on_write", "bool", type(copy_on_write).__name__
+            )
+
+        if type(streaming) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "streaming", "bool", type(streaming).__name__
+            )
+
+        if type(write_buffer_size) != int and write_buffer_size != None:
+            raise IncorrectFunctionParameterTypeError(
+                "write_buffer_size", "int", type(write_buffer_size).__name__
+            )
+
+        if write_buffer_size != None and write_buffer_size <= 0:
+            raise ValueError("Parameter `write_buffer_size` must be a positive integer.")
+
+        if write_buffer_size != None and not streaming:
+            raise ValueError("Parameter `write_buffer_size` requires streaming to be enabled.")
+
+        if type(atomic_write) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "atomic_write", "bool", type(atomic_write).__name__
+            )
+
+        if type(fsync) != str:
+            raise IncorrectFunctionParameterTypeError("fsync", "str", type(fsync).__name__)
+
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f'Supported fsync policies are {", ".join(FSYNC_POLICIES)}; got `{fsync}` instead.'
+            )
+
+        if type(autosave_policy) != AutosavePolicy and autosave_policy != None:
+            raise IncorrectFunctionParameterTypeError(
+                "autosave_policy", "AutosavePolicy", type(autosave_policy).__name__
+            )
+
+        if autosave_policy != None and not autosave:
+            raise ValueError("Parameter `autosave_policy` requires autosaving to be enabled.")
+
+        if type(thread_safe) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "thread_safe", "bool", type(thread_safe).__name__
+            )
+
         self.__backup = json
-        self.active_json = copy.deepcopy(json)
+        self.__copy_on_write = copy_on_write
+        self.__cow = CopyOnWrite()
+        if self.__copy_on_write:
+            # Active object shares all nodes with backup until they are modified
+            self.active_json = json
+        else:
+            self.active_json = copy.deepcopy(json)
         self.__is_autosaving = autosave
         if self.__is_autosaving:
             if autosave_path == None:
@@ -71,6 +172,112 @@ class JsonObjectParser:
                 raise ValueError("Autosaving path is equal to an empty string.")
             self.__autosave_path = autosave_path
         self.__service = service()
+        self.__codec = get_codec(codec)
+        self.__streaming = streaming
+        self.__write_buffer_size = write_buffer_size if write_buffer_size != None else 65536
+        self.__atomic_write = atomic_write
+        self.__fsync = fsync
+        # Guards active object while it is changed or saved by background autosave;
+        # in thread-safe mode, reads hold it as well (for reading)
+        if thread_safe:
+            self.__lock = ReadWriteLock()
+            self.__read_lock = self.__lock.reader
+        else:
+            self.__lock = threading.RLock()
+            self.__read_lock = contextlib.nullcontext()
+        self.__batch_log = BatchLog()
+        self.__indexes = JsonIndexSet()
+        if self.__is_autosaving:
+            self.__autosave = AutosaveScheduler(
+                self.__save_autosave, autosave_policy or AutosavePolicy()
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __changed(self) -> None:
+        # Called after each change of active object
+        if self.__batch_log.active:
+            # Batch is saved once, when it ends
+            self.__batch_log.mark_changed()
+        elif self.__is_autosaving:
+            self.__autosave.notify()
+
+    def __save_autosave(self) -> None:
+        if os.path.exists(self.__autosave_path):
+            create_file = False
+        else:
+            create_file = True
+        with self.__lock:
+            self.save_to_file(self.__autosave_path, create_file=create_file)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group several changes into one operation.
+
+        Inside `with` block, `append`, `update_value` and `delete` change
+        active object in memory only; autosave (if enabled) runs at most once, when
+        block ends. If an exception escapes the block, active object is restored
+        to the state it had before the block, and the exception is re-raised.
+        Batches can be nested: inner batch is rolled back on its own, while its
+        changes are saved together with the outermost batch.
+
+        This function returns a context manager which yields this parser.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser(users, autosave=True, autosave_path='users.json')
+        >>> with op.batch():
+        ...     for i in range(1000):
+        ...         op.append('users', { 'id': i }, True)
+        # File is written once instead of 1000 times
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        with self.__lock:
+            self.__batch_log.begin(self.active_json)
+            try:
+                yield self
+            except BaseException:
+                self.active_json = self.__batch_log.rollback()
+                # Containers have been restored in place
+                self.__indexes.invalidate()
+                raise
+            if self.__batch_log.commit() and self.__is_autosaving:
+                self.__autosave.notify()
+
+    def flush(self) -> None:
+        """
+        Write all pending autosave changes to `autosave_path` file.
+
+        If autosaving is disabled, this function does nothing.
+
+        This function raises any exceptions raised while saving (including
+        the ones raised earlier by background autosave).
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        if self.__is_autosaving:
+            self.__autosave.flush()
+
+    def close(self) -> None:
+        """
+        Stop background autosave (if enabled) and write all pending changes to file.
+
+        This function is called automatically on exit from `with` block.
+        Parser can still be used after it is closed.
+
+        This function raises the same exceptions as `flush`.
+        """
+        if self.__is_autosaving:
+            self.__autosave.close()
 
     @property
     def backup(self) -> dict:
@@ -79,6 +286,13 @@ class JsonObjectParser:
         """
         return self.__backup
 
+    @property
+    def codec(self) -> JsonCodec:
+        """
+        JSON codec used for saving files.
+        """
+        return self.__codec
+
     @property
     def autosave_path(self) -> Union[str, None]:
         if self.__is_autosaving:
@@ -129,19 +343,188 @@ class JsonObjectParser:
                 "json_path", "str", type(json_path).__name__
             )
 
-        json_content = self.active_json
+        with self.__read_lock:
+            json_content = self.active_json
+            # Resolving JSON path (validation and lookup share one traversal)
+            res = self.__service.resolve_json_path(json_path, json_content)
 
-        if not self.__service.check_json_path(json_path, json_content):
+        if not res:
             raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-        js_expr = jsonpath.parse(json_path)
-
-        res = [item.value for item in js_expr.find(json_content)]
-
         if len(res) == 1:
             return res[0]
         return res
 
+    def get_key_values(self, json_paths: list) -> dict:
+        """
+        Retrieve values of several key:value pairs from JSON at once.
+
+        Unlike calling `get_key_value` for each path, this function compiles all paths
+        once and resolves simple paths (e.g. `field1.field2.[3]`) in a single traversal
+        of JSON object, following their common prefixes only once.
+
+        Parameters: `json_paths : list` specifies JSON property paths (e.g. field1.field2.[...].fieldn).
+
+        This function returns a Python dictionary that maps each path to its value
+        (the same value `get_key_value` would return).
+
+        This function raises an `IncorrectFunctionParameterTypeError` if
+        `json_paths` parameter has an incorrect type.
+        This function raises a `JSONPathError` if one of JSON paths is not valid.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser({ "db": { "host": "localhost", "port": 5432 }, "debug": False })
+        >>> op.get_key_values(['db.host', 'db.port', 'debug'])
+        # Output: { "db.host": "localhost", "db.port": 5432, "debug": False }
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        if type(json_paths) != list and type(json_paths) != tuple:
+            raise IncorrectFunctionParameterTypeError(
+                "json_paths", "list", type(json_paths).__name__
+            )
+
+        with self.__read_lock:
+            json_content = self.active_json
+            matches = self.__service.resolve_json_paths(json_paths, json_content)
+
+        res = {}
+        for path in json_paths:
+            found = matches[path]
+            if not found:
+                raise JSONPathError(f"Path `{path}` is not valid.")
+            res[path] = found[0] if len(found) == 1 else found
+        return res
+
+    def create_index(self, json_path: str, field: str) -> JsonArrayIndex:
+        """
+        Build a hash index over an array of JSON objects.
+
+        Index maps values of `field` to array items, so `lookup` (and `robust_json.ext.filter_json_array`
+        called with this index) finds items in O(1) instead of scanning the whole array. Index is kept
+        up to date by `append`, `update_value`, `delete`, `update_many` and `delete_many`: appending items
+        to the end of array, replacing items and changing indexed field update it in place, while other
+        changes (e.g. deleting an item from the middle of array) invalidate it, and it is rebuilt on the
+        next lookup. Changes made to `active_json` directly are not tracked (see `JsonArrayIndex.rebuild`).
+        When active object is replaced (e.g. reloaded or reset), indexes release the old one.
+        If index already exists, it is rebuilt.
+
+        Parameters: `json_path : str` specifies path to the array (it is used as a key of the index, so
+        `lookup` must be called with the same path), `field : str` specifies indexed field.
+
+        This function returns a `JsonArrayIndex` object.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+        This function raises a `ValueError` if `field` parameter is empty.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to an array.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser({ "users": [ { "id": 1, "name": "Ann" }, { "id": 2, "name": "Bob" } ] })
+        >>> op.create_index('users', 'id')
+        >>> op.lookup('users', 'id', 2)
+        # Output: [ { "id": 2, "name": "Bob" } ]
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        if type(field) != str:
+            raise IncorrectFunctionParameterTypeError("field", "str", type(field).__name__)
+
+        if field == "":
+            raise ValueError("Parameter `field` is empty.")
+
+        with self.__lock:
+            array = self.__resolve_array(json_path, self.active_json)
+            index = self.__indexes.get(json_path, field)
+            if index is None:
+                index = JsonArrayIndex(json_path, field)
+                self.__indexes.add(index)
+            index.build(array)
+            return index
+
+    def drop_index(self, json_path: str, field: str) -> None:
+        """
+        Remove index created by `create_index`.
+
+        Parameters: `json_path : str` specifies path to the array, `field : str` specifies indexed field.
+
+        This function raises a `ValueError` if index does not exist.
+        """
+        with self.__lock:
+            self.__indexes.remove(json_path, field)
+
+    @property
+    def indexes(self) -> list:
+        """
+        List of indexes created by `create_index`.
+        """
+        with self.__read_lock:
+            return list(self.__indexes)
+
+    def lookup(self, json_path: str, field: str, value: any) -> list:
+        """
+        Find objects in JSON array whose `field` is equal to `value`.
+
+        If array has been indexed by this field (see `create_index`), objects are found
+        through index in O(1); otherwise array is scanned. Array items that are not objects
+        or don't have this field are skipped.
+
+        Parameters: `json_path : str` specifies path to the array, `field : str` specifies
+        field name and `value : any` specifies its value.
+
+        This function returns a list of matched objects (in array order).
+
+        This function raises an `IncorrectFunctionParameterTypeError` if one or more of its parameters have incorrect types.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to an array.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser({ "users": [ { "id": 1, "name": "Ann" }, { "id": 2, "name": "Bob" } ] })
+        >>> op.lookup('users', 'name', 'Ann')
+        # Output: [ { "id": 1, "name": "Ann" } ]
+
+        For more information about this method please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        if type(field) != str:
+            raise IncorrectFunctionParameterTypeError("field", "str", type(field).__name__)
+
+        with self.__read_lock:
+            json_content = self.active_json
+            array = self.__resolve_array(json_path, json_content)
+            index = self.__indexes.get(json_path, field)
+            if index is not None and index.sync(array):
+                try:
+                    return index.items(value)
+                except TypeError:
+                    # Unhashable values (objects and arrays) are not indexed
+                    pass
+            return [item for item in array if type(item) == dict and field in item and item[field] == value]
+
+    def __resolve_array(self, json_path: str, json_content: any) -> list:
+        matches = self.__service.resolve_json_path(json_path, json_content)
+        if not matches:
+            raise JSONPathError(f"Path `{json_path}` is not valid.")
+        if type(matches[0]) != list:
+            raise TypeError(
+                f"Path `{json_path}` must point to a JSON array; got `{type(matches[0]).__name__}` instead."
+            )
+        return matches[0]
+
     def append(
         self, json_path: str, append_value: any, append_at_end: bool = False
     ) -> dict:
@@ -230,42 +613,56 @@ class JsonObjectParser:
         if append_value in empty_obj:
             raise ValueError(f"Parameter `append_value` is empty.")
 
-        json_content = self.active_json
+        with self.__lock:
+            json_content = self.active_json
 
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
 
-        js_expr = jsonpath.parse(json_path)
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-        for item in js_expr.find(json_content):
-            temp = item.value
+            for temp in matches:
 
-            if type(temp) == list:
+                if type(temp) == list:
 
-                if append_at_end == True:
-                    temp.append(append_value)
-                    self.active_json = json_content
-                    return json_content
-                else:
-                    for i in iter(temp):
-                        if type(i) == dict:
-                            if type(append_value) == dict:
-                                i.update(append_value)
-                            else:
-                                raise TypeError(
-                                    f"To append to a JSON object, parameter `append_value` must be a dictionary; got `{type(append_value).__name__}` instead."
-                                )
-                    self.active_json = json_content
-                    return json_content
-            temp.update(append_value)
-            self.active_json = json_content
-            if self.__is_autosaving:
-                if os.path.exists(self.__autosave_path):
-                    create_file = False
-                else:
-                    create_file = True
-                self.save_to_file(self.__autosave_path, create_file=create_file)
-            return json_content
+                    if append_at_end == True:
+                        self.__batch_log.touch(temp)
+                        temp.append(append_value)
+                        if self.__indexes:
+                            self.__indexes.item_appended(temp)
+                        self.active_json = json_content
+                        self.__changed()
+                        return json_content
+                    else:
+                        if self.__copy_on_write:
+                            self.__cow.own_items(temp)
+                        for i in iter(temp):
+                            if type(i) == dict:
+                                if type(append_value) == dict:
+                                    self.__batch_log.touch(i)
+                                    i.update(append_value)
+                                else:
+                                    raise TypeError(
+                                        f"To append to a JSON object, parameter `append_value` must be a dictionary; got `{type(append_value).__name__}` instead."
+                                    )
+                        if self.__indexes:
+                            self.__indexes.items_changed(temp, append_value)
+                        self.active_json = json_content
+                        self.__changed()
+                        return json_content
+                if self.__indexes:
+                    old_values = self.__indexes.old_values(temp, append_value)
+                self.__batch_log.touch(temp)
+                temp.update(append_value)
+                if self.__indexes:
+                    self.__indexes.fields_changed(temp, old_values)
+                self.active_json = json_content
+                self.__changed()
+                return json_content
 
     def update_value(
         self,
@@ -369,47 +766,57 @@ class JsonObjectParser:
                 "key_or_index", "str or int", type(key_or_index).__name__
             )
 
-        json_content = self.active_json
+        with self.__lock:
+            json_content = self.active_json
 
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
 
-        js_expr = jsonpath.parse(json_path)
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-        for item in js_expr.find(json_content):
-            temp = item.value
-            if type(temp) == list:
-                if type(key_or_index) != int:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                if strict_mode == True:
-                    if type(temp[key_or_index]) != type(new_value):
-                        raise JSONStrictModeError(
-                            f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+            for temp in matches:
+                if type(temp) == list:
+                    if type(key_or_index) != int:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
                         )
-                temp[key_or_index] = new_value
-                self.active_json = json_content
-                return json_content
-            else:
-                if type(key_or_index) != str:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                if strict_mode == True:
-                    if type(temp[key_or_index]) != type(new_value):
-                        raise JSONStrictModeError(
-                            f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+                    if strict_mode == True:
+                        if type(temp[key_or_index]) != type(new_value):
+                            raise JSONStrictModeError(
+                                f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+                            )
+                    if self.__indexes:
+                        old_item = temp[key_or_index]
+                    self.__batch_log.touch(temp)
+                    temp[key_or_index] = new_value
+                    if self.__indexes:
+                        self.__indexes.item_replaced(temp, key_or_index, old_item)
+                    self.active_json = json_content
+                    self.__changed()
+                    return json_content
+                else:
+                    if type(key_or_index) != str:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
                         )
-                temp.update({key_or_index: new_value})
-                self.active_json = json_content
-                if self.__is_autosaving:
-                    if os.path.exists(self.__autosave_path):
-                        create_file = False
-                    else:
-                        create_file = True
-                    self.save_to_file(self.__autosave_path, create_file=create_file)
-                return json_content
+                    if strict_mode == True:
+                        if type(temp[key_or_index]) != type(new_value):
+                            raise JSONStrictModeError(
+                                f"If strict mode is enabled, the type of the new value must be identical to the type of the old one ({type(temp[key_or_index]).__name__}); got `{type(new_value).__name__}` instead."
+                            )
+                    if self.__indexes:
+                        old_values = self.__indexes.old_values(temp, (key_or_index,))
+                    self.__batch_log.touch(temp)
+                    temp.update({key_or_index: new_value})
+                    if self.__indexes:
+                        self.__indexes.fields_changed(temp, old_values)
+                    self.active_json = json_content
+                    self.__changed()
+                    return json_content
 
     def delete(self, json_path: str, key_or_index: Union[str, int]) -> dict:
         """
@@ -488,37 +895,246 @@ class JsonObjectParser:
                 "key_or_index", "str or int", type(key_or_index).__name__
             )
 
-        json_content = self.active_json
+        with self.__lock:
+            json_content = self.active_json
 
-        if not self.__service.check_json_path(json_path, json_content):
-            raise JSONPathError(f"Path `{json_path}` is not valid.")
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
 
-        js_expr = jsonpath.parse(json_path)
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
 
-        for item in js_expr.find(json_content):
-            temp = item.value
-            if type(temp) == list:
-                if type(key_or_index) != int:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                del temp[key_or_index]
+            for temp in matches:
+                if type(temp) == list:
+                    if type(key_or_index) != int:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON array, therefore `key_or_index` parameter must have an `int` type; got `{type(key_or_index).__name__}` instead."
+                        )
+                    if self.__indexes:
+                        old_item = temp[key_or_index]
+                    self.__batch_log.touch(temp)
+                    del temp[key_or_index]
+                    if self.__indexes:
+                        self.__indexes.item_deleted(temp, key_or_index, old_item)
+                    self.active_json = json_content
+                    self.__changed()
+                    return json_content
+                else:
+                    if type(key_or_index) != str:
+                        raise TypeError(
+                            f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
+                        )
+                    if self.__indexes:
+                        old_values = self.__indexes.old_values(temp, (key_or_index,))
+                    self.__batch_log.touch(temp)
+                    del temp[key_or_index]
+                    if self.__indexes:
+                        self.__indexes.fields_changed(temp, old_values)
+                    self.active_json = json_content
+                    self.__changed()
+                    return json_content
+
+    def update_many(self, changes: list, strict_mode: bool = False) -> dict:
+        """
+        Update several values in JSON at once.
+
+        Each distinct JSON path is resolved only once, and all paths refer to the object
+        as it was before this call. Unlike `update_value`, changes are applied to every
+        value matched by JSON path. Either all changes are applied or none of them: all of
+        them are checked before active object is modified. Autosave (if enabled) runs once per call.
+
+        Parameters: `changes : list` specifies changes as `(json_path, key_or_index, new_value)` tuples
+        (see `update_value` for the meaning of each item). `strict_mode : bool` parameter enables Strict Mode
+        (see `update_value`).
+
+        This function returns a Python dictionary with updated content.
+
+        This function raises an `IncorrectFunctionParameterTypeError` exception if one or more of its parameters
+        have incorrect types.
+        This function raises a `ValueError` if a change does not contain exactly 3 values.
+        This function raises a `JSONPathError` if one of JSON paths is not valid.
+        This function raises a `JSONStrictModeError` if types of old and new values are not the same while Strict Mode is enabled.
+        This function raises any additional exceptions if occurred.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser({ "db": { "host": "localhost", "port": 5432 }, "ports": [ 80, 443 ] })
+        >>> op.update_many([('db', 'host', 'db.local'), ('db', 'port', 6432), ('ports', 0, 8080)])
+        >>> op.active_json
+        # Output: { "db": { "host": "db.local", "port": 6432 }, "ports": [ 8080, 443 ] }
+
+        For more information about this method, please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        if type(strict_mode) != bool:
+            raise IncorrectFunctionParameterTypeError(
+                "strict_mode", "bool", type(strict_mode).__name__
+            )
+
+        groups = self.__service.group_changes(changes, "changes", 3)
+
+        with self.__lock:
+            json_content, targets = self.__resolve_targets(groups)
+
+            for temp, json_path, updates in targets:
+                self.__service.check_updates(temp, json_path, updates, strict_mode)
+
+            for temp, _, updates in targets:
+                self.__batch_log.touch(temp)
+                for key_or_index, new_value in updates:
+                    if not self.__indexes:
+                        temp[key_or_index] = new_value
+                    elif type(temp) == list:
+                        old_item = temp[key_or_index]
+                        temp[key_or_index] = new_value
+                        self.__indexes.item_replaced(temp, key_or_index, old_item)
+                    else:
+                        old_values = self.__indexes.old_values(temp, (key_or_index,))
+                        temp[key_or_index] = new_value
+                        self.__indexes.fields_changed(temp, old_values)
+
+            if targets:
                 self.active_json = json_content
-                return json_content
-            else:
-                if type(key_or_index) != str:
-                    raise TypeError(
-                        f"Path `{json_path}` is pointing to a JSON object, therefore `key_or_index` parameter must have a `str` type; got `{type(key_or_index).__name__}` instead."
-                    )
-                del temp[key_or_index]
+                self.__changed()
+            return json_content
+
+    def delete_many(self, deletions: list) -> dict:
+        """
+        Delete several values from JSON at once.
+
+        Each distinct JSON path is resolved only once, and all paths and array indexes refer
+        to the object as it was before this call: e.g. deleting items 1 and 3 from
+        `[ "a", "b", "c", "d" ]` leaves `[ "a", "c" ]`. Unlike `delete`, values are deleted from
+        every object or array matched by JSON path. Array items are removed in a single pass over
+        each array. Either all values are deleted or none of them: all deletions are checked
+        before active object is modified. Autosave (if enabled) runs once per call.
+
+        Parameters: `deletions : list` specifies values to delete as `(json_path, key_or_index)` tuples
+        (see `delete` for the meaning of each item).
+
+        This function returns a Python dictionary with updated content.
+
+        This function raises an `IncorrectFunctionParameterTypeError` exception if one or more of its parameters have incorrect types.
+        This function raises a `ValueError` if a deletion does not contain exactly 2 values.
+        This function raises a `JSONPathError` if one of JSON paths is not valid.
+        This function raises a `KeyError` if key does not exist and an `IndexError` if array index is out of range.
+        This function raises any additional exceptions if occurred.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser({ "colors": [ "red", "magenta", "green", "cyan" ], "version": "1.0" })
+        >>> op.delete_many([('colors', 0), ('colors', 2), ('$', 'version')])
+        >>> op.active_json
+        # Output: { "colors": [ "magenta", "cyan" ] }
+
+        For more information about this method, please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        groups = self.__service.group_changes(deletions, "deletions", 2)
+
+        with self.__lock:
+            json_content, targets = self.__resolve_targets(groups)
+
+            targets = [
+                (temp, self.__service.check_deletions(temp, json_path, [key for key, in keys]))
+                for temp, json_path, keys in targets
+            ]
+
+            for temp, keys in targets:
+                if self.__indexes and type(temp) == list:
+                    self.__indexes.items_changed(temp)
+                old_values = self.__indexes.old_values(temp, keys) if type(temp) == dict else {}
+                self.__batch_log.touch(temp)
+                self.__service.delete_items(temp, keys)
+                if old_values:
+                    self.__indexes.fields_changed(temp, old_values)
+
+            if targets:
                 self.active_json = json_content
-                if self.__is_autosaving:
-                    if os.path.exists(self.__autosave_path):
-                        create_file = False
-                    else:
-                        create_file = True
-                    self.save_to_file(self.__autosave_path, create_file=create_file)
-                return json_content
+                self.__changed()
+            return json_content
+
+    def reverse_array(self, json_path: str) -> dict:
+        """
+        Reverse an array in JSON in place.
+
+        Unlike `robust_json.ext.reverse_array` applied to a value returned by `get_key_value`,
+        this function changes active object directly, without copying the array.
+
+        Parameters: `json_path : str` specifies path to the array.
+
+        This function returns a Python dictionary with updated content.
+
+        This function raises an `IncorrectFunctionParameterTypeError` if `json_path` parameter has an incorrect type.
+        This function raises a `JSONPathError` if JSON path is not valid.
+        This function raises a `TypeError` if JSON path is not pointing to an array.
+
+        Examples:
+
+        >>> from robust_json.object import JsonObjectParser
+        >>> op = JsonObjectParser({ "colors": [ "red", "magenta", "green" ] })
+        >>> op.reverse_array('colors')
+        >>> op.active_json
+        # Output: { "colors": [ "green", "magenta", "red" ] }
+
+        For more information about this method, please visit:
+        https://github.com/NickolaiBeloguzov/robust-json/blob/master/README.md#object-module-methods-and-properties
+        """
+        if type(json_path) != str:
+            raise IncorrectFunctionParameterTypeError("json_path", "str", type(json_path).__name__)
+
+        with self.__lock:
+            json_content = self.active_json
+
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
+
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
+
+            temp = matches[0]
+            if type(temp) != list:
+                raise TypeError(
+                    f"Path `{json_path}` must point to a JSON array; got `{type(temp).__name__}` instead."
+                )
+            self.__batch_log.touch(temp)
+            temp.reverse()
+            if self.__indexes:
+                self.__indexes.items_changed(temp)
+            self.active_json = json_content
+            self.__changed()
+            return json_content
+
+    def __resolve_targets(self, groups: dict) -> tuple:
+        # Resolves each JSON path once; returns active object and a list of
+        # [container, json_path, changes] entries (one per matched container)
+        json_content = self.active_json
+        targets = {}
+        for json_path, changes in groups.items():
+            if self.__copy_on_write:
+                # Shared nodes along JSON path are copied before they are modified
+                json_content, matches = self.__cow.resolve_json_path(json_path, json_content)
+            else:
+                matches = self.__service.resolve_json_path(json_path, json_content)
+
+            if not matches:
+                raise JSONPathError(f"Path `{json_path}` is not valid.")
+
+            for temp in matches:
+                if id(temp) in targets:
+                    # Different paths may point to the same container
+                    targets[id(temp)][2].extend(changes)
+                else:
+                    targets[id(temp)] = [temp, json_path, list(changes)]
+        return json_content, list(targets.values())
 
     def reset(self, discard_active_object: bool = False) -> dict:
         """
@@ -584,7 +1200,12 @@ class JsonObjectParser:
             )
 
         if discard_active_object == True:
-            self.active_json = self.__backup
+            with self.__lock:
+                self.active_json = self.__backup
+                if self.__copy_on_write:
+                    # Active object shares all nodes with backup again
+                    self.__cow.reset()
+                self.__indexes.invalidate()
 
         return self.__backup
 
@@ -655,28 +1276,43 @@ class JsonObjectParser:
                 "create_file", "bool", type(create_file).__name__
             )
 
-        file_path = path
+        # Active object can't be changed while it is being written
+        with self.__lock:
+            file_path = path
 
-        file_json = self.active_json
+            file_json = self.active_json
 
-        if prettify == True:
-            indent = 4
-        else:
-            indent = None
+            if prettify == True:
+                indent = 4
+            else:
+                indent = None
 
-        if create_file == True:
-            if self.__service.check_file_path(file_path):
-                raise FileExistsError(
-                    f"File `{file_path}` already exists. Either set `create_file` parameter to `False` or change `path` parameter to silence this error."
+            if create_file == True:
+                if self.__service.check_file_path(file_path):
+                    raise FileExistsError(
+                        f"File `{file_path}` already exists. Either set `create_file` parameter to `False` or change `path` parameter to silence this error."
+                    )
+                self.__service.write_json_file(
+                    file_path,
+                    file_json,
+                    indent,
+                    self.__codec,
+                    create_file=True,
+                    buffer_size=self.__write_buffer_size if self.__streaming else None,
+                    atomic=self.__atomic_write,
+                    fsync=self.__fsync,
                 )
-            file = open(file_path, "x")
-            file.write(JSON.dumps(file_json, indent=indent))
-            file.close()
-        else:
-            if not self.__service.check_file_path(file_path):
-                raise FileNotFoundError(
-                    f"File `{file_path}` doesn't exist. If you want to create a new file under this path, please set `create_file` parameter to `True`."
+            else:
+                if not self.__service.check_file_path(file_path):
+                    raise FileNotFoundError(
+                        f"File `{file_path}` doesn't exist. If you want to create a new file under this path, please set `create_file` parameter to `True`."
+                    )
+                self.__service.write_json_file(
+                    file_path,
+                    file_json,
+                    indent,
+                    self.__codec,
+                    buffer_size=self.__write_buffer_size if self.__streaming else None,
+                    atomic=self.__atomic_write,
+                    fsync=self.__fsync,
                 )
-            file = open(file_path, "w")
-            file.write(JSON.dumps(file_json, indent=indent))
-            file.close()
@@ -0,0 +1,81 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+################################
+# * This file contains `FileWatcher` class
+# * that reloads changed files in background
+################################
+
+import threading
+import warnings
+
+
+class FileWatcher:
+    """
+    Background thread that periodically checks if source file of a parser
+    has changed and reloads it.
+
+    Watchers are created by `JsonFileParser.watch()`; they are stopped by `stop()`
+    or when parser is closed. Exceptions raised while checking the file
+    are reported as `RuntimeWarning`s, and watcher keeps running.
+
+    Parameters: `refresh : Callable` specifies function that reloads the file if needed
+    and returns `True` if it has been reloaded. `interval : int` specifies how many milliseconds
+    pass between checks. `callback : Callable` specifies function that is called
+    (without arguments) each time the file has been reloaded.
+    """
+
+    def __init__(self, refresh, interval: int, callback=None):
+        self.__refresh = refresh
+        self.__interval = interval
+        self.__callback = callback
+        self.__stopping = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, name="robust-json-watcher", daemon=True)
+
+    @property
+    def interval(self) -> int:
+        """
+        Number of milliseconds between checks.
+        """
+        return self.__interval
+
+    @property
+    def running(self) -> bool:
+        """
+        `True` if watcher has been started and has not been stopped yet.
+        """
+        return self.__thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start watching the file.
+        """
+        self.__thread.start()
+
+    def __run(self) -> None:
+        while not self.__stopping.wait(self.__interval / 1000):
+            try:
+                if self.__refresh() and self.__callback is not None:
+                    self.__callback()
+            except Exception as e:
+                warnings.warn(f"File watcher failed to refresh file: {e}", RuntimeWarning)
+
+    def stop(self) -> None:
+        """
+        Stop watching the file. This function waits until the current check (if any) is finished.
+        """
+        self.__stopping.set()
+        if self.__thread.is_alive() and self.__thread is not threading.current_thread():
+            self.__thread.join()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(interval={self.__interval}, running={self.running})"
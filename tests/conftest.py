@@ -0,0 +1,37 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    """
+    Factory that writes JSON to a file in a temporary directory and returns its path.
+    """
+
+    def create(content, name: str = "data.json") -> str:
+        path = tmp_path / name
+        if name.endswith((".jsonl", ".ndjson")):
+            path.write_text("".join(json.dumps(record) + "\n" for record in content))
+        else:
+            path.write_text(json.dumps(content))
+        return str(path)
+
+    return create
+
+
+def read_json(path: str):
+    with open(path) as f:
+        return json.load(f)
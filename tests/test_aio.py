@@ -0,0 +1,201 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from robust_json import AsyncJsonFileParser
+from robust_json.__internal_utils import service
+from robust_json.errors import IncorrectFunctionParameterTypeError
+
+from conftest import read_json
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(4)
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(getattr(fn, "func", fn).__name__)
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_parser_must_be_loaded_first(json_file):
+    parser = AsyncJsonFileParser(json_file({"n": 0}))
+
+    with pytest.raises(RuntimeError):
+        parser.active_json
+    with pytest.raises(RuntimeError):
+        asyncio.run(parser.get_key_value("n"))
+
+
+def test_concurrent_changes_and_saves(json_file):
+    path = json_file({"n": 0, "l": []})
+
+    async def main():
+        async with AsyncJsonFileParser(path, autosave=True, executor=ThreadPoolExecutor(4)) as parser:
+            await asyncio.gather(*(parser.append("l", i, True) for i in range(200)))
+            await parser.update_value("$", "n", 5)
+            assert await parser.get_key_value("n") == 5
+            await asyncio.gather(*(parser.save_to_file() for _ in range(20)))
+            await parser.minify()
+            await parser.prettify()
+
+    asyncio.run(main())
+
+    content = read_json(path)
+    assert content["n"] == 5
+    assert sorted(content["l"]) == list(range(200))
+
+
+def test_blocking_work_runs_in_executor(json_file):
+    path = json_file({"n": 0, "a": [1, 2]})
+    executor = RecordingExecutor()
+
+    async def main():
+        parser = AsyncJsonFileParser(path, executor=executor)
+        await parser.load()
+        await parser.update_value("$", "n", 1)
+        await parser.reverse_array("a")
+        assert await parser.get_key_value("n") == 1
+        await parser.save_to_file()
+        await parser.close()
+
+    asyncio.run(main())
+
+    assert executor.submitted == [
+        "JsonFileParser",
+        "update_value",
+        "reverse_array",
+        "get_key_value",
+        "save_to_file",
+        "close",
+    ]
+    assert read_json(path) == {"n": 1, "a": [2, 1]}
+
+
+def test_event_loop_is_not_blocked_by_writes(json_file):
+    path = json_file({"n": 0})
+    write = service.write_json_file
+
+    def slow_write(*args, **kwargs):
+        time.sleep(0.2)
+        return write(*args, **kwargs)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async with AsyncJsonFileParser(path, autosave=True) as parser:
+            task = asyncio.create_task(ticker())
+            with mock.patch.object(service, "write_json_file", autospec=True, side_effect=slow_write):
+                await parser.update_value("$", "n", 1)
+            task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 5
+    assert read_json(path) == {"n": 1}
+
+
+def test_reads_wait_for_saves_outside_event_loop(json_file):
+    path = json_file({"n": 0, "users": [{"id": 1}]})
+    write = service.write_json_file
+    saving = threading.Event()
+
+    def slow_write(*args, **kwargs):
+        saving.set()
+        time.sleep(0.2)
+        return write(*args, **kwargs)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async with AsyncJsonFileParser(path, autosave=True) as parser:
+            assert parser.parser.get_key_value("n") == 0
+            task = asyncio.create_task(ticker())
+            with mock.patch.object(service, "write_json_file", autospec=True, side_effect=slow_write):
+                change = asyncio.create_task(parser.update_value("$", "n", 1))
+                await asyncio.get_running_loop().run_in_executor(None, saving.wait)
+                # Reads wait for the save in executor, while the event loop keeps running
+                assert await parser.get_key_value("n") == 1
+                assert await parser.lookup("users", "id", 1) == [{"id": 1}]
+                await change
+            task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 5
+
+
+def test_parser_is_always_thread_safe(json_file):
+    path = json_file({"n": 0})
+
+    with pytest.raises(ValueError):
+        AsyncJsonFileParser(path, thread_safe=False)
+
+    async def main():
+        async with AsyncJsonFileParser(path) as parser:
+            changed = threading.Event()
+
+            def write():
+                with pytest.raises(KeyError):
+                    with parser.parser.batch():
+                        parser.parser.update_value("$", "n", 1)
+                        changed.set()
+                        time.sleep(0.2)
+                        raise KeyError
+
+            thread = threading.Thread(target=write)
+            thread.start()
+            await asyncio.get_running_loop().run_in_executor(None, changed.wait)
+            # Reader waits for the batch, so it never sees changes that are rolled back
+            assert await parser.get_key_value("n") == 0
+            thread.join()
+
+    asyncio.run(main())
+
+
+def test_parsers_of_same_file_do_not_interleave_writes(json_file):
+    path = json_file({"n": 0})
+
+    async def main():
+        first = AsyncJsonFileParser(path)
+        second = AsyncJsonFileParser(path)
+        await first.load()
+        await second.load()
+        await first.update_value("$", "n", 1)
+        await second.update_value("$", "n", 2)
+        await asyncio.gather(*(parser.save_to_file() for parser in [first, second] * 20))
+        return (await first.load())["n"]
+
+    assert asyncio.run(main()) in (1, 2)
+
+
+def test_executor_must_be_executor(json_file):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        AsyncJsonFileParser(json_file({}), executor=threading.Thread())
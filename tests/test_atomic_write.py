@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import multiprocessing
+import os
+import stat
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.codec import StdlibCodec
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+from conftest import read_json
+
+ORIGINAL = {"a": 1}
+DOCUMENT = {"users": [{"id": i} for i in range(100)]}
+
+
+def test_atomic_write_replaces_file(json_file, tmp_path):
+    path = json_file(ORIGINAL)
+    inode = os.stat(path).st_ino
+
+    service().write_json_file(path, DOCUMENT, atomic=True)
+
+    assert read_json(path) == DOCUMENT
+    assert os.stat(path).st_ino != inode
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+@pytest.mark.parametrize("buffer_size", [None, 16])
+def test_failed_rename_keeps_original_and_removes_temporary_file(json_file, tmp_path, buffer_size):
+    path = json_file(ORIGINAL)
+
+    with mock.patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            service().write_json_file(path, DOCUMENT, buffer_size=buffer_size, atomic=True)
+
+    assert read_json(path) == ORIGINAL
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_error_in_the_middle_of_stream_keeps_original(json_file, tmp_path):
+    path = json_file(ORIGINAL)
+
+    def broken_dump(self, obj, file, indent=None, buffer_size=65536):
+        file.write(b'{"users": [')
+        raise KeyboardInterrupt
+
+    with mock.patch.object(StdlibCodec, "dump", broken_dump):
+        with pytest.raises(KeyboardInterrupt):
+            service().write_json_file(path, DOCUMENT, None, StdlibCodec(), False, 16, atomic=True)
+
+    assert read_json(path) == ORIGINAL
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def _crash_before_rename(path: str) -> None:
+    # Process dies after temporary file is written, but before it replaces target file
+    with mock.patch("os.replace", side_effect=lambda *args: os._exit(1)):
+        JsonFileParser(path, autosave=True, atomic_write=True, fsync="file").update_value("$", "a", 2)
+
+
+def test_process_crash_never_leaves_partial_file(json_file):
+    path = json_file(ORIGINAL)
+
+    process = multiprocessing.get_context("spawn").Process(target=_crash_before_rename, args=(path,))
+    process.start()
+    process.join(30)
+
+    assert process.exitcode == 1
+    assert read_json(path) == ORIGINAL
+    parser = JsonFileParser(path)
+    assert parser.active_json == ORIGINAL
+
+
+def test_atomic_write_keeps_permissions(json_file):
+    path = json_file(ORIGINAL)
+    os.chmod(path, 0o640)
+
+    JsonFileParser(path, atomic_write=True).save_to_file()
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_atomic_write_follows_symbolic_links(json_file, tmp_path):
+    target = json_file(ORIGINAL)
+    link = tmp_path / "link.json"
+    link.symlink_to(target)
+
+    service().write_json_file(str(link), DOCUMENT, atomic=True)
+
+    assert link.is_symlink()
+    assert read_json(target) == DOCUMENT
+
+
+def test_atomic_create_file(tmp_path, json_file):
+    path = str(tmp_path / "new.json")
+
+    JsonObjectParser(DOCUMENT, atomic_write=True).save_to_file(path, create_file=True)
+
+    assert read_json(path) == DOCUMENT
+    with pytest.raises(FileExistsError):
+        service().write_json_file(json_file(ORIGINAL), DOCUMENT, create_file=True, atomic=True)
+
+
+@pytest.mark.parametrize("policy, expected", [("none", 0), ("file", 1), ("directory", 2)])
+@pytest.mark.parametrize("atomic", [False, True])
+def test_fsync_policies(json_file, policy, expected, atomic):
+    path = json_file(ORIGINAL)
+
+    with mock.patch("os.fsync") as fsync:
+        service().write_json_file(path, DOCUMENT, atomic=atomic, fsync=policy)
+
+    assert fsync.call_count == expected
+    assert read_json(path) == DOCUMENT
+
+
+def test_unknown_fsync_policy(json_file):
+    path = json_file(ORIGINAL)
+
+    with pytest.raises(ValueError):
+        service().write_json_file(path, DOCUMENT, fsync="always")
+    with pytest.raises(ValueError):
+        JsonFileParser(path, fsync="always")
+    assert read_json(path) == ORIGINAL
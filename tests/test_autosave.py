@@ -0,0 +1,217 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from robust_json import autosave
+from robust_json.autosave import AutosavePolicy, AutosaveScheduler
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+from conftest import read_json
+
+
+class Saver:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+
+
+def test_default_policy_saves_after_each_change(json_file):
+    path = json_file({"a": 1, "arr": [1, 2]})
+    parser = JsonFileParser(path, autosave=True)
+
+    parser.append("arr", 3, True)
+    assert read_json(path)["arr"] == [1, 2, 3]
+    parser.update_value("$", "a", 2)
+    assert read_json(path)["a"] == 2
+
+
+def test_changes_are_coalesced_by_count(json_file):
+    path = json_file({"a": 1})
+    parser = JsonFileParser(path, autosave=True, autosave_policy=AutosavePolicy(max_operations=3))
+
+    parser.update_value("$", "a", 10)
+    parser.update_value("$", "a", 11)
+    assert read_json(path)["a"] == 1
+    parser.update_value("$", "a", 12)
+    assert read_json(path)["a"] == 12
+
+    parser.update_value("$", "a", 13)
+    parser.close()
+    assert read_json(path)["a"] == 13
+
+
+def test_pending_changes_are_saved_on_exit_from_with_block(json_file):
+    path = json_file({"a": 1})
+    policy = AutosavePolicy(max_operations=None, interval=100000)
+
+    with JsonFileParser(path, autosave=True, autosave_policy=policy) as parser:
+        parser.update_value("$", "a", 2)
+        assert read_json(path)["a"] == 1
+
+    assert read_json(path)["a"] == 2
+
+
+def test_interval_is_checked_on_next_change():
+    saver = Saver()
+    scheduler = AutosaveScheduler(saver, AutosavePolicy(max_operations=None, interval=20))
+
+    scheduler.notify()
+    assert saver.calls == 0
+    time.sleep(0.03)
+    scheduler.notify()
+
+    assert saver.calls == 1
+    assert scheduler.pending == 0
+
+
+def test_background_saving_coalesces_changes(json_file):
+    path = json_file({"a": 0, "arr": []})
+    policy = AutosavePolicy(max_operations=None, interval=50, background=True)
+    parser = JsonFileParser(path, autosave=True, autosave_policy=policy)
+
+    for i in range(1000):
+        parser.update_value("$", "a", i)
+    for i in range(100):
+        parser.append("arr", i, True)
+    parser.close()
+
+    assert read_json(path) == {"a": 999, "arr": list(range(100))}
+    assert not any(thread.name == "robust-json-autosave" for thread in threading.enumerate())
+
+
+def test_background_thread_saves_without_further_changes():
+    saver = Saver()
+    scheduler = AutosaveScheduler(saver, AutosavePolicy(max_operations=None, interval=10, background=True))
+
+    for _ in range(50):
+        scheduler.notify()
+    deadline = time.monotonic() + 5
+    while scheduler.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert scheduler.pending == 0
+    assert 1 <= saver.calls < 50
+    scheduler.close()
+
+
+def test_background_threshold_with_object_parser(tmp_path):
+    path = str(tmp_path / "out.json")
+    policy = AutosavePolicy(max_operations=5, background=True)
+    parser = JsonObjectParser({"a": 1}, autosave=True, autosave_path=path, autosave_policy=policy)
+
+    for i in range(12):
+        parser.update_value("$", "a", i)
+    parser.flush()
+
+    assert read_json(path)["a"] == 11
+
+
+def test_change_during_save_stays_registered_for_exit():
+    saves = []
+
+    def save_with_concurrent_change():
+        saves.append(len(saves))
+        if len(saves) == 1:
+            # Another thread changes active object while file is being written
+            scheduler.notify()
+
+    scheduler = AutosaveScheduler(save_with_concurrent_change, AutosavePolicy(max_operations=10))
+    scheduler.notify()
+    scheduler.flush()
+
+    assert len(saves) == 1
+    assert scheduler.pending == 1
+    assert scheduler in autosave._pending
+    scheduler.flush()
+    assert scheduler not in autosave._pending
+
+
+def test_failed_save_keeps_changes_pending():
+    saver = Saver()
+    saver.error = OSError("disk full")
+    scheduler = AutosaveScheduler(saver, AutosavePolicy(max_operations=None, interval=100000))
+    scheduler.notify()
+    scheduler.notify()
+
+    with pytest.raises(OSError):
+        scheduler.flush()
+    assert scheduler.pending == 2
+    assert scheduler in autosave._pending
+
+    saver.error = None
+    scheduler.flush()
+    assert scheduler.pending == 0
+    assert saver.calls == 2
+
+
+def test_background_error_is_raised_by_next_call():
+    saver = Saver()
+    saver.error = OSError("disk full")
+    scheduler = AutosaveScheduler(saver, AutosavePolicy(max_operations=1, background=True))
+
+    with pytest.warns(RuntimeWarning):
+        scheduler.notify()
+        deadline = time.monotonic() + 5
+        while saver.calls == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+    saver.error = None
+    with pytest.raises(OSError):
+        scheduler.flush()
+    scheduler.flush()
+    assert scheduler.pending == 0
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_pending_changes_are_saved_at_interpreter_exit(tmp_path, background):
+    path = str(tmp_path / "out.json")
+    code = f"""
+from robust_json.object import JsonObjectParser
+from robust_json.autosave import AutosavePolicy
+policy = AutosavePolicy(max_operations=None, interval=100000, background={background})
+op = JsonObjectParser({{"a": 1}}, autosave=True, autosave_path={path!r}, autosave_policy=policy)
+op.update_value("$", "a", 5)
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    assert read_json(path) == {"a": 5}
+
+
+def test_policy_validation(json_file):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        AutosavePolicy(max_operations="1")
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        AutosavePolicy(background=1)
+    with pytest.raises(ValueError):
+        AutosavePolicy(max_operations=None)
+    with pytest.raises(ValueError):
+        AutosavePolicy(max_operations=0)
+    with pytest.raises(ValueError):
+        AutosavePolicy(interval=-1)
+    with pytest.raises(ValueError, match="requires autosaving"):
+        JsonObjectParser({}, autosave_policy=AutosavePolicy())
+    with pytest.raises(ValueError, match="requires autosaving"):
+        JsonFileParser(json_file({}), autosave_policy=AutosavePolicy())
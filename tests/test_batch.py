@@ -0,0 +1,133 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+from unittest import mock
+
+import pytest
+
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+from conftest import read_json
+
+DOCUMENT = {"a": 1, "users": [{"id": 0}], "o": {"x": 1, "y": 2}}
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_batch_is_saved_once(json_file, copy_on_write):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, autosave=True, copy_on_write=copy_on_write)
+
+    with mock.patch.object(
+        JsonFileParser, "save_to_file", autospec=True, side_effect=JsonFileParser.save_to_file
+    ) as save:
+        with parser.batch():
+            for i in range(100):
+                parser.append("users", {"id": i + 1}, True)
+            parser.update_value("$", "a", 5)
+
+    assert save.call_count == 1
+    assert len(read_json(path)["users"]) == 101
+    assert read_json(path)["a"] == 5
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_exception_rolls_back_all_changes(json_file, copy_on_write):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, autosave=True, copy_on_write=copy_on_write)
+
+    with pytest.raises(RuntimeError):
+        with parser.batch():
+            parser.delete("o", "x")
+            parser.append("users", {"r": 1})
+            parser.update_value("users", 0, {"z": 1})
+            parser.append("$", {"n": 1})
+            parser.update_many([("o", "y", 3)])
+            raise RuntimeError
+
+    assert parser.active_json == DOCUMENT
+    assert parser.backup == DOCUMENT
+    assert read_json(path) == DOCUMENT
+
+
+def test_nested_batch_is_rolled_back_on_its_own():
+    parser = JsonObjectParser(copy.deepcopy(DOCUMENT))
+
+    with parser.batch():
+        parser.delete("$", "a")
+        with pytest.raises(KeyError):
+            with parser.batch():
+                parser.delete("users", 0)
+                raise KeyError
+        assert parser.active_json["users"] == [{"id": 0}]
+
+    assert "a" not in parser.active_json
+
+
+def test_outer_rollback_discards_committed_inner_batch():
+    parser = JsonObjectParser(copy.deepcopy(DOCUMENT))
+
+    with pytest.raises(RuntimeError):
+        with parser.batch():
+            with parser.batch():
+                parser.update_value("o", "x", 10)
+            raise RuntimeError
+
+    assert parser.active_json == DOCUMENT
+
+
+def test_batch_without_changes_is_not_saved(json_file):
+    parser = JsonFileParser(json_file(DOCUMENT), autosave=True)
+
+    with mock.patch.object(JsonFileParser, "save_to_file") as save:
+        with parser.batch():
+            parser.get_key_value("o.x")
+
+    save.assert_not_called()
+
+
+def test_rolled_back_batch_is_not_saved(tmp_path):
+    path = str(tmp_path / "out.json")
+    parser = JsonObjectParser(copy.deepcopy(DOCUMENT), autosave=True, autosave_path=path)
+
+    with pytest.raises(ValueError):
+        with parser.batch():
+            parser.update_value("$", "a", 2)
+            raise ValueError
+
+    assert parser.active_json == DOCUMENT
+    with pytest.raises(FileNotFoundError):
+        read_json(path)
+
+
+def test_batch_yields_parser():
+    parser = JsonObjectParser({"a": [1, 2]})
+
+    with parser.batch() as batch:
+        assert batch is parser
+        parser.append("a", 3, True)
+
+    assert parser.active_json == {"a": [1, 2, 3]}
+
+
+def test_rollback_of_lazy_parser_returns_to_lazy_mode(json_file):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, lazy=True)
+
+    with pytest.raises(RuntimeError):
+        with parser.batch():
+            parser.update_value("$", "a", 2)
+            raise RuntimeError
+
+    assert "active_json" not in vars(parser)
+    assert parser.active_json == DOCUMENT
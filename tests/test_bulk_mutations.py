@@ -0,0 +1,151 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.errors import (
+    IncorrectFunctionParameterTypeError,
+    JSONPathError,
+    JSONStrictModeError,
+)
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+from conftest import read_json
+
+DOCUMENT = {
+    "db": {"host": "h", "port": 1},
+    "ports": [80, 443],
+    "colors": ["r", "m", "g", "c"],
+    "users": [{"n": 1, "pw": "x"}, {"n": 2, "pw": "y"}],
+    "v": "1",
+}
+
+
+@pytest.fixture(params=["file", "object", "copy_on_write"])
+def parser(request, json_file):
+    if request.param == "object":
+        return JsonObjectParser(copy.deepcopy(DOCUMENT))
+    return JsonFileParser(json_file(DOCUMENT), copy_on_write=request.param == "copy_on_write")
+
+
+def test_update_many(parser):
+    parser.update_many([("db", "host", "H"), ("db", "port", 2), ("ports", 0, 8080), ("$.db", "port", 3)])
+
+    assert parser.active_json["db"] == {"host": "H", "port": 3}
+    assert parser.active_json["ports"] == [8080, 443]
+    assert parser.backup == DOCUMENT
+
+
+def test_delete_many_uses_original_indexes(parser):
+    parser.delete_many([("colors", 0), ("colors", 2), ("colors", -4), ("$", "v"), ("users[*]", "pw")])
+
+    assert parser.active_json["colors"] == ["m", "c"]
+    assert "v" not in parser.active_json
+    assert parser.active_json["users"] == [{"n": 1}, {"n": 2}]
+    assert parser.backup == DOCUMENT
+
+
+@pytest.mark.parametrize(
+    "deletions, error",
+    [
+        ([("colors", 5)], IndexError),
+        ([("db", "nope")], KeyError),
+        ([("nope", "x")], JSONPathError),
+        ([("colors", "x")], TypeError),
+        ([("db", "host"), ("colors", 9)], IndexError),
+        ([("db",)], ValueError),
+        ("x", IncorrectFunctionParameterTypeError),
+        ([("db.host", "x")], TypeError),
+    ],
+)
+def test_invalid_deletions_change_nothing(parser, deletions, error):
+    with pytest.raises(error):
+        parser.delete_many(deletions)
+
+    assert parser.active_json == DOCUMENT
+
+
+def test_invalid_updates_change_nothing(parser):
+    with pytest.raises(JSONStrictModeError):
+        parser.update_many([("db", "host", "x"), ("db", "port", "str")], True)
+    with pytest.raises(IndexError):
+        parser.update_many([("db", "host", "x"), ("ports", 2, 1)])
+
+    assert parser.active_json == DOCUMENT
+
+
+def test_many_deletions_from_one_array(parser):
+    parser.update_value("$", "big", list(range(1000)))
+
+    parser.delete_many([("big", i) for i in range(0, 1000, 3)])
+
+    assert parser.active_json["big"] == [i for i in range(1000) if i % 3]
+
+
+def test_delete_many_in_rolled_back_batch(parser):
+    parser.update_value("$", "big", list(range(10)))
+
+    with pytest.raises(RuntimeError):
+        with parser.batch():
+            parser.delete_many([("big", i) for i in range(5)])
+            raise RuntimeError
+
+    assert parser.active_json["big"] == list(range(10))
+
+
+def test_bulk_change_is_saved_once(json_file):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, autosave=True)
+
+    with mock.patch.object(
+        service, "write_json_file", autospec=True, side_effect=service.write_json_file
+    ) as write:
+        parser.update_many([("db", "host", "Z"), ("ports", 1, 1)])
+        parser.delete_many([("colors", 0), ("colors", 1)])
+
+    assert write.call_count == 2
+    content = read_json(path)
+    assert content["db"]["host"] == "Z"
+    assert content["colors"] == ["g", "c"]
+
+
+def test_bulk_changes_are_merged_with_locking(json_file):
+    path = json_file(DOCUMENT)
+    first = JsonFileParser(path, autosave=True, locking="lock")
+    second = JsonFileParser(path, autosave=True, locking="lock")
+
+    first.update_many([("db", "host", "A")])
+    second.delete_many([("colors", 0), ("colors", 1)])
+
+    content = read_json(path)
+    assert content["db"]["host"] == "A"
+    assert content["colors"] == ["g", "c"]
+
+
+def test_constructor_keeps_accepting_baseline_arguments(json_file, tmp_path):
+    path = json_file(DOCUMENT)
+    out = str(tmp_path / "out.json")
+
+    # Extra keyword arguments and `autosave_path` without autosave are accepted (and ignored)
+    parser = JsonFileParser(path, autosave_pth="out.json")
+    parser.update_many([("db", "host", "A")])
+    JsonFileParser(path, autosave_path=out).update_many([("db", "host", "B")])
+    JsonObjectParser({}, autosave_path=out).update_many([("$", "a", 1)])
+
+    assert read_json(path) == DOCUMENT
+    assert not os.path.exists(out)
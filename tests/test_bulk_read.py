@@ -0,0 +1,109 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.__path_utils import JsonPathTrie
+from robust_json.cache import path_cache
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONPathError
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+DOCUMENT = {
+    "config": {"db": {"host": "localhost", "port": 5432}, "debug": False},
+    "users": [{"id": 1, "name": "Ann"}, {"id": 2, "name": "Bob"}],
+}
+PATHS = [
+    "config.db.host",
+    "config.db.port",
+    "config.debug",
+    "users[0].name",
+    "users.[1]",
+    "users[*].id",
+    "$..port",
+    "$",
+]
+
+
+@pytest.fixture(params=["object", "file", "lazy"])
+def parser(request, json_file):
+    if request.param == "object":
+        return JsonObjectParser(DOCUMENT)
+    return JsonFileParser(json_file(DOCUMENT), lazy=request.param == "lazy")
+
+
+def test_values_match_get_key_value(parser):
+    expected = {path: parser.get_key_value(path) for path in PATHS}
+
+    assert parser.get_key_values(PATHS) == expected
+    assert parser.get_key_values(tuple(PATHS)) == expected
+
+
+def test_simple_paths_of_lazy_parser_do_not_load_file(json_file):
+    parser = JsonFileParser(json_file(DOCUMENT), lazy=True)
+
+    assert parser.get_key_values(["config.db.host", "users[1].id"]) == {
+        "config.db.host": "localhost",
+        "users[1].id": 2,
+    }
+    assert parser.lazy
+
+
+def test_paths_are_resolved_in_one_traversal():
+    parser = JsonObjectParser(DOCUMENT)
+
+    with mock.patch.object(
+        JsonPathTrie, "find", autospec=True, side_effect=JsonPathTrie.find
+    ) as find, mock.patch.object(service, "resolve_json_path") as resolve:
+        parser.get_key_values(PATHS)
+
+    assert find.call_count == 1
+    resolve.assert_not_called()
+
+
+def test_path_set_is_compiled_once():
+    parser = JsonObjectParser(DOCUMENT)
+    paths = ["config.db.host", "users[0].id"]
+    parser.get_key_values(paths)
+
+    with mock.patch("robust_json.cache.JsonPathTrie", side_effect=AssertionError):
+        assert parser.get_key_values(paths)["users[0].id"] == 1
+    # Sets are kept apart from single expressions
+    assert tuple(paths) not in path_cache
+
+
+def test_duplicate_paths(parser):
+    assert parser.get_key_values(["config.debug", "config.debug"]) == {"config.debug": False}
+
+
+def test_missing_path_raises(parser):
+    with pytest.raises(JSONPathError):
+        parser.get_key_values(["config.db.host", "config.db.user"])
+
+
+def test_parameter_types(parser):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        parser.get_key_values("config.db.host")
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        parser.get_key_values(["config.db.host", 1])
+    with pytest.raises(JSONPathError):
+        parser.get_key_values(["config", ""])
+
+
+def test_resolve_json_paths_returns_all_matches():
+    assert service().resolve_json_paths(["users[*].name", "config.db.user"], DOCUMENT) == {
+        "users[*].name": ["Ann", "Bob"],
+        "config.db.user": [],
+    }
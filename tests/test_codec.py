@@ -0,0 +1,192 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+from unittest import mock
+
+import pytest
+
+from robust_json.codec import (
+    JsonCodec,
+    StdlibCodec,
+    available_codecs,
+    get_codec,
+    set_default_codec,
+)
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+DOCUMENT = {"a": "ünï/", "b": [1, 2.5, 1e20, None, True], "big": 2**70, "c": {}}
+CODECS = ["json", "orjson", "ujson"]
+
+
+def codec_or_skip(name: str) -> JsonCodec:
+    if name not in available_codecs():
+        pytest.skip(f"Package `{name}` is not installed.")
+    return get_codec(name)
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_round_trip(name):
+    codec = codec_or_skip(name)
+
+    assert codec.loads(json.dumps(DOCUMENT)) == DOCUMENT
+    assert codec.loads(json.dumps(DOCUMENT).encode("utf-8")) == DOCUMENT
+    assert json.loads(codec.dumps(DOCUMENT)) == DOCUMENT
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_strict_codecs_produce_stdlib_output(name):
+    codec = codec_or_skip(name)
+
+    assert codec.dumps(DOCUMENT) == json.dumps(DOCUMENT)
+    assert codec.dumps(DOCUMENT, indent=4) == json.dumps(DOCUMENT, indent=4)
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codecs_keep_large_integers_and_nan(name):
+    codec = codec_or_skip(name)
+
+    assert codec.loads(b'{"big": 123456789012345678901234567890}') == {
+        "big": 123456789012345678901234567890
+    }
+    value = codec.loads(b'{"x": NaN}')["x"]
+    assert value != value
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        b"-123456789012345678901",
+        b"[1, -9223372036854775809]",
+        b'{"a": 18446744073709551616 }',
+        b'{"a": [1,\n   123456789012345678901\n]}',
+    ],
+)
+def test_orjson_keeps_long_integers_exact(document):
+    codec = codec_or_skip("orjson")
+
+    assert codec.loads(document) == json.loads(document)
+    assert codec.loads(document.decode("utf-8")) == json.loads(document)
+    assert codec.loads(memoryview(document)) == json.loads(document)
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        b'{"id": "123456789012345678901234", "hash": "a1234567890123456789012345b"}',
+        b'{"time": "2024-01-01 12345678901234567890", "x": 1}',
+        b"[1.12345678901234567890, 12345678901234567890.5, 1234567890123456789e2]",
+    ],
+)
+def test_orjson_parses_long_digit_runs_that_are_not_integers(document):
+    codec = codec_or_skip("orjson")
+
+    with mock.patch.object(json, "loads", side_effect=AssertionError("json.loads called")):
+        result = codec.loads(document)
+    assert result == json.loads(document)
+
+
+def test_orjson_finds_long_integers_on_chunk_boundaries():
+    codec = codec_or_skip("orjson")
+    from robust_json import codec as codec_module
+
+    for padding in range(0, 40, 3):
+        document = ("[" + " " * padding + '"x", 123456789012345678901]').encode("utf-8")
+        with mock.patch.object(codec_module, "_CHUNK_SIZE", 16), mock.patch.object(codec_module, "_MARGIN", 20):
+            assert codec.loads(document)[1] == 123456789012345678901
+            assert codec.loads(memoryview(document))[1] == 123456789012345678901
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_loads_memoryview(name):
+    codec = codec_or_skip(name)
+
+    assert codec.loads(memoryview(json.dumps(DOCUMENT).encode("utf-8"))) == DOCUMENT
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_errors_are_value_errors(name):
+    codec = codec_or_skip(name)
+
+    with pytest.raises(ValueError):
+        codec.loads(b"{broken")
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_file_parser_output_does_not_depend_on_codec(name, json_file):
+    codec_or_skip(name)
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, codec=name)
+
+    parser.prettify()
+    with open(path) as f:
+        assert f.read() == json.dumps(DOCUMENT, indent=4)
+    parser.minify()
+    with open(path) as f:
+        assert f.read() == json.dumps(DOCUMENT)
+
+
+def test_compact_orjson_output(tmp_path):
+    codec_or_skip("orjson")
+    from robust_json.codec import OrjsonCodec
+
+    document = {"a": [1, 2.5, None], "b": {"c": "d"}}
+    codec = OrjsonCodec(strict_format=False)
+    path = str(tmp_path / "out.json")
+    JsonObjectParser(document, codec=codec).save_to_file(path, prettify=False, create_file=True)
+
+    with open(path) as f:
+        assert f.read() == '{"a":[1,2.5,null],"b":{"c":"d"}}'
+    # Integers that don't fit in 64 bits are encoded by `json` module
+    assert json.loads(codec.dumps({"big": 2**70})) == {"big": 2**70}
+
+
+def test_custom_codec_instance_is_used(json_file):
+    class CountingCodec(StdlibCodec):
+        calls = 0
+
+        def loads(self, data):
+            CountingCodec.calls += 1
+            return super().loads(data)
+
+    parser = JsonFileParser(json_file(DOCUMENT), codec=CountingCodec())
+
+    assert CountingCodec.calls == 1
+    assert isinstance(parser.codec, CountingCodec)
+
+
+def test_get_codec_validates_name_and_type():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        get_codec(5)
+
+
+def test_set_default_codec_changes_parsers_without_codec():
+    previous = get_codec()
+    try:
+        set_default_codec("json")
+        assert type(get_codec()) == StdlibCodec
+        assert type(JsonObjectParser({}).codec) == StdlibCodec
+    finally:
+        set_default_codec(previous)
+
+
+def test_base_codec_dump_streams_in_chunks():
+    buffer = io.BytesIO()
+
+    StdlibCodec().dump(DOCUMENT, buffer, indent=2, buffer_size=4)
+
+    assert buffer.getvalue().decode("utf-8") == json.dumps(DOCUMENT, indent=2)
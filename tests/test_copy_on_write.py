@@ -0,0 +1,112 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+import pytest
+
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+DOCUMENT = {
+    "a": {"b": [1, 2, {"c": 3}], "z": {"q": 1}},
+    "users": [{"id": 1}, {"id": 2}],
+    "k": "v",
+}
+
+
+@pytest.fixture
+def document():
+    return copy.deepcopy(DOCUMENT)
+
+
+def test_backup_shares_active_object_until_first_change(document):
+    parser = JsonObjectParser(document, copy_on_write=True)
+
+    assert parser.active_json is parser.backup
+
+
+def test_update_copies_only_changed_branch(document):
+    parser = JsonObjectParser(document, copy_on_write=True)
+
+    parser.update_value("a.b[2]", "c", 30)
+
+    assert document == DOCUMENT
+    assert parser.active_json["a"]["b"][2] == {"c": 30}
+    assert parser.active_json["a"]["z"] is document["a"]["z"]
+    assert parser.active_json["users"] is document["users"]
+
+
+def test_append_and_delete_keep_backup_intact(document):
+    parser = JsonObjectParser(document, copy_on_write=True)
+
+    parser.append("users", {"id": 3}, True)
+    parser.delete("a.b", 0)
+    parser.delete("$", "k")
+
+    assert parser.backup == DOCUMENT
+    assert parser.active_json["users"][-1] == {"id": 3}
+    assert parser.active_json["a"]["b"] == [2, {"c": 3}]
+    assert "k" not in parser.active_json
+
+
+def test_complex_paths_copy_every_matched_node(document):
+    parser = JsonObjectParser(document, copy_on_write=True)
+
+    parser.delete("users[?id==2]", "id")
+    parser.append("a..z", {"w": 2})
+
+    assert parser.backup == DOCUMENT
+    assert parser.active_json["users"][1] == {}
+    assert parser.active_json["a"]["z"] == {"q": 1, "w": 2}
+
+
+def test_node_is_copied_once_and_then_changed_in_place(document):
+    parser = JsonObjectParser(document, copy_on_write=True)
+
+    parser.update_value("a.z", "q", 2)
+    owned = parser.active_json["a"]["z"]
+    parser.update_value("a.z", "q", 3)
+
+    assert parser.active_json["a"]["z"] is owned
+    assert owned == {"q": 3}
+
+
+def test_reset_discards_changes_and_starts_sharing_again(document):
+    parser = JsonObjectParser(document, copy_on_write=True)
+    parser.update_value("$", "k", "w")
+
+    parser.reset(True)
+    assert parser.active_json is document
+
+    parser.update_value("$", "k", "x")
+    assert document == DOCUMENT
+    assert parser.active_json["k"] == "x"
+
+
+def test_file_parser_copy_on_write(json_file):
+    parser = JsonFileParser(json_file(DOCUMENT), copy_on_write=True)
+
+    parser.update_value("a.z", "q", 2)
+    parser.delete("$", "k")
+
+    assert parser.backup == DOCUMENT
+    assert parser.active_json["a"]["z"]["q"] == 2
+    assert parser.reset(True) == DOCUMENT
+
+
+def test_copy_on_write_must_be_bool(document, json_file):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonObjectParser(document, copy_on_write=1)
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(json_file(DOCUMENT), copy_on_write="yes")
@@ -0,0 +1,174 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import decimal
+import json
+import os
+import threading
+
+import pytest
+
+from robust_json.cache import JsonDocumentCache, document_cache
+from robust_json.codec import StdlibCodec
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+
+DOCUMENT = {"users": [{"id": i, "tags": [i]} for i in range(100)]}
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    max_memory = document_cache.max_memory
+    document_cache.clear()
+    yield
+    document_cache.max_memory = max_memory
+    document_cache.clear()
+
+
+def test_shared_parsers_parse_file_once(json_file):
+    path = json_file(DOCUMENT)
+
+    parsers = [JsonFileParser(path, shared=True) for _ in range(5)]
+
+    assert all(parser.active_json is parsers[0].active_json for parser in parsers)
+    assert document_cache.stats()["misses"] == 1
+    assert document_cache.stats()["hits"] == 4
+    assert path in document_cache
+
+
+def test_changes_are_not_visible_to_other_parsers(json_file):
+    path = json_file(DOCUMENT)
+    first, second = JsonFileParser(path, shared=True), JsonFileParser(path, shared=True)
+
+    first.update_value("users.[3]", "id", -1)
+    first.append("users.[4].tags", 9, True)
+    first.delete("users", 0)
+
+    assert second.get_key_value("users.[3].id") == 3
+    assert second.get_key_value("users.[4].tags") == [4]
+    assert len(second.active_json["users"]) == 100
+    assert first.get_key_value("users.[2].id") == -1
+    assert JsonFileParser(path, shared=True).active_json == DOCUMENT
+
+
+def test_changed_file_is_parsed_again(json_file):
+    path = json_file(DOCUMENT)
+    old = JsonFileParser(path, shared=True)
+
+    with open(path, "w") as f:
+        json.dump({"x": 1}, f)
+    new = JsonFileParser(path, shared=True)
+
+    assert new.active_json == {"x": 1}
+    assert old.refresh() is True
+    assert old.active_json is new.active_json
+    old.update_value("$", "x", 2)
+    assert new.active_json == {"x": 1}
+
+
+def test_documents_are_evicted_by_memory_limit(json_file):
+    first = json_file({"a": 1}, "first.json")
+    second = json_file({"b": 2}, "second.json")
+    document_cache.max_memory = os.path.getsize(first) + os.path.getsize(second) - 1
+
+    JsonFileParser(first, shared=True)
+    JsonFileParser(second, shared=True)
+
+    assert first not in document_cache
+    assert second in document_cache
+    assert document_cache.stats()["evictions"] == 1
+    assert document_cache.memory == os.path.getsize(second)
+
+
+def test_zero_memory_disables_caching(json_file):
+    path = json_file(DOCUMENT)
+    JsonFileParser(path, shared=True)
+
+    document_cache.max_memory = 0
+    JsonFileParser(path, shared=True)
+
+    assert len(document_cache) == 0
+    assert document_cache.stats()["misses"] == 2
+
+
+def test_concurrent_loads_parse_once(json_file):
+    path = json_file(DOCUMENT)
+    threads = [
+        threading.Thread(target=JsonFileParser, args=(path,), kwargs={"shared": True})
+        for _ in range(8)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert document_cache.stats()["misses"] == 1
+
+
+def test_failed_loads_are_not_cached():
+    cache = JsonDocumentCache()
+
+    def fail():
+        raise ValueError("bad JSON")
+
+    with pytest.raises(ValueError):
+        cache.get("data.json", (0, 0, 0, 10), fail)
+    assert len(cache) == 0
+    assert cache.get("data.json", (0, 0, 0, 10), lambda: {"a": 1}) == {"a": 1}
+
+
+def test_invalidate_removes_document(json_file):
+    path = json_file(DOCUMENT)
+    JsonFileParser(path, shared=True)
+
+    document_cache.invalidate(path)
+
+    assert path not in document_cache
+    assert document_cache.memory == 0
+
+
+def test_max_memory_validation():
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonDocumentCache("1")
+    with pytest.raises(ValueError):
+        JsonDocumentCache(-1)
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        document_cache.max_memory = 1.5
+
+
+def test_shared_must_be_bool(json_file):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(json_file(DOCUMENT), shared=1)
+
+
+def test_parsers_with_different_codecs_do_not_share_tree(json_file):
+    path = json_file({"n": 2 ** 70, "f": 1.5})
+
+    class DecimalCodec(StdlibCodec):
+        def loads(self, data):
+            return json.loads(data, parse_float=decimal.Decimal)
+
+    stdlib = JsonFileParser(path, shared=True, codec="json")
+    custom = JsonFileParser(path, shared=True, codec=DecimalCodec())
+    mapped = JsonFileParser(path, shared=True, codec="json", use_mmap=True)
+
+    assert stdlib.active_json is not custom.active_json
+    assert stdlib.active_json is not mapped.active_json
+    assert type(stdlib.get_key_value("f")) == float
+    assert type(custom.get_key_value("f")) == decimal.Decimal
+    assert JsonFileParser(path, shared=True, codec="json").active_json is stdlib.active_json
+    assert document_cache.stats()["size"] == 3
+
+    document_cache.invalidate(path)
+    assert path not in document_cache
+    assert document_cache.memory == 0
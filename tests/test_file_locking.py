@@ -0,0 +1,144 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONFileError
+from robust_json.file import JsonFileParser
+
+from conftest import read_json
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="File locking is supported on POSIX only")
+
+PROCESSES = 4
+
+
+def open_shared(path: str, mode: str, atomic: bool = None) -> JsonFileParser:
+    if atomic is None:
+        atomic = mode == "optimistic"
+    return JsonFileParser(path, autosave=True, locking=mode, atomic_write=atomic)
+
+
+def increment(path: str, mode: str, count: int) -> None:
+    parser = open_shared(path, mode)
+    for _ in range(count):
+        with parser.locked():
+            parser.update_value("$", "counter", parser.get_key_value("counter") + 1)
+
+
+def set_own_key(path: str, mode: str, atomic: bool, key: str, count: int) -> None:
+    parser = open_shared(path, mode, atomic)
+    for i in range(count):
+        parser.update_value("$", key, i)
+    parser.close()
+
+
+def append_records(path: str, key: int, count: int) -> None:
+    parser = JsonFileParser(path, autosave=True, lazy=True, locking="lock")
+    for i in range(count):
+        parser.append("$", {"k": key, "i": i}, True)
+
+
+def run_processes(target, args: list) -> None:
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=target, args=item) for item in args]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+
+@pytest.mark.parametrize("mode", ["lock", "optimistic"])
+def test_read_modify_write_is_not_lost(json_file, mode):
+    path = json_file({"counter": 0})
+
+    run_processes(increment, [(path, mode, 50)] * PROCESSES)
+
+    assert read_json(path) == {"counter": 50 * PROCESSES}
+
+
+@pytest.mark.parametrize("mode, atomic", [("lock", False), ("lock", True), ("optimistic", True)])
+def test_changes_of_other_processes_are_merged(json_file, mode, atomic):
+    path = json_file({})
+
+    run_processes(set_own_key, [(path, mode, atomic, f"k{i}", 50) for i in range(PROCESSES)])
+
+    assert read_json(path) == {f"k{i}": 49 for i in range(PROCESSES)}
+
+
+def test_json_lines_appends_from_several_processes(json_file):
+    path = json_file([], "data.jsonl")
+
+    run_processes(append_records, [(path, key, 100) for key in range(PROCESSES)])
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 100 * PROCESSES
+    for key in range(PROCESSES):
+        assert [record["i"] for record in records if record["k"] == key] == list(range(100))
+
+
+def test_conflicting_change_is_reapplied_on_top_of_file(json_file):
+    path = json_file({"a": 0, "b": 0})
+    first = open_shared(path, "lock")
+    second = open_shared(path, "lock")
+
+    first.update_value("$", "a", 1)
+    second.update_value("$", "b", 2)
+
+    assert read_json(path) == {"a": 1, "b": 2}
+    assert second.active_json == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_changes_that_cannot_be_reapplied_stay_pending(json_file, copy_on_write):
+    path = json_file({"a": {"x": 1}})
+    first = JsonFileParser(path, locking="lock", copy_on_write=copy_on_write)
+    second = open_shared(path, "lock")
+
+    first.update_value("$", "n", 5)
+    first.update_value("a", "x", 2)
+    second.delete("$", "a")
+
+    # Half-applied changes are never saved: conflict is reported again on the next attempt
+    for _ in range(2):
+        with pytest.raises(JSONFileError, match="Path `a` is not valid"):
+            first.save_to_file()
+        assert first.active_json == {"a": {"x": 2}, "n": 5}
+        assert first.backup == {"a": {"x": 1}}
+        assert read_json(path) == {}
+
+    second.update_value("$", "a", {"x": 0, "y": 1})
+    first.save_to_file()
+
+    assert read_json(path) == {"a": {"x": 2, "y": 1}, "n": 5}
+
+
+def test_locking_parameters(json_file):
+    path = json_file({})
+
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(path, locking=1)
+    with pytest.raises(ValueError):
+        JsonFileParser(path, locking="always")
+    with pytest.raises(ValueError, match="requires `atomic_write`"):
+        JsonFileParser(path, locking="optimistic")
+    with pytest.raises(ValueError):
+        JsonFileParser(path, autosave=True, journal=True, locking="lock")
+    with pytest.raises(ValueError):
+        with JsonFileParser(path).locked():
+            pass
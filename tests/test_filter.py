@@ -0,0 +1,159 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import types
+from unittest import mock
+
+import pytest
+
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONObjectError
+from robust_json.ext import JsonFilter, filter_json_array
+from robust_json.index import JsonArrayIndex
+
+ORDERS = [
+    {"id": 1, "country": "USA", "total": 10, "addr": {"city": "New York", "zip": [1, 2]}},
+    {"id": 2, "country": "Liberia", "total": 50},
+    {"id": 3, "country": "USA", "total": "x"},
+    {"id": 4, "total": 99, "addr": {"city": "Boston"}},
+]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ({"country": "Nope"}, []),
+        ({"total": {"$gt": 20}}, [1, 3]),
+        ({"total": {"$gte": 10, "$lt": 99}}, [0, 1]),
+        ({"country": {"$in": ["USA", "Canada"]}, "total": {"$lte": 10}}, [0]),
+        ({"country": {"$in": [["x"], "USA"]}}, [0, 2]),
+        ({"addr.city": {"$prefix": "New"}}, [0]),
+        ({"addr.zip.1": 2}, [0]),
+        ({"$or": [{"country": "Liberia"}, {"addr.city": "Boston"}]}, [1, 3]),
+        ({"$and": [{"country": "USA"}, {"id": {"$ne": 1}}]}, [2]),
+        ({"addr": {"city": "Boston"}}, [3]),
+    ],
+)
+def test_queries(query, expected):
+    assert filter_json_array(ORDERS, query) == [ORDERS[i] for i in expected]
+    assert filter_json_array(ORDERS, JsonFilter(query)) == [ORDERS[i] for i in expected]
+
+
+def test_field_and_value():
+    assert filter_json_array(ORDERS, "country", "USA") == [ORDERS[0], ORDERS[2]]
+    assert filter_json_array(ORDERS, "total", 99) == [ORDERS[3]]
+
+
+def test_numeric_parts_of_nested_fields_are_keys_of_objects():
+    items = [{"a": {"0": 1}}, {"a": [1]}, {"a": {"1": 1}}, {"a": {"²": 1}}, {"a": [[2, 1]]}]
+
+    assert filter_json_array(items, {"a.0": 1}) == items[:2]
+    assert filter_json_array(items, {"a.²": 1}) == [items[3]]
+    assert filter_json_array(items, {"a.0.1": 1}) == [items[4]]
+
+
+def test_value_is_required_for_field():
+    with pytest.raises(TypeError, match="value"):
+        filter_json_array(ORDERS, "country")
+    assert filter_json_array([{"a": None}, {"b": 1}], "a", None) == [{"a": None}]
+
+
+def test_limit_stops_scan_early():
+    assert filter_json_array(ORDERS, "country", "USA", limit=1) == [ORDERS[0]]
+    assert filter_json_array(ORDERS, "country", "USA", limit=0) == []
+    # Items after the last match are never checked
+    assert filter_json_array(ORDERS + [1], "country", "USA", limit=2) == [ORDERS[0], ORDERS[2]]
+
+
+def test_lazy_results():
+    matches = filter_json_array(ORDERS, JsonFilter({"country": "USA"}), lazy=True)
+
+    assert isinstance(matches, types.GeneratorType)
+    assert next(matches) == ORDERS[0]
+    assert list(filter_json_array(ORDERS, {"id": {"$gt": 0}}, lazy=True, limit=3)) == ORDERS[:3]
+
+
+@pytest.mark.parametrize(
+    "args, error",
+    [
+        ((ORDERS, {"x": {"$foo": 1}}), ValueError),
+        ((ORDERS, {"$xor": []}), ValueError),
+        ((ORDERS, ""), ValueError),
+        ((ORDERS, {"a": {"$in": 1}}), IncorrectFunctionParameterTypeError),
+        ((ORDERS, "a", 1, -1), ValueError),
+        ((ORDERS, 5), IncorrectFunctionParameterTypeError),
+        (([1], "a", 1), JSONObjectError),
+        ((ORDERS, {"$or": [1]}), IncorrectFunctionParameterTypeError),
+    ],
+)
+def test_invalid_arguments(args, error):
+    with pytest.raises(error):
+        filter_json_array(*args)
+
+
+def test_filter_exposes_equalities():
+    query = JsonFilter({"country": "USA", "total": {"$gt": 1}, "$or": [{"id": 1}]})
+
+    assert query.equalities == {"country": "USA"}
+    assert query(ORDERS[0])
+    assert not query(ORDERS[2])
+
+
+def make_index(array: list, field: str) -> JsonArrayIndex:
+    index = JsonArrayIndex("$", field)
+    index.build(array)
+    return index
+
+
+def test_index_is_used_for_equality():
+    users = [{"id": i % 10, "n": i} for i in range(100)]
+    index = make_index(users, "id")
+
+    with mock.patch.object(JsonArrayIndex, "items", autospec=True, side_effect=JsonArrayIndex.items) as items:
+        assert filter_json_array(users, {"id": 3, "n": {"$gt": 50}}, index=index) == [
+            user for user in users if user["id"] == 3 and user["n"] > 50
+        ]
+
+    assert items.call_count == 1
+
+
+def test_stale_index_candidates_are_checked():
+    array = [{"id": 1, "a": None}, {"id": 2}, {"id": 2, "x": 1}]
+    index = make_index(array, "id")
+
+    array[0]["id"] = 2
+    # Item that lost the value makes index rebuild itself, so the item that got it is found too
+    array[1]["id"] = 5
+
+    assert filter_json_array(array, "id", 2, index=index) == [array[0], array[2]]
+    assert filter_json_array(array, {"id": 2, "x": 1}, index=index) == [array[2]]
+    assert filter_json_array(array, "id", 5, index=index) == [array[1]]
+
+
+def test_index_over_other_array_or_field_is_ignored():
+    array = [{"id": 1, "n": 1}, {"id": 2, "n": 2}]
+    other = [{"id": 1}]
+
+    assert filter_json_array(array, "id", 1, index=make_index(other, "id")) == [array[0]]
+    assert filter_json_array(array, "id", 2, index=make_index(array, "n")) == [array[1]]
+    assert filter_json_array(array, {"id": {"$gt": 1}}, index=make_index(array, "id")) == [array[1]]
+
+
+def test_index_over_array_with_non_objects_is_not_used():
+    array = [{"id": 1}, 5]
+
+    with pytest.raises(JSONObjectError):
+        filter_json_array(array, "id", 1, index=make_index(array, "id"))
+
+
+def test_index_type_is_checked():
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        filter_json_array(ORDERS, "id", 1, index={"id": 1})
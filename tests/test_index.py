@@ -0,0 +1,176 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import gc
+import json
+
+import pytest
+
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONPathError
+from robust_json.file import JsonFileParser
+from robust_json.index import JsonArrayIndex
+from robust_json.object import JsonObjectParser
+
+USERS = [
+    {"id": 1, "name": "Ann", "role": "admin"},
+    {"id": 2, "name": "Bob", "role": "user"},
+    {"id": 3, "name": "Eve", "role": "user"},
+    "not an object",
+    {"name": "No id"},
+    {"id": [1], "name": "Unhashable"},
+]
+DOCUMENT = {"users": USERS, "count": 6}
+
+
+@pytest.fixture(params=["object", "file", "copy_on_write"])
+def parser(request, json_file):
+    if request.param == "object":
+        return JsonObjectParser(copy.deepcopy(DOCUMENT))
+    return JsonFileParser(json_file(DOCUMENT), copy_on_write=request.param == "copy_on_write")
+
+
+def scan(parser, field, value):
+    return [
+        item
+        for item in parser.active_json["users"]
+        if type(item) == dict and field in item and item[field] == value
+    ]
+
+
+def test_index_build_and_positions():
+    index = JsonArrayIndex("users", "role")
+    index.build(USERS)
+
+    assert index.valid
+    assert not index.objects_only
+    assert not index.complete
+    assert len(index) == 2
+    assert index.positions("user") == [1, 2]
+    assert index.positions("guest") == []
+    with pytest.raises(TypeError):
+        index.positions(["user"])
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        index.build({"a": 1})
+
+
+def test_lookup_uses_index(parser):
+    index = parser.create_index("users", "role")
+
+    assert parser.indexes == [index]
+    assert parser.lookup("users", "role", "user") == scan(parser, "role", "user")
+    assert parser.lookup("users", "id", [1]) == [USERS[5]]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda parser: parser.append("users", {"id": 4, "role": "user"}, True),
+        lambda parser: parser.update_value("users.[1]", "role", "admin"),
+        lambda parser: parser.update_value("users", 0, {"id": 1, "role": "user"}),
+        lambda parser: parser.delete("users", 0),
+        lambda parser: parser.delete("users.[2]", "role"),
+        lambda parser: parser.update_many([("users.[1]", "role", "guest"), ("users.[2]", "role", "guest")]),
+        lambda parser: parser.delete_many([("users", 1), ("users", 2)]),
+        lambda parser: parser.reverse_array("users"),
+        lambda parser: parser.append("users", {"role": "admin"}),
+    ],
+)
+def test_index_follows_parser_changes(parser, change):
+    parser.create_index("users", "role")
+
+    change(parser)
+
+    for role in ("admin", "user", "guest"):
+        assert parser.lookup("users", "role", role) == scan(parser, "role", role)
+
+
+def test_direct_change_removing_value_is_detected(parser):
+    parser.create_index("users", "id")
+
+    parser.active_json["users"][0]["id"] = 99
+
+    assert parser.lookup("users", "id", 1) == []
+    assert parser.lookup("users", "id", 99) == [parser.active_json["users"][0]]
+
+
+def test_rolled_back_batch_invalidates_index(parser):
+    index = parser.create_index("users", "role")
+
+    with pytest.raises(RuntimeError):
+        with parser.batch():
+            parser.delete("users", 0)
+            parser.update_value("users.[0]", "role", "admin")
+            raise RuntimeError
+
+    assert parser.lookup("users", "role", "admin") == [USERS[0]]
+    assert parser.lookup("users", "role", "user") == [USERS[1], USERS[2]]
+    assert index.valid
+
+
+def references(index: JsonArrayIndex, array: list) -> bool:
+    # Attributes may be stored in the instance itself or in its `__dict__`
+    return any(referrer is index or referrer is vars(index) for referrer in gc.get_referrers(array))
+
+
+def test_reset_releases_old_array(parser):
+    index = parser.create_index("users", "id")
+    parser.update_value("users.[0]", "id", 10)
+    assert parser.lookup("users", "id", 10) == [parser.active_json["users"][0]]
+    old = parser.active_json["users"]
+    assert references(index, old)
+
+    parser.reset(True)
+
+    assert not index.valid
+    assert not references(index, old)
+    assert parser.lookup("users", "id", 1) == [USERS[0]]
+    assert parser.lookup("users", "id", 10) == []
+
+
+def test_reloaded_file_releases_old_array(json_file):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path)
+    index = parser.create_index("users", "id")
+    old = parser.active_json["users"]
+    assert references(index, old)
+
+    with open(path, "w") as f:
+        json.dump({"users": [{"id": 7}]}, f)
+    parser.get_json_from_file()
+
+    assert not index.valid
+    assert not references(index, old)
+    assert parser.lookup("users", "id", 7) == [{"id": 7}]
+    assert parser.lookup("users", "id", 1) == []
+
+
+def test_drop_index(parser):
+    parser.create_index("users", "id")
+
+    parser.drop_index("users", "id")
+
+    assert parser.indexes == []
+    assert parser.lookup("users", "id", 2) == [USERS[1]]
+    with pytest.raises(ValueError):
+        parser.drop_index("users", "id")
+
+
+def test_create_index_errors(parser):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        parser.create_index("users", 1)
+    with pytest.raises(ValueError):
+        parser.create_index("users", "")
+    with pytest.raises(JSONPathError):
+        parser.create_index("members", "id")
+    with pytest.raises(TypeError):
+        parser.create_index("count", "id")
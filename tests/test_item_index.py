@@ -0,0 +1,130 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+import pytest
+
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.ext import get_item_index
+
+ARRAY = ["1", "2", "3", "4", "1", "5", "1"]
+
+
+class CountingItem:
+    """
+    Item that counts how many array items it has been compared with.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self.comparisons = 0
+
+    def __eq__(self, other):
+        self.comparisons += 1
+        return other == self.value
+
+    __hash__ = None
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({}, [0, 4, 6]),
+        ({"first_only": True}, 0),
+        ({"max_results": 2}, [0, 4]),
+        ({"max_results": 0}, None),
+        ({"start": 1}, [4, 6]),
+        ({"start": 1, "first_only": True}, 4),
+        ({"stop": 4}, 0),
+        ({"start": -3}, [4, 6]),
+        ({"start": 1, "stop": -1}, 4),
+        ({"start": 5, "stop": 2}, None),
+        ({"start": 100}, None),
+        ({"always_array": True, "first_only": True}, [0]),
+        ({"always_array": True, "start": 1, "stop": 4}, []),
+    ],
+)
+def test_search(kwargs, expected):
+    assert get_item_index("1", ARRAY, **kwargs) == expected
+
+
+def test_search_stops_at_max_results():
+    item = CountingItem(7)
+    array = [1, 7, 2, 7] + [0] * 1000
+
+    assert get_item_index(item, array, first_only=True) == 1
+    assert item.comparisons == 2
+
+    item.comparisons = 0
+    assert get_item_index(item, array, max_results=2) == [1, 3]
+    assert item.comparisons == 4
+
+
+def test_search_does_not_leave_range():
+    item = CountingItem(7)
+    array = [7] * 10
+
+    assert get_item_index(item, array, start=2, stop=5) == [2, 3, 4]
+    assert item.comparisons == 3
+
+
+def test_sorted_search_matches_linear_search():
+    rng = random.Random(0)
+    for _ in range(50):
+        array = sorted(rng.randrange(20) for _ in range(rng.randrange(1, 60)))
+        item = rng.randrange(-1, 21)
+        start = rng.randrange(-len(array), len(array) + 1)
+        stop = rng.choice([None, rng.randrange(-len(array), len(array) + 1)])
+        max_results = rng.choice([None, 0, 1, 3])
+        kwargs = dict(always_array=True, start=start, stop=stop, max_results=max_results)
+
+        assert get_item_index(item, array, assume_sorted=True, **kwargs) == get_item_index(
+            item, array, **kwargs
+        )
+
+
+def test_sorted_search_is_logarithmic():
+    # `bisect` compares array items with item using `<`, so count them through a wrapper
+    class Lt(int):
+        comparisons = 0
+
+        def __lt__(self, other):
+            Lt.comparisons += 1
+            return int(self) < other
+
+    array = [Lt(value) for value in range(1000)]
+    assert get_item_index(500, array, assume_sorted=True) == 500
+    assert Lt.comparisons < 30
+
+
+def test_sorted_search_with_incomparable_item():
+    with pytest.raises(TypeError):
+        get_item_index("a", [1, 2, 3], assume_sorted=True)
+
+
+@pytest.mark.parametrize(
+    "args, kwargs, error",
+    [
+        (("1", "abc"), {}, IncorrectFunctionParameterTypeError),
+        (("1", ARRAY), {"first_only": 1}, IncorrectFunctionParameterTypeError),
+        (("1", ARRAY), {"start": "1"}, IncorrectFunctionParameterTypeError),
+        (("1", ARRAY), {"stop": 1.0}, IncorrectFunctionParameterTypeError),
+        (("1", ARRAY), {"max_results": "1"}, IncorrectFunctionParameterTypeError),
+        (("1", ARRAY), {"assume_sorted": None}, IncorrectFunctionParameterTypeError),
+        (("1", ARRAY), {"max_results": -1}, ValueError),
+        (("1", []), {}, ValueError),
+    ],
+)
+def test_invalid_arguments(args, kwargs, error):
+    with pytest.raises(error):
+        get_item_index(*args, **kwargs)
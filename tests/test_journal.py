@@ -0,0 +1,262 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import multiprocessing
+import os
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import Journal
+from robust_json.autosave import AutosavePolicy
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONFileError
+from robust_json.file import JsonFileParser
+
+from conftest import read_json
+
+DOCUMENT = {"users": [{"id": 1}], "n": 0}
+
+
+def open_journaled(path: str, **kwargs) -> JsonFileParser:
+    return JsonFileParser(path, autosave=True, journal=True, **kwargs)
+
+
+def make_changes(parser: JsonFileParser) -> None:
+    parser.append("users", {"id": 2}, True)
+    parser.update_value("$", "n", 5)
+    parser.append("$", {"x": [1, 2]})
+    parser.delete("x", 0)
+    parser.append("users", {"role": "g"})
+
+
+def test_changes_are_journaled_instead_of_rewriting_file(json_file):
+    path = json_file(DOCUMENT)
+    parser = open_journaled(path)
+
+    make_changes(parser)
+
+    assert read_json(path) == DOCUMENT
+    assert os.path.exists(path + ".journal")
+    reopened = open_journaled(path)
+    assert reopened.active_json == parser.active_json
+    assert reopened.backup == parser.active_json
+    # Parsers without journal see only the source file
+    assert JsonFileParser(path).active_json == DOCUMENT
+
+
+def _change_and_crash(path: str) -> None:
+    make_changes(open_journaled(path))
+    os._exit(1)
+
+
+def _compact_and_crash(path: str) -> None:
+    parser = open_journaled(path)
+    make_changes(parser)
+    # Process dies after source file is rewritten, but before journal is removed
+    with mock.patch.object(Journal, "discard", side_effect=lambda: os._exit(1)):
+        parser.compact()
+
+
+def run_and_crash(target, path: str) -> None:
+    process = multiprocessing.get_context("spawn").Process(target=target, args=(path,))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 1
+
+
+def expected_document(path: str) -> dict:
+    parser = JsonFileParser(path)
+    make_changes(parser)
+    return parser.active_json
+
+
+def test_journal_survives_process_crash(json_file):
+    path = json_file(DOCUMENT)
+    expected = expected_document(path)
+
+    run_and_crash(_change_and_crash, path)
+
+    assert read_json(path) == DOCUMENT
+    assert open_journaled(path).active_json == expected
+
+
+def test_crash_during_compaction_does_not_replay_journal_twice(json_file):
+    path = json_file(DOCUMENT)
+    expected = expected_document(path)
+
+    run_and_crash(_compact_and_crash, path)
+
+    assert read_json(path) == expected
+    assert os.path.exists(path + ".journal")
+    # Journal header doesn't match rewritten file, so appends are not applied again
+    assert open_journaled(path).active_json == expected
+    assert not os.path.exists(path + ".journal")
+
+
+def test_truncated_last_operation_is_ignored(json_file):
+    path = json_file(DOCUMENT)
+    parser = open_journaled(path)
+    make_changes(parser)
+
+    with open(path + ".journal", "ab") as f:
+        f.write(b'["update", "$", "n", ')
+
+    assert open_journaled(path).active_json == parser.active_json
+
+
+def test_malformed_journal_raises(json_file):
+    path = json_file(DOCUMENT)
+    make_changes(open_journaled(path))
+
+    with open(path + ".journal", "ab") as f:
+        f.write(b"{bad\n[]\n")
+
+    with pytest.raises(JSONFileError):
+        open_journaled(path)
+
+
+def test_external_rewrite_makes_journal_stale(json_file):
+    path = json_file(DOCUMENT)
+    make_changes(open_journaled(path))
+
+    with open(path, "w") as f:
+        json.dump({"z": 1}, f)
+
+    assert open_journaled(path).active_json == {"z": 1}
+    assert not os.path.exists(path + ".journal")
+
+
+def test_reformatting_keeps_journal_valid(json_file):
+    path = json_file(DOCUMENT)
+    parser = open_journaled(path)
+    make_changes(parser)
+    expected = parser.active_json
+
+    parser.minify()
+    assert open_journaled(path).active_json == expected
+    parser.prettify()
+    assert open_journaled(path).active_json == expected
+
+
+def test_journal_is_compacted_after_threshold(json_file):
+    path = json_file({"z": 0})
+    parser = open_journaled(path, journal_threshold=2000)
+
+    for i in range(100):
+        parser.update_value("$", "z", i)
+
+    assert not os.path.exists(path + ".journal") or os.path.getsize(path + ".journal") < 2000
+    assert open_journaled(path).active_json == {"z": 99}
+    parser.compact()
+    assert not os.path.exists(path + ".journal")
+    assert read_json(path) == {"z": 99}
+
+
+def test_rolled_back_batch_is_not_journaled(json_file):
+    path = json_file({"z": 0})
+    parser = open_journaled(path)
+
+    with pytest.raises(KeyError):
+        with parser.batch():
+            parser.update_value("$", "z", -1)
+            raise KeyError
+    with parser.batch():
+        parser.update_value("$", "z", 7)
+        parser.update_value("$", "q", 1)
+
+    assert open_journaled(path).active_json == {"z": 7, "q": 1}
+
+
+def test_coalesced_changes_are_journaled_on_close(json_file):
+    path = json_file({"z": 0})
+
+    with open_journaled(path, autosave_policy=AutosavePolicy(max_operations=1000)) as parser:
+        for i in range(10):
+            parser.update_value("$", "z", i)
+
+    assert open_journaled(path).active_json == {"z": 9}
+
+
+def test_bulk_changes_and_reverse_are_journaled(json_file):
+    path = json_file({"a": [1, 2, 3], "b": {"x": 1, "y": 2}})
+    parser = open_journaled(path)
+
+    parser.update_many([("b", "x", 10), ("a", 0, 0)])
+    parser.delete_many([("b", "y")])
+    parser.reverse_array("a")
+
+    assert open_journaled(path).active_json == {"a": [3, 2, 0], "b": {"x": 10}}
+
+
+def test_reset_compacts_journal(json_file):
+    path = json_file({"n": 0, "arr": []})
+    parser = open_journaled(path)
+    parser.update_value("$", "n", 1)
+    parser.append("arr", 1, True)
+
+    parser.reset(True)
+
+    assert not os.path.exists(path + ".journal")
+    assert read_json(path) == {"n": 0, "arr": []}
+    parser.append("arr", 9, True)
+    assert open_journaled(path).active_json == {"n": 0, "arr": [9]}
+
+
+def test_reset_inside_batch(json_file):
+    path = json_file({"n": 0, "arr": []})
+    parser = open_journaled(path)
+    parser.update_value("$", "n", 7)
+
+    with pytest.raises(KeyError):
+        with parser.batch():
+            parser.reset(True)
+            parser.append("arr", 3, True)
+            raise KeyError
+    assert open_journaled(path).active_json == {"n": 7, "arr": []}
+
+    with parser.batch():
+        parser.reset(True)
+        parser.append("arr", 4, True)
+    assert parser.active_json == {"n": 0, "arr": [4]}
+    assert open_journaled(path).active_json == {"n": 0, "arr": [4]}
+
+
+def test_json_lines_journal(json_file):
+    path = json_file([{"a": 1}], "data.jsonl")
+    parser = open_journaled(path)
+
+    parser.append("$", {"a": 2}, True)
+    parser.update_value("[0]", "a", 9)
+
+    with open(path) as f:
+        assert f.read() == '{"a": 1}\n'
+    assert open_journaled(path).active_json == [{"a": 9}, {"a": 2}]
+
+
+def test_journal_parameters(json_file):
+    path = json_file(DOCUMENT)
+
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(path, autosave=True, journal=1)
+    with pytest.raises(ValueError, match="requires autosaving"):
+        JsonFileParser(path, journal=True)
+    with pytest.raises(ValueError):
+        JsonFileParser(path, autosave=True, journal=True, lazy=True)
+    with pytest.raises(ValueError):
+        JsonFileParser(path, autosave=True, journal=True, autosave_path=path)
+    with pytest.raises(ValueError):
+        JsonFileParser(path, autosave=True, journal=True, locking="lock")
+    with pytest.raises(ValueError):
+        JsonFileParser(path, autosave=True, journal=True, journal_threshold=0)
+    with pytest.raises(ValueError, match="requires journal"):
+        JsonFileParser(path, autosave=True, journal_threshold=1024)
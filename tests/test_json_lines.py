@@ -0,0 +1,176 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.errors import JSONFileError, JSONPathError
+from robust_json.file import JsonFileParser
+
+CONTENT = '{"id": 0}\n\n{"id": 1, "tags": ["a"]}\n{"id": 2}'
+
+
+def read_lines(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "log.jsonl"
+    # Blank line and no trailing newline
+    path.write_text(CONTENT)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "lazy, line_index, use_mmap",
+    [
+        (False, False, False),
+        (False, False, True),
+        (True, False, False),
+        (True, False, True),
+        (True, True, False),
+        (True, True, True),
+    ],
+)
+def test_appending_records_never_rewrites_file(log_file, lazy, line_index, use_mmap):
+    parser = JsonFileParser(
+        log_file, autosave=True, lazy=lazy, line_index=line_index, use_mmap=use_mmap
+    )
+
+    with mock.patch.object(service, "write_json_file") as write:
+        parser.append("$", {"id": 3}, True)
+        with parser.batch():
+            for i in range(4, 10):
+                parser.append("$", {"id": i}, True)
+
+    write.assert_not_called()
+    assert [record["id"] for record in read_lines(log_file)] == list(range(10))
+    assert parser.get_key_value("[-1].id") == 9
+    assert parser.get_key_value("[1].tags[0]") == "a"
+    assert parser.get_key_value("[3]") == {"id": 3}
+    assert parser.get_key_value("[-10].id") == 0
+    with pytest.raises(JSONPathError):
+        parser.get_key_value("[10]")
+    assert [record["id"] for record in parser.iter_array("$")] == list(range(10))
+    assert list(parser.iter_array("[1].tags")) == ["a"]
+    assert parser.lazy == lazy
+
+
+def test_other_changes_rewrite_file(log_file):
+    parser = JsonFileParser(log_file, autosave=True, lazy=True)
+    parser.append("$", {"id": 3}, True)
+
+    parser.update_value("[0]", "id", 100)
+
+    assert not parser.lazy
+    assert read_lines(log_file)[0] == {"id": 100}
+    assert len(read_lines(log_file)) == 4
+    assert parser.backup[0] == {"id": 0}
+    parser.append("$", {"id": 4}, True)
+    assert len(read_lines(log_file)) == 5
+
+
+def test_pending_records_in_lazy_mode_without_autosave(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"id": 0}\n')
+    parser = JsonFileParser(str(path), lazy=True)
+
+    parser.append("$", {"id": 1}, True)
+
+    assert parser.get_key_value("[1].id") == 1
+    assert len(read_lines(str(path))) == 1
+    assert parser.active_json == [{"id": 0}, {"id": 1}]
+    assert parser.backup == [{"id": 0}]
+    parser.save_to_file()
+    assert len(read_lines(str(path))) == 2
+
+
+def test_rolled_back_append_is_not_written(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"id": 0}\n{"id": 1}\n')
+    parser = JsonFileParser(str(path), lazy=True, autosave=True)
+
+    with pytest.raises(KeyError):
+        with parser.batch():
+            parser.append("$", {"id": 5}, True)
+            parser.active_json
+            raise KeyError
+
+    assert parser.lazy
+    assert len(read_lines(str(path))) == 2
+    assert parser.get_key_value("[-1].id") == 1
+
+
+def test_prettify_keeps_one_record_per_line(log_file):
+    JsonFileParser(log_file).prettify()
+
+    with open(log_file) as f:
+        assert f.read() == '{"id": 0}\n{"id": 1, "tags": ["a"]}\n{"id": 2}\n'
+
+
+def test_empty_file_is_empty_array(tmp_path):
+    path = tmp_path / "log.ndjson"
+    path.write_text("")
+    parser = JsonFileParser(str(path), autosave=True)
+
+    assert parser.active_json == []
+    assert path.read_text() == ""
+    parser.append("$", {"a": 1}, True)
+    assert path.read_text() == '{"a": 1}\n'
+
+
+def test_only_arrays_can_be_saved_as_json_lines(json_file, tmp_path):
+    parser = JsonFileParser(json_file({"a": 1}))
+
+    with pytest.raises(JSONFileError):
+        parser.save_to_file(str(tmp_path / "out.jsonl"), create_file=True)
+
+
+def test_malformed_record(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"id": 0}\n{bad\n')
+
+    with pytest.raises(JSONFileError):
+        JsonFileParser(str(path))
+
+
+def test_append_json_lines_returns_offsets(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"id": 0}')
+
+    offsets = service().append_json_lines(str(path), [{"id": 1}, {"id": 2}])
+
+    content = path.read_bytes()
+    assert content == b'{"id": 0}\n{"id": 1}\n{"id": 2}\n'
+    assert [content[offset:].split(b"\n")[0] for offset in offsets] == [b'{"id": 1}', b'{"id": 2}']
+
+
+def test_append_json_lines_serializes_before_writing(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"id": 0}\n')
+
+    with pytest.raises(TypeError):
+        service().append_json_lines(str(path), [{"id": 1}, {"id": {2}}])
+
+    assert path.read_text() == '{"id": 0}\n'
+
+
+def test_line_index_requires_lazy_json_lines_file(log_file, json_file):
+    with pytest.raises(ValueError, match="line_index"):
+        JsonFileParser(log_file, line_index=True)
+    with pytest.raises(ValueError, match="line_index"):
+        JsonFileParser(json_file([1, 2]), lazy=True, line_index=True)
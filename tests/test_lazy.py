@@ -0,0 +1,134 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import tracemalloc
+
+import pytest
+
+from robust_json.__path_utils import tokenize_simple_path
+from robust_json.__stream_utils import JsonStreamReader
+from robust_json.errors import JSONFileError, JSONPathError
+from robust_json.file import JsonFileParser
+
+DOCUMENT = {
+    "a": 1,
+    "s": 'h"é\\llo',
+    "e": {},
+    "ea": [],
+    "n": None,
+    "t": True,
+    "f": -1.5e3,
+    "events": [{"id": i, "tags": ["x\\", "y]"], "m": {"k": "}{"}} for i in range(200)],
+    'k"q': 5,
+    "deep": {"x": [[1, [2, 3]], {"y": "z"}]},
+}
+PATHS = [
+    "a", "s", "e", "ea", "n", "t", "f", "$", "missing", "e.x", "ea[0]", "a[0]",
+    "events[5]", "events.[199].tags[1]", "events[-1].id", "events[-200].id",
+    "events[-201]", "events[200]", "events.id", "deep.x[0][1][-1]", "deep.x[1].y",
+    "deep.x[1][0]", "s[0]", "s[-1]", "'k\"q'",
+]
+
+
+@pytest.fixture(params=[None, 2], ids=["compact", "indented"])
+def lazy_file(request, tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(DOCUMENT, indent=request.param, ensure_ascii=bool(request.param)))
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 65536])
+def test_stream_reader_matches_loaded_document(lazy_file, chunk_size):
+    loaded = JsonFileParser(lazy_file)
+
+    for path in PATHS:
+        try:
+            expected = (True, loaded.get_key_value(path))
+        except JSONPathError:
+            expected = (False, None)
+        with open(lazy_file, "rb") as f:
+            assert JsonStreamReader(f, None, chunk_size).find(tokenize_simple_path(path)) == expected, path
+
+
+def test_lazy_parser_reads_without_loading(lazy_file):
+    parser = JsonFileParser(lazy_file, lazy=True)
+
+    assert parser.lazy
+    assert [event["id"] for event in parser.iter_array("events")] == list(range(200))
+    assert list(parser.iter_array("ea")) == []
+    assert parser.get_key_value("events[3].m.k") == "}{"
+    with pytest.raises(JSONPathError):
+        parser.get_key_value("nope")
+    with pytest.raises(TypeError):
+        parser.iter_array("a")
+    assert parser.lazy
+
+
+def test_complex_path_loads_document(lazy_file):
+    parser = JsonFileParser(lazy_file, lazy=True)
+
+    assert parser.get_key_value("events[?id>197].id") == [198, 199]
+    assert not parser.lazy
+    assert parser.backup == DOCUMENT
+
+
+def test_change_loads_document(lazy_file):
+    parser = JsonFileParser(lazy_file, lazy=True)
+
+    parser.update_value("$", "a", 2)
+
+    assert not parser.lazy
+    assert parser.backup["a"] == 1
+    assert parser.active_json["a"] == 2
+    assert len(list(parser.iter_array("events"))) == 200
+
+
+def test_malformed_file_raises_on_access(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"a": [1, 2')
+    parser = JsonFileParser(str(path), lazy=True)
+
+    with pytest.raises(JSONFileError):
+        list(parser.iter_array("a"))
+    with pytest.raises(JSONFileError):
+        parser.get_key_value("b")
+
+
+def test_empty_file_is_loaded_immediately(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("")
+
+    parser = JsonFileParser(str(path), lazy=True)
+
+    assert not parser.lazy
+    assert parser.active_json == {}
+
+
+def test_memory_usage_does_not_depend_on_file_size(tmp_path):
+    path = tmp_path / "big.json"
+    with open(path, "w") as f:
+        f.write('{"meta": 1, "events": [')
+        f.write(",".join(json.dumps({"id": i, "payload": "x" * 200}) for i in range(20000)))
+        f.write('], "tail": "end"}')
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    try:
+        parser = JsonFileParser(str(path), lazy=True)
+        assert sum(1 for _ in parser.iter_array("events")) == 20000
+        assert parser.get_key_value("tail") == "end"
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < size / 4
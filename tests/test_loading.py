@@ -0,0 +1,109 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import builtins
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.errors import JSONFileError
+from robust_json.file import JsonFileParser
+
+from conftest import read_json
+
+DOCUMENT = {"users": [{"name": "Ann", "tags": ["a"]}], "count": 1}
+FORMATS = [".json", ".txt"]
+
+
+def test_parser_reads_and_parses_file_once(json_file):
+    path = json_file(DOCUMENT)
+    real_open = builtins.open
+
+    with mock.patch("builtins.open", side_effect=real_open) as opened, mock.patch(
+        "robust_json.__internal_utils.service.parse_file",
+        autospec=True,
+        side_effect=service.parse_file,
+    ) as parse:
+        parser = JsonFileParser(path)
+
+    assert parse.call_count == 1
+    assert [call.args[0] for call in opened.call_args_list] == [path]
+    assert parser.active_json == DOCUMENT
+
+
+def test_get_json_from_file_returns_active_object(json_file):
+    parser = JsonFileParser(json_file(DOCUMENT))
+
+    json = parser.get_json_from_file()
+
+    assert json is parser.active_json
+    assert json == DOCUMENT
+
+
+def test_backup_is_independent_copy(json_file):
+    parser = JsonFileParser(json_file(DOCUMENT))
+
+    parser.active_json["users"][0]["tags"].append("b")
+
+    assert parser.backup == DOCUMENT
+    assert parser.reset() == DOCUMENT
+
+
+def test_empty_file_is_initialised_with_empty_object(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text("")
+
+    parser = JsonFileParser(str(path))
+
+    assert parser.active_json == {}
+    assert read_json(str(path)) == {}
+
+
+def test_invalid_file_raises_json_file_error(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text("{not json")
+
+    with pytest.raises(JSONFileError):
+        JsonFileParser(str(path))
+
+
+def test_check_file_keeps_boolean_contract(tmp_path, json_file):
+    broken = tmp_path / "broken.json"
+    broken.write_text("[1, 2")
+
+    assert service().check_file(json_file(DOCUMENT), FORMATS)
+    assert not service().check_file(str(broken), FORMATS)
+
+
+def test_load_file_validates_extension_and_existence(tmp_path):
+    with pytest.raises(JSONFileError):
+        service().load_file(str(tmp_path / "data.yaml"), FORMATS)
+    with pytest.raises(FileNotFoundError):
+        service().load_file(str(tmp_path / "missing.json"), FORMATS)
+
+
+def test_load_file_accepts_utf8_and_utf16(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"name": "Ünïcode"}', encoding="utf-16")
+
+    assert service().load_file(str(path), FORMATS) == {"name": "Ünïcode"}
+
+
+def test_copy_json_copies_containers_and_shares_scalars():
+    copy = service().copy_json(DOCUMENT)
+
+    assert copy == DOCUMENT
+    assert copy is not DOCUMENT
+    assert copy["users"] is not DOCUMENT["users"]
+    assert copy["users"][0]["tags"] is not DOCUMENT["users"][0]["tags"]
+    assert copy["users"][0]["name"] is DOCUMENT["users"][0]["name"]
@@ -0,0 +1,98 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.codec import StdlibCodec, available_codecs
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+
+from conftest import read_json
+
+DOCUMENT = {"a": 2**70, "b": [1, 2, {"c": "é"}], "events": [{"id": i} for i in range(1000)]}
+RECORDS = [{"id": i, "name": f"ü{i}"} for i in range(50)]
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_mapped_file_is_parsed_like_regular_one(json_file, codec):
+    path = json_file(DOCUMENT)
+
+    parser = JsonFileParser(path, use_mmap=True, codec=codec)
+
+    assert parser.active_json == DOCUMENT
+    parser.prettify()
+    assert read_json(path) == DOCUMENT
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_lazy_mode_scans_mapped_file(json_file, codec):
+    parser = JsonFileParser(json_file(DOCUMENT), use_mmap=True, lazy=True, codec=codec)
+
+    assert parser.get_key_value("b[2].c") == "é"
+    assert parser.get_key_value("a") == 2**70
+    assert [event["id"] for event in parser.iter_array("events")] == list(range(1000))
+    iterator = parser.iter_array("events")
+    next(iterator)
+    iterator.close()
+    assert parser.lazy
+
+
+def test_buffer_codecs_parse_mapped_pages_without_copying(json_file):
+    class BufferCodec(StdlibCodec):
+        accepts_buffers = True
+        received = []
+
+        def loads(self, data):
+            BufferCodec.received.append(type(data))
+            return super().loads(data)
+
+    parser = JsonFileParser(json_file(DOCUMENT), use_mmap=True, codec=BufferCodec())
+
+    assert BufferCodec.received == [memoryview]
+    assert parser.active_json == DOCUMENT
+
+
+@pytest.mark.parametrize("atomic", [False, True])
+def test_mapped_file_can_be_written_after_loading(json_file, atomic):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, use_mmap=True, autosave=True, atomic_write=atomic)
+
+    parser.update_value("$", "a", 1)
+
+    assert read_json(path)["a"] == 1
+
+
+def test_mapped_json_lines_file(json_file):
+    parser = JsonFileParser(json_file(RECORDS, "data.jsonl"), use_mmap=True)
+
+    assert parser.active_json == RECORDS
+
+
+def test_check_file_with_mmap(tmp_path, json_file):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{bad")
+
+    assert service().check_file(json_file(DOCUMENT), [".json"], use_mmap=True)
+    assert not service().check_file(str(broken), [".json"], use_mmap=True)
+
+
+def test_empty_file_is_not_mapped(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("")
+
+    assert JsonFileParser(str(path), use_mmap=True).active_json == {}
+
+
+def test_use_mmap_must_be_bool(json_file):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(json_file(DOCUMENT), use_mmap=1)
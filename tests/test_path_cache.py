@@ -0,0 +1,124 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from robust_json.cache import JsonPathCache, path_cache
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.object import JsonObjectParser
+
+
+def test_repeated_lookup_is_a_hit():
+    cache = JsonPathCache()
+    first = cache.get("a.b")
+    assert cache.get("a.b") is first
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1, "max_size": 512}
+
+
+def test_least_recently_used_path_is_evicted():
+    cache = JsonPathCache(max_size=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_shrinking_max_size_evicts():
+    cache = JsonPathCache(max_size=3)
+    for path in ("a", "b", "c"):
+        cache.get(path)
+    cache.max_size = 1
+    assert len(cache) == 1 and "c" in cache
+    assert cache.evictions == 2
+
+
+def test_zero_size_disables_caching():
+    cache = JsonPathCache(max_size=0)
+    cache.get("a")
+    cache.get("a")
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
+def test_path_sets_are_cached_separately():
+    cache = JsonPathCache(max_size=4)
+    cache.get("a")
+    trie = cache.get_many(("a", "b"))
+
+    assert cache.get_many(("a", "b")) is trie
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 2, "max_size": 4}
+
+    # Only one set fits, and new sets never push out single expressions
+    cache.get_many(("c",))
+    assert cache.get_many(("a", "b")) is not trie
+    assert len(cache) == 3 and cache.evictions == 0
+
+
+def test_invalid_path_is_not_cached():
+    cache = JsonPathCache()
+    with pytest.raises(Exception):
+        cache.get("a[?")
+    assert "a[?" not in cache
+
+
+def test_clear_resets_statistics():
+    cache = JsonPathCache()
+    cache.get("a")
+    cache.get("a")
+    cache.clear()
+    assert cache.stats()["hits"] == 0 and len(cache) == 0
+
+
+@pytest.mark.parametrize("max_size", ["1", 1.5, None])
+def test_max_size_type_is_checked(max_size):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonPathCache(max_size)
+
+
+def test_negative_max_size_is_rejected():
+    with pytest.raises(ValueError):
+        JsonPathCache(-1)
+
+
+def test_parsers_share_process_wide_cache():
+    path = "shared_between_parsers.key"
+    JsonObjectParser({"shared_between_parsers": {"key": 1}}).get_key_value(path)
+    assert path in path_cache
+    hits = path_cache.hits
+    JsonObjectParser({"shared_between_parsers": {"key": 2}}).get_key_value(path)
+    assert path_cache.hits > hits
+
+
+def test_concurrent_lookups_compile_consistent_paths():
+    cache = JsonPathCache(max_size=8)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(200):
+                path = f"f{(i + offset) % 16}.x"
+                assert cache.get(path).path == path
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache) <= 8
@@ -0,0 +1,67 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.__path_utils import CompiledJsonPath
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONPathError
+from robust_json.object import JsonObjectParser
+
+DOCUMENT = {"users": [{"name": "Ann", "tags": ["a"]}, {"name": "Bob", "tags": []}], "count": 2}
+
+
+def test_resolve_returns_all_matches_in_document_order():
+    assert service().resolve_json_path("users[*].name", DOCUMENT) == ["Ann", "Bob"]
+
+
+def test_resolve_returns_empty_list_for_missing_path():
+    assert service().resolve_json_path("users[5].name", DOCUMENT) == []
+
+
+def test_check_json_path_agrees_with_resolve():
+    assert service().check_json_path("count", DOCUMENT)
+    assert not service().check_json_path("missing", DOCUMENT)
+
+
+def test_empty_path_is_rejected():
+    with pytest.raises(JSONPathError):
+        service().resolve_json_path("", DOCUMENT)
+
+
+def test_parameter_types_are_checked():
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        service().resolve_json_path(1, DOCUMENT)
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        service().resolve_json_path("a", "not json")
+
+
+@pytest.mark.parametrize("method, args", [
+    ("get_key_value", ("users.[0].name",)),
+    ("update_value", ("users.[0]", "name", "Eve")),
+    ("delete", ("users.[0]", "tags")),
+    ("append", ("users.[1].tags", "x")),
+])
+def test_each_method_traverses_document_once(method, args):
+    op = JsonObjectParser(DOCUMENT)
+    with mock.patch.object(CompiledJsonPath, "find", autospec=True, side_effect=CompiledJsonPath.find) as find:
+        getattr(op, method)(*args)
+    assert find.call_count == 1
+
+
+def test_invalid_path_raises_without_side_effects():
+    op = JsonObjectParser(DOCUMENT)
+    with pytest.raises(JSONPathError):
+        op.update_value("users.[9]", "name", "Eve")
+    assert op.active_json == DOCUMENT
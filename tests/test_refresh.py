@@ -0,0 +1,181 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.autosave import AutosavePolicy
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONFileError
+from robust_json.file import JsonFileParser
+
+from conftest import read_json
+
+
+def write(path: str, content) -> None:
+    with open(path, "w") as f:
+        json.dump(content, f)
+
+
+def test_unchanged_file_is_not_read(json_file):
+    parser = JsonFileParser(json_file({"v": 1}))
+
+    with mock.patch.object(service, "load_file", side_effect=AssertionError), mock.patch.object(
+        service, "parse_file", side_effect=AssertionError
+    ):
+        for _ in range(100):
+            assert parser.refresh() is False
+
+
+def test_changed_file_is_reloaded(json_file):
+    path = json_file({"v": 1})
+    parser = JsonFileParser(path)
+
+    write(path, {"v": 2})
+
+    assert parser.refresh() is True
+    assert parser.active_json == {"v": 2}
+    assert parser.backup == {"v": 1}
+
+
+def test_touched_file_is_not_reloaded_with_hash(json_file):
+    path = json_file({"v": 1})
+    parser = JsonFileParser(path)
+    assert parser.refresh(True) is False
+
+    os.utime(path, ns=(1, 1))
+
+    with mock.patch.object(service, "parse_file", side_effect=AssertionError):
+        assert parser.refresh(True) is False
+        # File state is remembered after content check
+        assert parser.refresh() is False
+
+
+def test_hash_detects_change_with_same_size_and_mtime(json_file):
+    path = json_file({"v": 2})
+    parser = JsonFileParser(path)
+    # The first check records hash of the loaded content
+    assert parser.refresh(True) is False
+    info = os.stat(path)
+
+    write(path, {"v": 3})
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns))
+
+    assert parser.refresh() is False
+    assert parser.refresh(True) is True
+    assert parser.active_json == {"v": 3}
+
+
+def test_metadata_change_before_first_hash_check_reloads(json_file):
+    path = json_file({"v": 1})
+    parser = JsonFileParser(path)
+
+    os.utime(path, ns=(1, 1))
+
+    assert parser.refresh(True) is True
+    assert parser.refresh(True) is False
+
+
+@pytest.mark.parametrize("atomic", [False, True])
+def test_own_saves_do_not_trigger_reload(json_file, atomic):
+    parser = JsonFileParser(json_file({"v": 1}), atomic_write=atomic)
+
+    parser.update_value("$", "v", 4)
+    parser.save_to_file()
+
+    assert parser.refresh() is False
+    assert parser.active_json == {"v": 4}
+
+
+def test_pending_changes_are_reapplied_with_locking(json_file):
+    path = json_file({"a": 1})
+    policy = AutosavePolicy(max_operations=100)
+    parser = JsonFileParser(path, autosave=True, locking="lock", autosave_policy=policy)
+    parser.update_value("$", "b", 2)
+
+    write(path, {"a": 5})
+
+    assert parser.refresh() is True
+    assert parser.active_json == {"a": 5, "b": 2}
+    parser.close()
+    assert read_json(path) == {"a": 5, "b": 2}
+
+
+def test_pending_changes_that_cannot_be_reapplied_are_kept(json_file):
+    path = json_file({"a": {"x": 1}})
+    policy = AutosavePolicy(max_operations=100)
+    parser = JsonFileParser(path, autosave=True, locking="lock", autosave_policy=policy)
+    parser.update_value("$", "n", 5)
+    parser.update_value("a", "x", 2)
+
+    write(path, {"b": 1})
+
+    with pytest.raises(JSONFileError, match="Path `a` is not valid"):
+        parser.refresh()
+    assert parser.active_json == {"a": {"x": 2}, "n": 5}
+    with pytest.raises(JSONFileError):
+        parser.flush()
+    assert read_json(path) == {"b": 1}
+
+    write(path, {"a": {"x": 1}, "b": 1})
+    assert parser.refresh() is True
+    assert parser.active_json == {"a": {"x": 2}, "b": 1, "n": 5}
+    parser.close()
+    assert read_json(path) == {"a": {"x": 2}, "b": 1, "n": 5}
+
+
+def test_lazy_parser_stays_lazy(json_file):
+    path = json_file([{"id": 0}], "data.jsonl")
+    parser = JsonFileParser(path, lazy=True, line_index=True)
+    assert parser.get_key_value("[0].id") == 0
+
+    with open(path, "w") as f:
+        f.write('{"id": 10}\n{"id": 11}\n')
+
+    parser.refresh()
+    assert parser.lazy
+    assert parser.get_key_value("[1].id") == 11
+
+
+def test_watcher_reloads_changed_file(json_file):
+    path = json_file({"v": 1})
+    parser = JsonFileParser(path)
+    reloaded = threading.Event()
+    values = []
+
+    def on_reload(reloaded_parser):
+        values.append(reloaded_parser.active_json["v"])
+        reloaded.set()
+
+    watcher = parser.watch(10, callback=on_reload)
+    write(path, {"v": 9})
+
+    assert reloaded.wait(5)
+    assert values == [9]
+    assert parser.get_key_value("v") == 9
+    parser.close()
+    assert not watcher.running
+
+
+def test_refresh_and_watch_parameters(json_file):
+    parser = JsonFileParser(json_file({}))
+
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        parser.refresh(1)
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        parser.watch("10")
+    with pytest.raises(ValueError):
+        parser.watch(0)
@@ -0,0 +1,136 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from conftest import read_json
+from robust_json.errors import IncorrectFunctionParameterTypeError, JSONPathError
+from robust_json.ext import ReversedView, reverse_array
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+
+def test_copy_by_default():
+    array = [1, 2, 3]
+    result = reverse_array(array)
+
+    assert result == [3, 2, 1]
+    assert result is not array
+    assert array == [1, 2, 3]
+
+
+def test_in_place():
+    array = [1, 2, 3]
+
+    assert reverse_array(array, in_place=True) is array
+    assert array == [3, 2, 1]
+
+
+def test_lazy_view_does_not_copy():
+    array = ["a", "b", "c", "d"]
+    view = reverse_array(array, lazy=True)
+
+    assert type(view) == ReversedView
+    assert array == ["a", "b", "c", "d"]
+    # Changes of items are visible through the view
+    array[0] = "z"
+    assert view[-1] == "z"
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 7])
+def test_view_matches_reversed_list(size):
+    array = list(range(size))
+    expected = array[::-1]
+    view = ReversedView(array)
+
+    assert len(view) == len(expected)
+    assert list(view) == expected
+    assert list(reversed(view)) == array
+    assert view.to_list() == expected
+    assert view == expected
+    assert view == ReversedView(list(array))
+    assert [view[i] for i in range(-size, size)] == expected + expected
+    assert all(value in view for value in array)
+    assert -1 not in view
+
+
+@pytest.mark.parametrize(
+    "key",
+    [slice(None), slice(1, 4), slice(None, None, 2), slice(-3, None), slice(5, 1, -1), slice(10, 20), slice(4, 2)],
+)
+def test_view_slices(key):
+    array = list(range(8))
+    expected = array[::-1][key]
+    view = ReversedView(array)[key]
+
+    assert type(view) == ReversedView
+    assert list(view) == expected
+    assert view.to_list() == expected
+    assert len(view) == len(expected)
+
+
+def test_view_errors():
+    view = ReversedView([1, 2])
+
+    with pytest.raises(IndexError):
+        view[2]
+    with pytest.raises(IndexError):
+        view[-3]
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        ReversedView((1, 2))
+    assert (view == (2, 1)) is False
+
+
+@pytest.mark.parametrize(
+    "args, kwargs, error",
+    [
+        (("abc",), {}, IncorrectFunctionParameterTypeError),
+        (([1],), {"in_place": 1}, IncorrectFunctionParameterTypeError),
+        (([1],), {"lazy": "yes"}, IncorrectFunctionParameterTypeError),
+        (([1],), {"in_place": True, "lazy": True}, ValueError),
+    ],
+)
+def test_invalid_arguments(args, kwargs, error):
+    with pytest.raises(error):
+        reverse_array(*args, **kwargs)
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_parser_reverses_in_place(copy_on_write):
+    parser = JsonObjectParser({"a": {"b": [1, 2, 3]}, "c": [4]}, copy_on_write=copy_on_write)
+
+    assert parser.reverse_array("a.b") == {"a": {"b": [3, 2, 1]}, "c": [4]}
+    assert parser.backup == {"a": {"b": [1, 2, 3]}, "c": [4]}
+    if copy_on_write:
+        # Untouched branches are still shared with backup
+        assert parser.active_json["c"] is parser.backup["c"]
+
+
+def test_parser_errors():
+    parser = JsonObjectParser({"a": {"b": 1}})
+
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        parser.reverse_array(1)
+    with pytest.raises(JSONPathError):
+        parser.reverse_array("x")
+    with pytest.raises(TypeError):
+        parser.reverse_array("a")
+
+
+def test_file_parser_saves_reversed_array(json_file):
+    path = json_file({"a": [1, 2, 3]})
+    parser = JsonFileParser(path, autosave=True)
+
+    parser.reverse_array("a")
+
+    assert read_json(path) == {"a": [3, 2, 1]}
+    assert parser.backup == {"a": [1, 2, 3]}
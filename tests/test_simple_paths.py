@@ -0,0 +1,129 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import jsonpath_ng.ext as jsonpath
+import pytest
+
+from robust_json.__path_utils import CompiledJsonPath, JsonPathTrie, tokenize_simple_path
+
+DOCUMENT = {
+    "config": {"db": {"host": "localhost", "port": 5432}, "name-with-dash": 1},
+    "items": [{"id": 1}, {"id": 2}, {"id": 3}],
+    "text": "abc",
+    "matrix": [[1, 2], [3, 4]],
+    "0": "string key",
+}
+
+
+@pytest.mark.parametrize(
+    "path, steps",
+    [
+        ("$", ()),
+        ("$.config", ("config",)),
+        ("config.db.host", ("config", "db", "host")),
+        ("$.items[1].id", ("items", 1, "id")),
+        ("items.[0]", ("items", 0)),
+        ("$.items[-1]", ("items", -1)),
+        ("$['config'][\"db\"]", None),
+        ("$.'config'.\"db\"", ("config", "db")),
+        ("matrix[1][0]", ("matrix", 1, 0)),
+        ("config.name-with-dash", ("config", "name-with-dash")),
+    ],
+)
+def test_tokenize_simple_paths(path, steps):
+    assert tokenize_simple_path(path) == steps
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "items[*]",
+        "items[0:2]",
+        "$..id",
+        "items[?(@.id > 1)]",
+        "config.",
+        "$config",
+        "'*'",
+        "items.where",
+        "config.db.true",
+        "items[0,1]",
+    ],
+)
+def test_tokenize_rejects_complex_paths(path):
+    assert tokenize_simple_path(path) is None
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "$",
+        "config",
+        "config.db.port",
+        "$.items[0].id",
+        "$.items[-1].id",
+        "items[10]",
+        "items.[2]",
+        "config.missing",
+        "config[0]",
+        "text[1]",
+        "matrix[1][1]",
+        "config.name-with-dash",
+        "items[*].id",
+        "$..port",
+        "items[?(@.id > 1)].id",
+    ],
+)
+def test_compiled_path_matches_jsonpath_ng(path):
+    expected = [match.value for match in jsonpath.parse(path).find(DOCUMENT)]
+    assert CompiledJsonPath(path).find(DOCUMENT) == expected
+
+
+def test_simple_path_does_not_parse_expression_until_needed():
+    path = CompiledJsonPath("config.db.host")
+
+    assert path.is_simple
+    assert path.find(DOCUMENT) == ["localhost"]
+    assert [match.value for match in path.expression.find(DOCUMENT)] == ["localhost"]
+
+
+def test_complex_path_is_not_simple():
+    path = CompiledJsonPath("items[*].id")
+
+    assert not path.is_simple
+    assert path.find(DOCUMENT) == [1, 2, 3]
+
+
+def test_trie_resolves_shared_prefixes_and_complex_paths():
+    paths = ["config.db.host", "config.db.port", "items[0].id", "items[*].id", "config.missing"]
+    trie = JsonPathTrie([CompiledJsonPath(path) for path in paths])
+
+    assert trie.find(DOCUMENT) == {
+        "config.db.host": ["localhost"],
+        "config.db.port": [5432],
+        "items[0].id": [1],
+        "items[*].id": [1, 2, 3],
+        "config.missing": [],
+    }
+
+
+def test_deep_simple_path_matches_jsonpath_ng():
+    document = {}
+    node = document
+    for _ in range(30):
+        node["level"] = {"items": [0, 1, {}]}
+        node = node["level"]["items"][2]
+    node["leaf"] = 42
+    path = "$" + ".level.items[2]" * 30 + ".leaf"
+
+    compiled = CompiledJsonPath(path)
+    assert compiled.is_simple
+    assert compiled.find(document) == [match.value for match in jsonpath.parse(path).find(document)] == [42]
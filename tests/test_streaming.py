@@ -0,0 +1,106 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import service
+from robust_json.codec import StdlibCodec
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+DOCUMENT = {"users": [{"id": i, "name": f"user {i}", "tags": ["a", "ü"]} for i in range(200)]}
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+@pytest.mark.parametrize("buffer_size", [1, 64, 65536])
+def test_streamed_output_matches_dumps(tmp_path, indent, buffer_size):
+    path = str(tmp_path / "out.json")
+
+    service().write_json_file(path, DOCUMENT, indent, StdlibCodec(), True, buffer_size)
+
+    with open(path) as f:
+        assert f.read() == json.dumps(DOCUMENT, indent=indent)
+
+
+def test_streaming_never_builds_whole_document(json_file):
+    path = json_file(DOCUMENT)
+    parser = JsonFileParser(path, codec="json", streaming=True, write_buffer_size=128)
+    parser.update_value("$", "count", 200)
+
+    with mock.patch.object(StdlibCodec, "dumps", side_effect=AssertionError("dumps called")):
+        parser.save_to_file()
+
+    with open(path) as f:
+        assert f.read() == json.dumps(dict(DOCUMENT, count=200), indent=4)
+
+
+def test_object_parser_streams_to_new_file(tmp_path):
+    path = str(tmp_path / "out.json")
+
+    JsonObjectParser(DOCUMENT, streaming=True).save_to_file(path, prettify=False, create_file=True)
+
+    with open(path) as f:
+        assert json.load(f) == DOCUMENT
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("atomic", [False, True])
+def test_serialization_error_leaves_target_untouched(tmp_path, streaming, atomic):
+    path = tmp_path / "data.json"
+    path.write_text('{"a": 1}')
+    parser = JsonObjectParser({"x": {1, 2}}, streaming=streaming, atomic_write=atomic)
+
+    with pytest.raises(TypeError):
+        parser.save_to_file(str(path))
+
+    assert path.read_text() == '{"a": 1}'
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_in_place_write_keeps_inode(tmp_path, streaming):
+    path = tmp_path / "data.json"
+    path.write_text('{"a": 1}')
+    inode = os.stat(path).st_ino
+
+    JsonObjectParser({"x": [1, 2]}, streaming=streaming).save_to_file(str(path))
+
+    assert os.stat(path).st_ino == inode
+    assert json.loads(path.read_text()) == {"x": [1, 2]}
+
+
+def test_streamed_write_to_existing_file_with_create_file_fails(json_file):
+    path = json_file({"a": 1})
+
+    with pytest.raises(FileExistsError):
+        service().write_json_file(path, DOCUMENT, None, None, True, 64)
+
+    with open(path) as f:
+        assert json.load(f) == {"a": 1}
+
+
+def test_write_buffer_size_validation(json_file):
+    path = json_file({})
+
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(path, streaming=True, write_buffer_size="64")
+    with pytest.raises(ValueError):
+        JsonFileParser(path, streaming=True, write_buffer_size=0)
+    with pytest.raises(ValueError, match="requires streaming"):
+        JsonFileParser(path, write_buffer_size=64)
+    with pytest.raises(ValueError, match="requires streaming"):
+        JsonObjectParser({}, write_buffer_size=64)
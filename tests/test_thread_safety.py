@@ -0,0 +1,226 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#        http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from robust_json.__internal_utils import FileLock, ReadWriteLock, service
+from robust_json.autosave import AutosavePolicy
+from robust_json.errors import IncorrectFunctionParameterTypeError
+from robust_json.file import JsonFileParser
+from robust_json.object import JsonObjectParser
+
+from conftest import read_json
+
+DOCUMENT = {"a": 0, "b": 0, "users": [{"id": 1}, {"id": 2}]}
+
+
+def test_readers_run_in_parallel():
+    lock = ReadWriteLock()
+    inside = 0
+    peak = 0
+    counter_lock = threading.Lock()
+
+    def read():
+        nonlocal inside, peak
+        with lock.reader:
+            with counter_lock:
+                inside += 1
+                peak = max(peak, inside)
+            time.sleep(0.05)
+            with counter_lock:
+                inside -= 1
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak > 1
+
+
+def test_writer_excludes_readers():
+    lock = ReadWriteLock()
+    events = []
+
+    def read():
+        with lock.reader:
+            events.append("read")
+
+    with lock:
+        thread = threading.Thread(target=read)
+        thread.start()
+        time.sleep(0.05)
+        events.append("write done")
+    thread.join()
+
+    assert events == ["write done", "read"]
+
+
+def test_lock_is_reentrant_and_cannot_be_upgraded():
+    lock = ReadWriteLock()
+
+    with lock:
+        with lock:
+            with lock.reader:
+                pass
+    with lock.reader:
+        with lock.reader:
+            with pytest.raises(RuntimeError):
+                lock.acquire()
+
+
+def make_parsers(json_file, **kwargs):
+    return [
+        JsonFileParser(json_file(DOCUMENT), thread_safe=True, **kwargs),
+        JsonObjectParser(
+            {"a": 0, "b": 0, "users": [{"id": 1}, {"id": 2}]}, thread_safe=True, **kwargs
+        ),
+    ]
+
+
+READERS = {
+    "get_key_value": lambda parser: parser.get_key_value("a"),
+    "get_key_values": lambda parser: parser.get_key_values(["a", "b"])["a"],
+    "lookup": lambda parser: len(parser.lookup("users", "id", 1)) - 1,
+    "iter_array": lambda parser: len(list(parser.iter_array("users"))) - 2,
+}
+
+
+@pytest.mark.parametrize("reader", READERS)
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_readers_wait_for_batch(json_file, reader, copy_on_write):
+    for parser in make_parsers(json_file, copy_on_write=copy_on_write):
+        if not hasattr(parser, reader):
+            continue
+        changed = threading.Event()
+
+        def write():
+            with pytest.raises(KeyError):
+                with parser.batch():
+                    parser.update_value("$", "a", 1)
+                    parser.append("users", {"id": 1}, True)
+                    changed.set()
+                    time.sleep(0.2)
+                    raise KeyError
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        changed.wait()
+        # Reader must not see changes that are rolled back
+        assert READERS[reader](parser) == 0
+        thread.join()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_readers_never_see_partial_batches(json_file, lazy):
+    parser = JsonFileParser(json_file(DOCUMENT), thread_safe=True, lazy=lazy, copy_on_write=True)
+    stop = threading.Event()
+    torn = []
+
+    def write():
+        for i in range(300):
+            with parser.batch():
+                parser.update_value("$", "a", i)
+                parser.update_value("$", "b", i)
+
+    def read():
+        while not stop.is_set():
+            values = parser.get_key_values(["a", "b"])
+            if values["a"] != values["b"]:
+                torn.append(values)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    write()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert torn == []
+
+
+def test_background_autosave_with_concurrent_writers(json_file):
+    path = json_file({"counters": {}})
+    policy = AutosavePolicy(max_operations=50, background=True)
+    parser = JsonFileParser(path, autosave=True, thread_safe=True, autosave_policy=policy)
+
+    def write(name):
+        for i in range(200):
+            parser.update_value("counters", name, i)
+
+    threads = [threading.Thread(target=write, args=(f"t{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    parser.close()
+
+    assert read_json(path) == {"counters": {f"t{n}": 199 for n in range(4)}}
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_changes_wait_for_reload(json_file, thread_safe):
+    path = json_file({"a": 0, "b": 0})
+    parser = JsonFileParser(path, thread_safe=thread_safe)
+    loading = threading.Event()
+    load_file = service.load_file
+
+    def slow_load(self, *args):
+        loading.set()
+        time.sleep(0.2)
+        return load_file(self, *args)
+
+    with mock.patch.object(service, "load_file", autospec=True, side_effect=slow_load):
+        thread = threading.Thread(target=parser.get_json_from_file)
+        thread.start()
+        loading.wait()
+        # Change made during reload is applied to the reloaded object, not overwritten by it
+        parser.update_value("$", "b", 1)
+        thread.join()
+
+    assert parser.active_json == {"a": 0, "b": 1}
+
+
+@pytest.mark.skipif(os.name != "posix", reason="File locking is supported on POSIX only")
+def test_file_lock_excludes_other_threads(tmp_path):
+    lock = FileLock(str(tmp_path / "data.json"))
+    events = []
+
+    def write():
+        with lock.hold(True):
+            events.append("second")
+
+    with lock.hold(False):
+        thread = threading.Thread(target=write)
+        thread.start()
+        time.sleep(0.05)
+        # Lock is reentrant for the thread that holds it
+        with lock.hold(False):
+            events.append("first")
+    thread.join()
+    lock.close()
+
+    assert events == ["first", "second"]
+
+
+def test_thread_safe_must_be_bool(json_file):
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonFileParser(json_file(DOCUMENT), thread_safe=1)
+    with pytest.raises(IncorrectFunctionParameterTypeError):
+        JsonObjectParser({}, thread_safe="yes")